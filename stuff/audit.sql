@@ -31,6 +31,18 @@ CREATE EXTENSION IF NOT EXISTS hstore;
 -- you're interested in, into a temporary table where you CREATE any useful
 -- indexes and do your analysis.
 --
+-- Workbench deviations (see workbench/audit/migrations):
+--
+-- * 0004 adds GIN (not GIST) indexes on row_data and changed_fields. The
+--   history views look up rows by hstore containment on every request, which
+--   would scan the whole table otherwise; this is the one case where the
+--   insert overhead is accepted.
+-- * 0005 replaces this table with one partitioned by month on created_at,
+--   with the primary key (event_id, created_at). Old partitions are archived
+--   and detached, which also keeps the indexes small. audit_if_modified_func()
+--   below declares its row as audit_logged_actions and fills it by position,
+--   so the partitioned table keeps the columns and their order unchanged.
+--
 CREATE TABLE audit_logged_actions (
     event_id bigserial primary key,
     table_name text not null,
@@ -48,8 +48,11 @@ class UnknownFeature(Exception):
 class UserFeatures:
     def __init__(self, *, email):
         self.email = email
+        self.enabled = frozenset(
+            key for key in KNOWN_FEATURES | set(settings.FEATURES) if self._resolve(key)
+        )
 
-    def __getattr__(self, key):
+    def _resolve(self, key):
         try:
             setting = settings.FEATURES[key]
         except KeyError:
@@ -61,4 +64,14 @@ class UserFeatures:
             return setting
         return self.email in setting
 
+    def __getattr__(self, key):
+        if key.startswith("_") or key == "enabled":
+            raise AttributeError(key)
+        if key in self.enabled:
+            return True
+        if key in KNOWN_FEATURES:
+            return False
+        # Not resolved upfront, e.g. when settings.FEATURES is a defaultdict
+        return self._resolve(key)
+
     __getitem__ = __getattr__
@@ -1,23 +1,70 @@
 from django.conf import settings
 from django.contrib import messages
+from django.contrib.auth import SESSION_KEY
 from django.db import connections
 from django.http import HttpResponseRedirect
 from django.urls import reverse
 from django.utils.translation import activate, gettext as _
 
 
+APPLICATION_NAME = "application_name"
+
+
+def _is_current(connection, username):
+    try:
+        current, savepoint_ids = connection.workbench_application_name
+    except AttributeError:
+        return False
+    if current != username:
+        return False
+    if savepoint_ids is None:
+        # Set outside a transaction, cannot have been rolled back
+        return True
+    # SET is transactional; only trust names set in transactions and
+    # savepoints which are still active
+    return (
+        connection.in_atomic_block
+        and tuple(connection.savepoint_ids[: len(savepoint_ids)]) == savepoint_ids
+    )
+
+
 def set_user_name(username):
-    connections["default"].cursor().execute(
-        "SET SESSION application_name TO %s", [username]
+    """
+    Set the application name which is recorded in the audit log
+
+    The name is passed as a connection parameter when the connection has not
+    been opened yet and only sent to the database if it has changed
+    otherwise, saving a round trip on most requests.
+    """
+    connection = connections["default"]
+    connection.settings_dict = dict(
+        connection.settings_dict,
+        OPTIONS=dict(
+            connection.settings_dict.get("OPTIONS") or {}, application_name=username
+        ),
+    )
+    if connection.connection is not None and not _is_current(connection, username):
+        connection.cursor().execute("SET SESSION application_name TO %s", [username])
+    connection.workbench_application_name = (
+        username,
+        tuple(connection.savepoint_ids) if connection.in_atomic_block else None,
     )
 
 
 def user_middleware(get_response):
     def middleware(request):
+        # Use the name stored in the session before loading the user so that
+        # it is sent along when opening the database connection.
+        username = request.session.get(APPLICATION_NAME)
+        if username and username.startswith(
+            "user-%s-" % request.session.get(SESSION_KEY)
+        ):
+            set_user_name(username)
+
         if request.user.is_authenticated:
-            set_user_name(
-                "user-%d-%s" % (request.user.id, request.user.get_short_name())
-            )
+            username = "user-%d-%s" % (request.user.id, request.user.get_short_name())
+            request.session[APPLICATION_NAME] = username
+            set_user_name(username)
             activate(request.user.language)
             return get_response(request)
 
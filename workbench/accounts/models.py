@@ -7,7 +7,7 @@ from django.contrib import messages
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
 from django.core.signing import BadSignature, Signer
 from django.db import connections, models
-from django.db.models import Count, Q, Sum
+from django.db.models import Count, Q
 from django.utils import timezone
 from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
@@ -160,18 +160,25 @@ class User(Model, AbstractBaseUser):
         return self.is_admin
 
     @cached_property
-    def hours(self):
-        per_day = {
-            row["rendered_on"]: row["hours__sum"]
-            for row in self.loggedhours.filter(rendered_on__gte=monday())
-            .order_by()
-            .values("rendered_on")
-            .annotate(Sum("hours"))
+    def daily_totals(self):
+        """
+        Return a ``{day: DailyTotal}`` dictionary of the current week
+        """
+        from workbench.logbook.models import DailyTotal
+
+        return {
+            total.day: total
+            for total in DailyTotal.objects.filter(user=self, day__gte=monday())
         }
 
+    @cached_property
+    def hours(self):
+        today = self.daily_totals.get(dt.date.today())
         return {
-            "today": per_day.get(dt.date.today(), Decimal("0.0")),
-            "week": sum(per_day.values(), Decimal("0.0")),
+            "today": today.hours if today else Decimal("0.0"),
+            "week": sum(
+                (total.hours for total in self.daily_totals.values()), Decimal("0.0")
+            ),
         }
 
     @cached_property
@@ -207,40 +214,21 @@ class User(Model, AbstractBaseUser):
         with connections["default"].cursor() as cursor:
             cursor.execute(
                 """
-with sq as (
+select greatest(
+    -- timestamps and breaks, maintained by triggers (see timer.LatestActivity)
+    (select created_at from timer_latestactivity where user_id=%s),
+
     -- created_at of logged hours with no linked timestamp
-    select max(created_at) as created_at
-    from logbook_loggedhours
-    where rendered_on=%s and rendered_by_id=%s and id not in (
-        select logged_hours_id from timer_timestamp
-        where logged_hours_id is not NULL
+    (
+        select max(created_at)
+        from logbook_loggedhours lh
+        where rendered_on=%s and rendered_by_id=%s and not exists (
+            select 1 from timer_timestamp where logged_hours_id=lh.id
+        )
     )
-
-    union all
-
-    -- the end of the latest break
-    select max(ends_at) as created_at
-    from logbook_break
-    where user_id=%s
-
-    union all
-
-    -- the latest timestamp
-    select max(created_at) as created_at
-    from timer_timestamp
-    where user_id=%s
-
-    union all
-
-    -- the latest START timestamp's creation time + logged hours duration
-    select max(ts.created_at + make_interval(secs => 3600 * lh.hours))
-    from timer_timestamp ts
-    left join logbook_loggedhours lh on ts.logged_hours_id=lh.id
-    where ts.user_id=%s and ts.type='start'
 )
-select max(created_at) from sq
                 """,
-                [dt.date.today(), self.id, self.id, self.id, self.id],
+                [self.id, dt.date.today(), self.id],
             )
             return list(cursor)[0][0]
 
@@ -259,20 +247,15 @@ select max(created_at) from sq
         if self.features[FEATURES.SKIP_BREAKS]:
             return None
 
+        from workbench.logbook.models import DailyTotal
+
         day = day or dt.date.today()
-        hours = (
-            self.loggedhours.filter(rendered_on=day)
-            .order_by()
-            .aggregate(h=Sum("hours"))["h"]
-            or Z1
-        )
-        break_seconds = sum(
-            (
-                int(brk.timedelta.total_seconds())
-                for brk in self.breaks.filter(starts_at__date=day)
-            ),
-            Z1,
-        )
+        if day >= monday():
+            total = self.daily_totals.get(day)
+        else:
+            total = DailyTotal.objects.filter(user=self, day=day).first()
+        hours = total.hours if total else Z1
+        break_seconds = total.break_seconds if total else 0
         msg = _(
             "You should take (and log!) a break of at least %(minutes)s minutes"
             " when working more than %(hours)s hours."
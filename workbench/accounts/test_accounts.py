@@ -3,13 +3,14 @@ import datetime as dt
 from django.test import RequestFactory, TestCase
 from django.test.utils import override_settings
 from django.urls import reverse
+from django.utils.translation import activate, get_language
 
 from workbench import factories
 from workbench.accounts.features import UnknownFeature
 from workbench.accounts.forms import TeamForm, TeamSearchForm
 from workbench.accounts.models import User
 from workbench.projects.models import Project
-from workbench.tools.testing import messages
+from workbench.tools.testing import messages, page_queries
 
 
 class AccountsTest(TestCase):
@@ -106,6 +107,20 @@ class AccountsTest(TestCase):
         self.assertTrue(user.features["maybe"])
         with self.assertRaises(UnknownFeature):
             user.features["missing"]
+        self.assertEqual(user.features.enabled, {"yes", "maybe"})
+
+    def test_application_name_round_trips(self):
+        """The application name is only sent to the database when it changes"""
+        user = factories.UserFactory.create()
+        self.client.force_login(user)
+        # The middleware activates the user's language
+        self.addCleanup(activate, get_language())
+
+        def set_name(queries):
+            return [sql for sql in queries if "application_name" in sql]
+
+        self.assertEqual(len(set_name(page_queries(self, "/"))), 1)
+        self.assertEqual(set_name(page_queries(self, "/")), [])
 
     def test_user_views(self):
         """The user views do not crash"""
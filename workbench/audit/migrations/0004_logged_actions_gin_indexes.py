@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0003_auto_20190703_0813"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS logged_actions_row_data_idx"
+            " ON audit_logged_actions USING gin(row_data);"
+            "CREATE INDEX IF NOT EXISTS logged_actions_changed_fields_idx"
+            " ON audit_logged_actions USING gin(changed_fields);",
+            "DROP INDEX IF EXISTS logged_actions_changed_fields_idx;"
+            "DROP INDEX IF EXISTS logged_actions_row_data_idx;",
+        ),
+    ]
@@ -0,0 +1,123 @@
+from django.db import migrations
+
+
+PARTITION_SQL = """\
+CREATE OR REPLACE FUNCTION audit_create_partition(month date) RETURNS text AS $$
+declare
+  partition text := 'audit_logged_actions_' || to_char(month, 'YYYY_MM');
+  starts_at timestamptz := date_trunc('month', month)::timestamp AT TIME ZONE 'UTC';
+  ends_at timestamptz :=
+    (date_trunc('month', month) + interval '1 month')::timestamp AT TIME ZONE 'UTC';
+begin
+  IF to_regclass(partition) IS NULL THEN
+    EXECUTE format(
+      'CREATE TABLE %I (LIKE audit_logged_actions INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+      partition
+    );
+    -- Rows may have ended up in the default partition if the partition
+    -- for their month did not exist yet.
+    EXECUTE format(
+      'WITH moved AS ('
+      '  DELETE FROM audit_logged_actions_default'
+      '  WHERE created_at >= %L AND created_at < %L RETURNING *'
+      ') INSERT INTO %I SELECT * FROM moved',
+      starts_at, ends_at, partition
+    );
+    EXECUTE format(
+      'ALTER TABLE audit_logged_actions ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+      partition, starts_at, ends_at
+    );
+  END IF;
+  RETURN partition;
+end
+$$ LANGUAGE plpgsql;
+
+-- audit_if_modified_func() in stuff/audit.sql builds rows with ROW(...) in
+-- the column order of audit_logged_actions; the partitioned table must keep
+-- exactly the same columns in the same order.
+ALTER TABLE audit_logged_actions RENAME TO audit_logged_actions_legacy;
+ALTER SEQUENCE audit_logged_actions_event_id_seq OWNED BY NONE;
+
+CREATE TABLE audit_logged_actions (
+    event_id bigint NOT NULL DEFAULT nextval('audit_logged_actions_event_id_seq'),
+    table_name text not null,
+    user_name text,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    action TEXT NOT NULL CHECK (action IN ('I','D','U', 'T')),
+    row_data hstore,
+    changed_fields hstore,
+    PRIMARY KEY (event_id, created_at)
+) PARTITION BY RANGE (created_at);
+
+ALTER SEQUENCE audit_logged_actions_event_id_seq
+  OWNED BY audit_logged_actions.event_id;
+
+CREATE TABLE audit_logged_actions_default
+  PARTITION OF audit_logged_actions DEFAULT;
+
+SELECT audit_create_partition(month::date)
+FROM generate_series(
+  date_trunc(
+    'month',
+    COALESCE(
+      (SELECT MIN(created_at) FROM audit_logged_actions_legacy),
+      now()
+    ) AT TIME ZONE 'UTC'
+  ),
+  date_trunc('month', now() AT TIME ZONE 'UTC') + interval '2 months',
+  interval '1 month'
+) AS month;
+
+INSERT INTO audit_logged_actions SELECT * FROM audit_logged_actions_legacy;
+DROP TABLE audit_logged_actions_legacy;
+
+CREATE INDEX logged_actions_relid_idx ON audit_logged_actions(table_name);
+CREATE INDEX logged_actions_action_tstamp_tx_stm_idx ON audit_logged_actions(created_at);
+CREATE INDEX logged_actions_action_idx ON audit_logged_actions(action);
+-- Recreates the GIN indexes of 0004 on each partition, see stuff/audit.sql
+CREATE INDEX logged_actions_row_data_idx ON audit_logged_actions USING gin(row_data);
+CREATE INDEX logged_actions_changed_fields_idx
+  ON audit_logged_actions USING gin(changed_fields);
+"""
+
+# Copies the rows of all attached partitions back into a plain table.
+# Partitions which have been archived and detached are not restored.
+UNPARTITION_SQL = """\
+CREATE TABLE audit_logged_actions_legacy (
+    event_id bigint NOT NULL DEFAULT nextval('audit_logged_actions_event_id_seq'),
+    table_name text not null,
+    user_name text,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    action TEXT NOT NULL CHECK (action IN ('I','D','U', 'T')),
+    row_data hstore,
+    changed_fields hstore
+);
+
+INSERT INTO audit_logged_actions_legacy SELECT * FROM audit_logged_actions;
+
+ALTER SEQUENCE audit_logged_actions_event_id_seq OWNED BY NONE;
+DROP TABLE audit_logged_actions;
+DROP FUNCTION IF EXISTS audit_create_partition(date);
+
+ALTER TABLE audit_logged_actions_legacy RENAME TO audit_logged_actions;
+ALTER TABLE audit_logged_actions
+  ADD CONSTRAINT audit_logged_actions_pkey PRIMARY KEY (event_id);
+ALTER SEQUENCE audit_logged_actions_event_id_seq
+  OWNED BY audit_logged_actions.event_id;
+
+CREATE INDEX logged_actions_relid_idx ON audit_logged_actions(table_name);
+CREATE INDEX logged_actions_action_tstamp_tx_stm_idx ON audit_logged_actions(created_at);
+CREATE INDEX logged_actions_action_idx ON audit_logged_actions(action);
+CREATE INDEX logged_actions_row_data_idx ON audit_logged_actions USING gin(row_data);
+CREATE INDEX logged_actions_changed_fields_idx
+  ON audit_logged_actions USING gin(changed_fields);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0004_logged_actions_gin_indexes"),
+    ]
+
+    operations = [migrations.RunSQL(PARTITION_SQL, UNPARTITION_SQL)]
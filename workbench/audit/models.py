@@ -12,11 +12,13 @@ class LoggedActionQuerySet(models.QuerySet):
         return self.filter(table_name=model._meta.db_table)
 
     def with_data(self, **kwargs):
+        # Containment queries are answered by the GIN indexes on row_data and
+        # changed_fields
         queryset = self
         for key, value in kwargs.items():
             queryset = queryset.filter(
-                Q(**{"row_data__%s" % key: value})
-                | Q(**{"changed_fields__%s" % key: value})
+                Q(row_data__contains={key: str(value)})
+                | Q(changed_fields__contains={key: str(value)})
             )
         return queryset
 
@@ -0,0 +1,88 @@
+import datetime as dt
+import gzip
+import os
+import re
+
+from django.db import connections, transaction
+
+
+PARTITION_RE = re.compile(r"^audit_logged_actions_([0-9]{4})_([0-9]{2})$")
+
+
+def _month(day, delta=0):
+    months = day.year * 12 + day.month - 1 + delta
+    return dt.date(months // 12, months % 12 + 1, 1)
+
+
+def partitions():
+    """
+    Return a sorted list of ``(month, table name)`` tuples of all monthly
+    partitions of the audit log
+    """
+    with connections["default"].cursor() as cursor:
+        cursor.execute(
+            """\
+SELECT c.relname
+FROM pg_inherits i
+LEFT JOIN pg_class c ON i.inhrelid=c.oid
+WHERE i.inhparent='audit_logged_actions'::regclass
+"""
+        )
+        return sorted(
+            (dt.date(int(match[1]), int(match[2]), 1), match[0])
+            for match in (PARTITION_RE.match(row[0]) for row in cursor)
+            if match
+        )
+
+
+def create_audit_partitions(*, months_ahead=2):
+    """
+    Create the partitions for the current and the upcoming months so that
+    new rows do not end up in the default partition
+    """
+    today = dt.date.today()
+    with connections["default"].cursor() as cursor:
+        for delta in range(months_ahead + 1):
+            cursor.execute("SELECT audit_create_partition(%s)", [_month(today, delta)])
+
+
+def _path(directory, partition):
+    return os.path.join(directory, "%s.copy.gz" % partition)
+
+
+def archive_audit_partitions(directory, *, keep_months):
+    """
+    Export partitions older than ``keep_months`` months into compressed
+    files in ``directory`` and remove them from the database
+    """
+    cutoff = _month(dt.date.today(), -keep_months)
+    archived = []
+    for month, partition in partitions():
+        if month >= cutoff:
+            continue
+
+        path = _path(directory, partition)
+        with transaction.atomic():
+            with connections["default"].cursor() as cursor:
+                with gzip.open(path, "wb") as f:
+                    cursor.copy_expert('COPY "%s" TO STDOUT' % partition, f)
+                cursor.execute(
+                    'ALTER TABLE audit_logged_actions DETACH PARTITION "%s"' % partition
+                )
+                cursor.execute('DROP TABLE "%s"' % partition)
+        archived.append(path)
+    return archived
+
+
+def restore_audit_partition(directory, month):
+    """
+    Load an archived partition back into the audit log, e.g. to be able to
+    look at the history of old objects again
+    """
+    with transaction.atomic():
+        with connections["default"].cursor() as cursor:
+            cursor.execute("SELECT audit_create_partition(%s)", [_month(month)])
+            partition = cursor.fetchone()[0]
+            with gzip.open(_path(directory, partition), "rb") as f:
+                cursor.copy_expert('COPY "%s" FROM STDIN' % partition, f)
+    return partition
@@ -0,0 +1,49 @@
+import datetime as dt
+import os
+import tempfile
+
+from django.db import connections
+from django.test import TestCase
+
+from workbench.audit.models import LoggedAction
+from workbench.audit.tasks import (
+    archive_audit_partitions,
+    create_audit_partitions,
+    partitions,
+    restore_audit_partition,
+)
+
+
+class ArchiveTest(TestCase):
+    def test_archive_and_restore(self):
+        """Old partitions of the audit log can be archived and restored"""
+        create_audit_partitions()
+        today = dt.date.today()
+        months = [month for month, partition in partitions()]
+        self.assertIn(today.replace(day=1), months)
+
+        with connections["default"].cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO audit_logged_actions"
+                " (table_name, user_name, created_at, action, row_data)"
+                " VALUES ('test', 'test', '2000-01-15 12:00:00+00', 'I', 'id=>1')"
+            )
+        # Ended up in the default partition
+        self.assertNotIn(dt.date(2000, 1, 1), [month for month, _p in partitions()])
+        self.assertEqual(LoggedAction.objects.filter(table_name="test").count(), 1)
+
+        with connections["default"].cursor() as cursor:
+            cursor.execute("SELECT audit_create_partition('2000-01-01')")
+        self.assertIn(dt.date(2000, 1, 1), [month for month, _p in partitions()])
+
+        with tempfile.TemporaryDirectory() as directory:
+            archived = archive_audit_partitions(directory, keep_months=12)
+            self.assertEqual(
+                archived,
+                [os.path.join(directory, "audit_logged_actions_2000_01.copy.gz")],
+            )
+            self.assertEqual(LoggedAction.objects.filter(table_name="test").count(), 0)
+
+            restore_audit_partition(directory, dt.date(2000, 1, 1))
+            action = LoggedAction.objects.get(table_name="test")
+            self.assertEqual(action.row_data, {"id": "1"})
@@ -0,0 +1,195 @@
+# Generated by Django 3.1.1 on 2026-10-18 03:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+INVALIDATE_SQL = """\
+CREATE OR REPLACE FUNCTION awt_annualworkingtimesnapshot_invalidate(
+  p_user_id integer,
+  p_year_from integer,
+  p_year_until integer
+) RETURNS void AS $$
+begin
+  DELETE FROM awt_annualworkingtimesnapshot
+  WHERE user_id=p_user_id AND year BETWEEN p_year_from AND p_year_until;
+end
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION awt_employment_awtsnapshot() RETURNS trigger AS $$
+begin
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM awt_annualworkingtimesnapshot_invalidate(
+      old.user_id,
+      extract(year FROM old.date_from)::integer,
+      extract(year FROM old.date_until)::integer
+    );
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM awt_annualworkingtimesnapshot_invalidate(
+      new.user_id,
+      extract(year FROM new.date_from)::integer,
+      extract(year FROM new.date_until)::integer
+    );
+  END IF;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS awt_employment_awtsnapshot_trigger ON awt_employment;
+CREATE TRIGGER awt_employment_awtsnapshot_trigger
+  AFTER INSERT OR DELETE
+  OR UPDATE OF user_id, date_from, date_until, percentage, vacation_weeks
+  ON awt_employment FOR EACH ROW
+  EXECUTE PROCEDURE awt_employment_awtsnapshot();
+
+CREATE OR REPLACE FUNCTION awt_absence_awtsnapshot() RETURNS trigger AS $$
+begin
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM awt_annualworkingtimesnapshot_invalidate(
+      old.user_id,
+      extract(year FROM old.starts_on)::integer,
+      extract(year FROM old.starts_on)::integer
+    );
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM awt_annualworkingtimesnapshot_invalidate(
+      new.user_id,
+      extract(year FROM new.starts_on)::integer,
+      extract(year FROM new.starts_on)::integer
+    );
+  END IF;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS awt_absence_awtsnapshot_trigger ON awt_absence;
+CREATE TRIGGER awt_absence_awtsnapshot_trigger
+  AFTER INSERT OR DELETE
+  OR UPDATE OF user_id, starts_on, days, reason, is_vacation
+  ON awt_absence FOR EACH ROW
+  EXECUTE PROCEDURE awt_absence_awtsnapshot();
+
+CREATE OR REPLACE FUNCTION logbook_loggedhours_awtsnapshot() RETURNS trigger AS $$
+begin
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM awt_annualworkingtimesnapshot_invalidate(
+      old.rendered_by_id,
+      extract(year FROM old.rendered_on)::integer,
+      extract(year FROM old.rendered_on)::integer
+    );
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM awt_annualworkingtimesnapshot_invalidate(
+      new.rendered_by_id,
+      extract(year FROM new.rendered_on)::integer,
+      extract(year FROM new.rendered_on)::integer
+    );
+  END IF;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS logbook_loggedhours_awtsnapshot_trigger ON logbook_loggedhours;
+CREATE TRIGGER logbook_loggedhours_awtsnapshot_trigger
+  AFTER INSERT OR DELETE OR UPDATE OF rendered_by_id, rendered_on, hours
+  ON logbook_loggedhours FOR EACH ROW
+  EXECUTE PROCEDURE logbook_loggedhours_awtsnapshot();
+
+CREATE OR REPLACE FUNCTION awt_year_awtsnapshot() RETURNS trigger AS $$
+begin
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    DELETE FROM awt_annualworkingtimesnapshot
+    WHERE year=old.year AND user_id IN (
+      SELECT id FROM accounts_user
+      WHERE working_time_model_id=old.working_time_model_id
+    );
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    DELETE FROM awt_annualworkingtimesnapshot
+    WHERE year=new.year AND user_id IN (
+      SELECT id FROM accounts_user
+      WHERE working_time_model_id=new.working_time_model_id
+    );
+  END IF;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS awt_year_awtsnapshot_trigger ON awt_year;
+CREATE TRIGGER awt_year_awtsnapshot_trigger
+  AFTER INSERT OR DELETE OR UPDATE ON awt_year FOR EACH ROW
+  EXECUTE PROCEDURE awt_year_awtsnapshot();
+
+CREATE OR REPLACE FUNCTION accounts_user_awtsnapshot() RETURNS trigger AS $$
+begin
+  DELETE FROM awt_annualworkingtimesnapshot WHERE user_id=new.id;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS accounts_user_awtsnapshot_trigger ON accounts_user;
+CREATE TRIGGER accounts_user_awtsnapshot_trigger
+  AFTER UPDATE OF working_time_model_id ON accounts_user FOR EACH ROW
+  WHEN (old.working_time_model_id IS DISTINCT FROM new.working_time_model_id)
+  EXECUTE PROCEDURE accounts_user_awtsnapshot();
+"""
+
+INVALIDATE_REVERSE_SQL = """\
+DROP TRIGGER IF EXISTS accounts_user_awtsnapshot_trigger ON accounts_user;
+DROP FUNCTION IF EXISTS accounts_user_awtsnapshot();
+DROP TRIGGER IF EXISTS awt_year_awtsnapshot_trigger ON awt_year;
+DROP FUNCTION IF EXISTS awt_year_awtsnapshot();
+DROP TRIGGER IF EXISTS logbook_loggedhours_awtsnapshot_trigger ON logbook_loggedhours;
+DROP FUNCTION IF EXISTS logbook_loggedhours_awtsnapshot();
+DROP TRIGGER IF EXISTS awt_absence_awtsnapshot_trigger ON awt_absence;
+DROP FUNCTION IF EXISTS awt_absence_awtsnapshot();
+DROP TRIGGER IF EXISTS awt_employment_awtsnapshot_trigger ON awt_employment;
+DROP FUNCTION IF EXISTS awt_employment_awtsnapshot();
+DROP FUNCTION IF EXISTS awt_annualworkingtimesnapshot_invalidate(integer, integer, integer);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("awt", "0011_absence_ends_on"),
+        ("logbook", "0022_dailytotal_entries"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnnualWorkingTimeSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.IntegerField(verbose_name="year")),
+                ("data", models.JSONField(verbose_name="data")),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="user",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "annual working time snapshot",
+                "verbose_name_plural": "annual working time snapshots",
+                "ordering": ["year"],
+                "unique_together": {("user", "year")},
+            },
+        ),
+        migrations.RunSQL(INVALIDATE_SQL, INVALIDATE_REVERSE_SQL),
+    ]
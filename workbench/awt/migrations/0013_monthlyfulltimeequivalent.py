@@ -0,0 +1,113 @@
+# Generated by Django 3.1.1 on 2026-10-18 03:34
+
+from django.db import migrations, models
+
+
+FTE_SQL = """\
+CREATE OR REPLACE FUNCTION awt_monthlyfulltimeequivalent_add(
+  p_date_from date,
+  p_date_until date,
+  p_percentage integer
+) RETURNS void AS $$
+declare
+  v_date_until date := LEAST(p_date_until, date '2099-12-31');
+begin
+  IF v_date_until < p_date_from THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO awt_monthlyfulltimeequivalent (month, fte)
+  SELECT
+    month::date,
+    p_percentage / 100.0
+    * (
+      LEAST(v_date_until, (month + interval '1 month - 1 day')::date)
+      - GREATEST(p_date_from, month::date)
+      + 1
+    )
+    / extract(day FROM month + interval '1 month - 1 day')
+  FROM generate_series(
+    date_trunc('month', p_date_from::timestamp),
+    date_trunc('month', v_date_until::timestamp),
+    interval '1 month'
+  ) AS month
+  ON CONFLICT (month)
+  DO UPDATE SET fte=awt_monthlyfulltimeequivalent.fte + EXCLUDED.fte;
+
+  DELETE FROM awt_monthlyfulltimeequivalent
+  WHERE month BETWEEN date_trunc('month', p_date_from::timestamp)::date
+    AND v_date_until
+    AND fte=0;
+end
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION awt_employment_fte() RETURNS trigger AS $$
+begin
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM awt_monthlyfulltimeequivalent_add(
+      old.date_from, old.date_until, -old.percentage
+    );
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM awt_monthlyfulltimeequivalent_add(
+      new.date_from, new.date_until, new.percentage
+    );
+  END IF;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS awt_employment_fte_trigger ON awt_employment;
+CREATE TRIGGER awt_employment_fte_trigger
+  AFTER INSERT OR DELETE OR UPDATE OF date_from, date_until, percentage
+  ON awt_employment FOR EACH ROW EXECUTE PROCEDURE awt_employment_fte();
+
+SELECT awt_monthlyfulltimeequivalent_add(date_from, date_until, percentage)
+FROM awt_employment;
+"""
+
+FTE_REVERSE_SQL = """\
+DROP TRIGGER IF EXISTS awt_employment_fte_trigger ON awt_employment;
+DROP FUNCTION IF EXISTS awt_employment_fte();
+DROP FUNCTION IF EXISTS awt_monthlyfulltimeequivalent_add(date, date, integer);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("awt", "0012_annualworkingtimesnapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlyFullTimeEquivalent",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField(unique=True, verbose_name="month")),
+                (
+                    "fte",
+                    models.DecimalField(
+                        decimal_places=6,
+                        default=0,
+                        max_digits=12,
+                        verbose_name="full time equivalents",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "monthly full time equivalent",
+                "verbose_name_plural": "monthly full time equivalents",
+                "ordering": ["month"],
+            },
+        ),
+        migrations.RunSQL(FTE_SQL, FTE_REVERSE_SQL),
+    ]
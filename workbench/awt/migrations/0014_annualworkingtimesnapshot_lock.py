@@ -0,0 +1,94 @@
+from django.db import migrations
+
+
+# annual_working_time() takes the same lock while computing and saving
+# snapshots, so changes cannot commit in between and leave a stale snapshot.
+INVALIDATE_SQL = """\
+CREATE OR REPLACE FUNCTION awt_annualworkingtimesnapshot_invalidate(
+  p_user_id integer,
+  p_year_from integer,
+  p_year_until integer
+) RETURNS void AS $$
+begin
+  PERFORM pg_advisory_xact_lock(
+    hashtext('awt_annualworkingtimesnapshot'), p_user_id
+  );
+  DELETE FROM awt_annualworkingtimesnapshot
+  WHERE user_id=p_user_id AND year BETWEEN p_year_from AND p_year_until;
+end
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION awt_year_awtsnapshot() RETURNS trigger AS $$
+begin
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM awt_annualworkingtimesnapshot_invalidate(id, old.year, old.year)
+    FROM accounts_user
+    WHERE working_time_model_id=old.working_time_model_id;
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM awt_annualworkingtimesnapshot_invalidate(id, new.year, new.year)
+    FROM accounts_user
+    WHERE working_time_model_id=new.working_time_model_id;
+  END IF;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION accounts_user_awtsnapshot() RETURNS trigger AS $$
+begin
+  PERFORM awt_annualworkingtimesnapshot_invalidate(new.id, 0, 9999);
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+"""
+
+INVALIDATE_REVERSE_SQL = """\
+CREATE OR REPLACE FUNCTION awt_annualworkingtimesnapshot_invalidate(
+  p_user_id integer,
+  p_year_from integer,
+  p_year_until integer
+) RETURNS void AS $$
+begin
+  DELETE FROM awt_annualworkingtimesnapshot
+  WHERE user_id=p_user_id AND year BETWEEN p_year_from AND p_year_until;
+end
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION awt_year_awtsnapshot() RETURNS trigger AS $$
+begin
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    DELETE FROM awt_annualworkingtimesnapshot
+    WHERE year=old.year AND user_id IN (
+      SELECT id FROM accounts_user
+      WHERE working_time_model_id=old.working_time_model_id
+    );
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    DELETE FROM awt_annualworkingtimesnapshot
+    WHERE year=new.year AND user_id IN (
+      SELECT id FROM accounts_user
+      WHERE working_time_model_id=new.working_time_model_id
+    );
+  END IF;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION accounts_user_awtsnapshot() RETURNS trigger AS $$
+begin
+  DELETE FROM awt_annualworkingtimesnapshot WHERE user_id=new.id;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("awt", "0013_monthlyfulltimeequivalent"),
+    ]
+
+    operations = [
+        migrations.RunSQL(INVALIDATE_SQL, INVALIDATE_REVERSE_SQL),
+    ]
@@ -2,7 +2,7 @@ import datetime as dt
 
 from django.contrib import messages
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import connections, models
 from django.utils.translation import gettext, gettext_lazy as _
 
 from workbench.accounts.models import User
@@ -217,3 +217,68 @@ class Absence(Model):
             local_date_format(self.starts_on),
             local_date_format(self.ends_on or self.starts_on),
         )
+
+
+class AnnualWorkingTimeSnapshot(models.Model):
+    """
+    The monthly figures of the annual working time of a user and year, see
+    ``workbench.awt.reporting.annual_working_time``. Database triggers remove
+    snapshots as soon as employments, absences, years, logged hours or the
+    working time model of the user change.
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="+", verbose_name=_("user")
+    )
+    year = models.IntegerField(_("year"))
+    data = models.JSONField(_("data"))
+
+    class Meta:
+        ordering = ["year"]
+        unique_together = [("user", "year")]
+        verbose_name = _("annual working time snapshot")
+        verbose_name_plural = _("annual working time snapshots")
+
+    def __str__(self):
+        return str(self.year)
+
+
+class MonthlyFullTimeEquivalentQuerySet(models.QuerySet):
+    def rebuild(self):
+        """
+        Recreate the full time equivalents from the employments. They are
+        maintained by a trigger on ``awt_employment``; this is only required
+        if the trigger has been bypassed somehow.
+        """
+        with connections["default"].cursor() as cursor:
+            cursor.execute(
+                """\
+DELETE FROM awt_monthlyfulltimeequivalent;
+SELECT awt_monthlyfulltimeequivalent_add(date_from, date_until, percentage)
+FROM awt_employment;
+"""
+            )
+
+
+class MonthlyFullTimeEquivalent(models.Model):
+    """
+    The sum of all employment percentages per month, weighted by the days of
+    the month covered by each employment. Maintained by a database trigger on
+    ``awt_employment``; open-ended employments are expanded up to the end of
+    2099.
+    """
+
+    month = models.DateField(_("month"), unique=True)
+    fte = models.DecimalField(
+        _("full time equivalents"), max_digits=12, decimal_places=6, default=0
+    )
+
+    objects = MonthlyFullTimeEquivalentQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["month"]
+        verbose_name = _("monthly full time equivalent")
+        verbose_name_plural = _("monthly full time equivalents")
+
+    def __str__(self):
+        return "%s: %s" % (self.month, self.fte)
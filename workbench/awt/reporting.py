@@ -1,13 +1,21 @@
 import datetime as dt
 from collections import defaultdict
+from contextlib import nullcontext
 from decimal import Decimal
 
+from django.db import connections, transaction
 from django.db.models import Sum
 from django.db.models.functions import ExtractMonth
 from django.utils.datastructures import OrderedSet
 
 from workbench.accounts.models import User
-from workbench.awt.models import Absence, Employment, Year
+from workbench.awt.models import (
+    Absence,
+    AnnualWorkingTimeSnapshot,
+    Employment,
+    MonthlyFullTimeEquivalent,
+    Year,
+)
 from workbench.awt.utils import days_per_month, monthly_days
 from workbench.logbook.models import LoggedHours
 from workbench.tools.formats import Z1
@@ -64,33 +72,49 @@ def active_users(year):
     )
 
 
-def full_time_equivalents_by_month():
-    months = defaultdict(lambda: Z1)
-    this_year = dt.date.today().year
-    for employment in Employment.objects.all():
-        percentage_factor = Decimal(employment.percentage) / 100
-        for month, days in monthly_days(  # pragma: no branch
-            employment.date_from, employment.date_until
-        ):
-            if month.year > this_year:
-                break
-            dpm = days_per_month(month.year)
-            partial_month_factor = Decimal(days) / dpm[month.month - 1]
-            months[month] += percentage_factor * partial_month_factor
-    return months
+def full_time_equivalents_by_month(date_range=None):
+    """
+    Return a ``{month: full time equivalents}`` dictionary for all months
+    in ``date_range`` or up to the end of this year
+    """
+    queryset = MonthlyFullTimeEquivalent.objects.order_by()
+    if date_range:
+        queryset = queryset.filter(
+            month__range=[date_range[0].replace(day=1), date_range[1]]
+        )
+    else:
+        queryset = queryset.filter(month__lte=dt.date(dt.date.today().year, 12, 31))
+    return defaultdict(lambda: Z1, queryset.values_list("month", "fte"))
 
 
-def annual_working_time(year, *, users):
-    absences = defaultdict(
-        lambda: {"absence_vacation": [], "absence_sickness": [], "absence_other": []}
-    )
-    months = Months(year=year, users=users)
-    vacation_days_credit = defaultdict(lambda: Z1)
+LOCK_SQL = """\
+SELECT pg_advisory_xact_lock(hashtext('awt_annualworkingtimesnapshot'), id)
+FROM (SELECT unnest(%s::integer[]) AS id ORDER BY 1) AS ids
+"""
+
+MONTHLY_FIELDS = [
+    "percentage",
+    "available_vacation_days",
+    "absence_vacation",
+    "absence_sickness",
+    "absence_other",
+    "vacation_days_correction",
+    "target",
+    "hours",
+]
+
+
+def _compute_months(year, *, months, users, employments, absences):
+    """
+    Fill in the monthly figures of the passed users and return their vacation
+    days credit, using one grouped query for the logged hours
+    """
     dpm = days_per_month(year)
+    user_ids = {user.id for user in users}
 
-    for employment in Employment.objects.filter(
-        user__in=months.users_with_wtm
-    ).order_by("-date_from"):
+    for employment in employments:
+        if employment.user_id not in user_ids:
+            continue
         percentage_factor = Decimal(employment.percentage) / 100
         available_vacation_days_per_month = (
             Decimal(employment.vacation_weeks) * 5 / 12 * percentage_factor
@@ -115,11 +139,10 @@ def annual_working_time(year, *, users):
             month_data["available_vacation_days"][month.month - 1] += (
                 available_vacation_days_per_month * partial_month_factor
             )
-            month_data["employments"].add(employment)
 
     for row in (
         LoggedHours.objects.order_by()
-        .filter(rendered_by__in=months.users_with_wtm, rendered_on__year=year)
+        .filter(rendered_by__in=user_ids, rendered_on__year=year)
         .values("rendered_by")
         .annotate(month=ExtractMonth("rendered_on"))
         .values("rendered_by", "month")
@@ -131,17 +154,16 @@ def annual_working_time(year, *, users):
     remaining = defaultdict(
         lambda: Z1,
         {
-            user: sum(month_data["available_vacation_days"])
-            for user, month_data in months.items()
+            user_id: sum(months[user_id]["available_vacation_days"])
+            for user_id in user_ids
         },
     )
-    for absence in Absence.objects.filter(
-        user__in=months.users_with_wtm, starts_on__year=year
-    ).order_by("starts_on"):
+    for absence in absences:
+        if absence.user_id not in user_ids:
+            continue
         month_data = months[absence.user_id]
         key = "absence_%s" % absence.reason
         month_data[key][absence.starts_on.month - 1] += absence.days
-        absences[absence.user_id][key].append(absence)
 
         if absence.is_vacation:
             if absence.days > remaining[absence.user_id]:
@@ -152,9 +174,91 @@ def annual_working_time(year, *, users):
                 0, remaining[absence.user_id] - absence.days
             )
 
-    for user_id, vacation_days in remaining.items():
-        if vacation_days > 0:
-            vacation_days_credit[user_id] = vacation_days
+    return {
+        user_id: vacation_days if vacation_days > 0 else Z1
+        for user_id, vacation_days in remaining.items()
+    }
+
+
+def annual_working_time(year, *, users):
+    """
+    Return the annual working time statistics of the passed users
+
+    The monthly figures are loaded from ``AnnualWorkingTimeSnapshot`` where
+    available. Missing snapshots are computed for all users at once and saved
+    for later use while holding an advisory lock per user, so that changes
+    cannot commit between computing and saving a snapshot.
+    """
+    absences = defaultdict(
+        lambda: {"absence_vacation": [], "absence_sickness": [], "absence_other": []}
+    )
+    months = Months(year=year, users=users)
+
+    snapshots = {
+        snapshot.user_id: snapshot
+        for snapshot in AnnualWorkingTimeSnapshot.objects.filter(
+            user__in=months.users_with_wtm, year=year
+        )
+    }
+    vacation_days_credit = {}
+    for user_id, snapshot in snapshots.items():
+        month_data = months[user_id]
+        for field in MONTHLY_FIELDS:
+            month_data[field] = [Decimal(value) for value in snapshot.data[field]]
+        vacation_days_credit[user_id] = Decimal(snapshot.data["vacation_days_credit"])
+
+    missing = [user for user in months.users_with_wtm if user.id not in snapshots]
+    with transaction.atomic() if missing else nullcontext():
+        if missing:
+            # Taken by the invalidation triggers too, see awt/0014
+            with connections["default"].cursor() as cursor:
+                cursor.execute(LOCK_SQL, [sorted(user.id for user in missing)])
+
+        employments = list(
+            Employment.objects.filter(
+                user__in=months.users_with_wtm,
+                date_from__lte=dt.date(year, 12, 31),
+                date_until__gte=dt.date(year, 1, 1),
+            ).order_by("-date_from")
+        )
+        for employment in employments:
+            months[employment.user_id]["employments"].add(employment)
+
+        year_absences = list(
+            Absence.objects.filter(
+                user__in=months.users_with_wtm, starts_on__year=year
+            ).order_by("starts_on")
+        )
+        for absence in year_absences:
+            absences[absence.user_id]["absence_%s" % absence.reason].append(absence)
+
+        if missing:
+            vacation_days_credit.update(
+                _compute_months(
+                    year,
+                    months=months,
+                    users=missing,
+                    employments=employments,
+                    absences=year_absences,
+                )
+            )
+            AnnualWorkingTimeSnapshot.objects.bulk_create(
+                [
+                    AnnualWorkingTimeSnapshot(
+                        user_id=user.id,
+                        year=year,
+                        data={
+                            **{
+                                field: [str(value) for value in months[user.id][field]]
+                                for field in MONTHLY_FIELDS
+                            },
+                            "vacation_days_credit": str(vacation_days_credit[user.id]),
+                        },
+                    )
+                    for user in missing
+                ],
+                ignore_conflicts=True,
+            )
 
     def absences_time(data):
         return [
@@ -5,8 +5,12 @@ from django.core.exceptions import ValidationError
 from django.test import TestCase
 
 from workbench import factories
-from workbench.awt.models import Absence, Employment
-from workbench.awt.reporting import active_users, annual_working_time
+from workbench.awt.models import Absence, AnnualWorkingTimeSnapshot, Employment
+from workbench.awt.reporting import (
+    active_users,
+    annual_working_time,
+    full_time_equivalents_by_month,
+)
 from workbench.awt.utils import monthly_days
 from workbench.tools.forms import WarningsForm
 from workbench.tools.testing import check_code, messages
@@ -133,6 +137,81 @@ class AWTTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response["content-type"], "application/pdf")
 
+    def test_working_time_snapshots(self):
+        """Annual working time figures are cached and invalidated by triggers"""
+        service = factories.ServiceFactory.create()
+        user = service.project.owned_by
+        factories.YearFactory.create(
+            year=2018, working_time_model=user.working_time_model
+        )
+        user.employments.create(
+            date_from=dt.date(2018, 1, 1), percentage=80, vacation_weeks=5
+        )
+        user.absences.create(starts_on=dt.date(2018, 4, 1), days=5, reason="vacation")
+
+        def snapshots():
+            return AnnualWorkingTimeSnapshot.objects.filter(user=user, year=2018)
+
+        def totals():
+            return annual_working_time(2018, users=[user])["statistics"][0]["totals"]
+
+        self.assertEqual(snapshots().count(), 0)
+        first = totals()
+        self.assertEqual(snapshots().count(), 1)
+
+        with self.assertNumQueries(4):
+            self.assertEqual(totals(), first)
+
+        user.loggedhours.create(
+            service=service,
+            created_by=user,
+            hours=10,
+            description="anything",
+            rendered_on=dt.date(2018, 2, 1),
+        )
+        self.assertEqual(snapshots().count(), 0)
+        self.assertAlmostEqual(totals()["hours"], Decimal("10"))
+        self.assertEqual(snapshots().count(), 1)
+
+        user.absences.create(starts_on=dt.date(2018, 5, 1), days=2, reason="other")
+        self.assertEqual(snapshots().count(), 0)
+        self.assertAlmostEqual(totals()["absence_other"], Decimal("2"))
+
+        user.employments.update(percentage=100)
+        self.assertEqual(snapshots().count(), 0)
+        self.assertAlmostEqual(totals()["percentage"], Decimal("100"))
+
+    def test_full_time_equivalents(self):
+        """Full time equivalents per month are maintained by a trigger"""
+        user = factories.UserFactory.create()
+        employment = user.employments.create(
+            date_from=dt.date(2018, 1, 1), percentage=100, vacation_weeks=5
+        )
+        factories.UserFactory.create().employments.create(
+            date_from=dt.date(2018, 1, 17), percentage=50, vacation_weeks=5
+        )
+
+        fte = full_time_equivalents_by_month(
+            [dt.date(2017, 12, 1), dt.date(2018, 2, 28)]
+        )
+        self.assertEqual(len(fte), 2)
+        self.assertAlmostEqual(
+            fte[dt.date(2018, 1, 1)], Decimal(1 + 0.5 * 15 / 31), places=5
+        )
+        self.assertAlmostEqual(fte[dt.date(2018, 2, 1)], Decimal("1.5"))
+        self.assertEqual(fte[dt.date(2017, 12, 1)], 0)
+
+        employment.date_until = dt.date(2018, 1, 31)
+        employment.save()
+        fte = full_time_equivalents_by_month()
+        self.assertAlmostEqual(
+            fte[dt.date(2018, 1, 1)], Decimal(1 + 0.5 * 15 / 31), places=5
+        )
+        self.assertAlmostEqual(fte[dt.date(2018, 2, 1)], Decimal("0.5"))
+
+        Employment.objects.all().delete()
+        self.assertEqual(full_time_equivalents_by_month(), {})
+
     def test_admin_list(self):
         """The admin changelist of years contains the calculated sum of working days"""
         self.client.force_login(factories.UserFactory.create(is_admin=True))
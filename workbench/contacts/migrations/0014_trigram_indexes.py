@@ -0,0 +1,23 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+from workbench.tools import search
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contacts", "0013_organization_is_archived"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunSQL(
+            search.trigram("contacts_organization", ["name"]),
+            "DROP INDEX IF EXISTS contacts_organization_trgm_index;",
+        ),
+        migrations.RunSQL(
+            search.trigram("contacts_person", ["given_name", "family_name"]),
+            "DROP INDEX IF EXISTS contacts_person_trgm_index;",
+        ),
+    ]
@@ -3,7 +3,6 @@ import re
 from urllib.parse import urlencode
 
 from django.db import models
-from django.db.models import Sum
 from django.utils.functional import cached_property
 from django.utils.translation import gettext, gettext_lazy as _
 
@@ -11,7 +10,6 @@ import phonenumbers
 from django_countries.fields import CountryField
 
 from workbench.accounts.models import User
-from workbench.tools.formats import Z2
 from workbench.tools.models import Model, SearchQuerySet
 from workbench.tools.urls import model_urls
 from workbench.tools.validation import raise_if_errors
@@ -62,6 +60,7 @@ class Organization(Model):
     groups = models.ManyToManyField(Group, verbose_name=_("groups"), blank=True)
 
     objects = OrganizationQuerySet.as_manager()
+    trigram_fields = ["name"]
 
     class Meta:
         ordering = ("name",)
@@ -93,28 +92,12 @@ class Organization(Model):
 
     @cached_property
     def statistics(self):
-        from workbench.reporting.project_budget_statistics import (
-            project_budget_statistics,
-        )
-
-        pbs = project_budget_statistics(self.project_set.all())["overall"]
-
-        invoices = (
-            self.invoice_set.invoiced()
-            .filter(project__isnull=True)
-            .order_by()
-            .aggregate(Sum("total_excl_tax"), Sum("third_party_costs"))
-        )
+        from workbench.reporting.models import CustomerStatistics
 
-        pbs["invoiced"] += invoices["total_excl_tax__sum"] or Z2
-        pbs["third_party_costs"] += invoices["third_party_costs__sum"] or Z2
-
-        pbs["gross_margin_per_hour"] = (
-            (pbs["invoiced"] - pbs["third_party_costs"]) / pbs["hours"]
-            if pbs["hours"]
-            else None
-        )
-        return pbs
+        try:
+            return CustomerStatistics.objects.get(customer=self)
+        except CustomerStatistics.DoesNotExist:
+            return CustomerStatistics(customer=self)
 
 
 class PersonQuerySet(SearchQuerySet):
@@ -162,6 +145,7 @@ class Person(Model):
     _fts = models.TextField(editable=False, blank=True)
 
     objects = PersonQuerySet.as_manager()
+    trigram_fields = ["given_name", "family_name"]
 
     class Meta:
         ordering = ["given_name", "family_name"]
@@ -1,10 +1,11 @@
 import datetime as dt
-import re
+from itertools import islice
 
 from django import forms
 from django.utils.html import format_html, mark_safe
 from django.utils.translation import gettext, gettext_lazy as _
 
+from workbench.credit_control.matching import match_entries
 from workbench.credit_control.models import CreditEntry, Ledger
 from workbench.invoices.models import Invoice
 from workbench.tools.formats import currency, local_date_format
@@ -74,9 +75,20 @@ class CreditEntryForm(ModelForm):
         return instance
 
 
+IMPORT_BATCH_SIZE = 1000
+
+
 class AccountStatementUploadForm(Form):
     ledger = CreditEntry._meta.get_field("ledger").formfield(widget=forms.RadioSelect)
     statement = forms.FileField(label=_("Account statement"))
+    assign_unambiguous = forms.BooleanField(
+        label=_("Assign unambiguous matches"),
+        help_text=_(
+            "Assign new credit entries to open invoices automatically if"
+            " exactly one invoice matches both the amount and the code."
+        ),
+        required=False,
+    )
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -84,11 +96,35 @@ class AccountStatementUploadForm(Form):
             (ledger.id, str(ledger)) for ledger in Ledger.objects.all()
         ]
 
+    def statement_entries(self):
+        """
+        Yield batches of entries from the uploaded statement
+        """
+        self.cleaned_data["statement"].seek(0)
+        entries = self.cleaned_data["ledger"].parse_fn(
+            self.cleaned_data["statement"].file
+        )
+        while True:
+            batch = list(islice(entries, IMPORT_BATCH_SIZE))
+            if not batch:
+                break
+            yield batch
+
     def clean(self):
         data = super().clean()
         if data.get("statement") and data.get("ledger"):
             try:
-                self.statement_list = data["ledger"].parse_fn(data["statement"].read())
+                known_payments = any_entries = False
+                for batch in self.statement_entries():
+                    any_entries = True
+                    if CreditEntry.objects.filter(
+                        ledger=data["ledger"],
+                        reference_number__in=[
+                            entry["reference_number"] for entry in batch
+                        ],
+                    ).exists():
+                        known_payments = True
+                        break
             except Exception as exc:
                 raise forms.ValidationError(
                     _(
@@ -98,16 +134,7 @@ class AccountStatementUploadForm(Form):
                     % exc
                 )
 
-            reference_numbers = [
-                entry["reference_number"] for entry in self.statement_list
-            ]
-
-            if (
-                reference_numbers
-                and not CreditEntry.objects.filter(
-                    ledger=data["ledger"], reference_number__in=reference_numbers
-                ).exists()
-            ):
+            if any_entries and not known_payments:
                 self.add_warning(
                     _(
                         "The uploaded list only contains new payments."
@@ -120,26 +147,41 @@ class AccountStatementUploadForm(Form):
         return data
 
     def save(self):
-        created_entries = []
         ledger = self.cleaned_data["ledger"]
         newest = ledger.transactions.order_by("-value_date").first()
         newest_date = newest.value_date if newest else dt.date.min
+        # Credit entries with a value date earlier than the latest existing
+        # credit entry are skipped, entries of the same day are allowed (!)
+        # Reference numbers are unique across all ledgers, so all remaining
+        # entries are checked against all existing credit entries.
+        known = set()
 
-        for data in reversed(self.statement_list):  # From past to present
-            if data["value_date"] < newest_date:
-                # Skip credit entries with a value date earlier than the latest
-                # existing credit entry. Credit entries of the same day are
-                # allowed (!)
-                continue
-
-            reference_number = data.pop("reference_number")
+        new_entries = []
+        for batch in self.statement_entries():
+            batch = [data for data in batch if data["value_date"] >= newest_date]
+            known |= set(
+                CreditEntry.objects.filter(
+                    reference_number__in=[data["reference_number"] for data in batch]
+                ).values_list("reference_number", flat=True)
+            )
+            for data in batch:
+                if data["reference_number"] in known:
+                    continue
+                known.add(data["reference_number"])
+                entry = CreditEntry(ledger=ledger, **data)
+                entry._update_fts()
+                new_entries.append(entry)
 
-            c, created = ledger.transactions.get_or_create(
-                reference_number=reference_number, defaults=data
+        # Statements list the newest entries first, insert from past to present
+        new_entries.reverse()
+        CreditEntry.objects.bulk_create(
+            new_entries, batch_size=IMPORT_BATCH_SIZE, ignore_conflicts=True
+        )
+        return list(
+            ledger.transactions.filter(
+                reference_number__in=[entry.reference_number for entry in new_entries]
             )
-            if created:
-                created_entries.append(c)
-        return created_entries
+        )
 
 
 class AssignCreditEntriesForm(forms.Form):
@@ -149,9 +191,10 @@ class AssignCreditEntriesForm(forms.Form):
         super().__init__(*args, **kwargs)
 
         self.entries = []
-        for entry in CreditEntry.objects.reverse().filter(
-            invoice__isnull=True, notes=""
-        )[:20]:
+        entries = list(
+            CreditEntry.objects.reverse().filter(invoice__isnull=True, notes="")[:20]
+        )
+        for entry, candidates in match_entries(entries).items():
             self.fields["entry_{}_invoice".format(entry.pk)] = forms.TypedChoiceField(
                 label=format_html(
                     '<a href="{}" target="_blank">{}, {}: {}</a>',
@@ -163,57 +206,53 @@ class AssignCreditEntriesForm(forms.Form):
                 choices=[(None, "----------")]
                 + [
                     (
-                        invoice.id,
+                        candidate.invoice.id,
                         mark_safe(
                             " ".join(
                                 (
                                     format_html(
-                                        '<span title="{}">', invoice.description
+                                        '<span title="{}">',
+                                        candidate.invoice.description,
                                     ),
                                     format_html(
                                         "<strong>{}</strong>"
-                                        if re.search(
-                                            r"\b" + invoice.code + r"\b",
-                                            entry.payment_notice,
-                                        )
+                                        if candidate.code_matches
                                         else "{}",
-                                        invoice,
+                                        candidate.invoice,
                                     ),
-                                    invoice.status_badge,
+                                    candidate.invoice.status_badge,
                                     "<br>",
                                     format_html(
                                         "{}",
-                                        invoice.contact.name_with_organization
-                                        if invoice.contact
-                                        else invoice.customer,
+                                        candidate.invoice.contact.name_with_organization
+                                        if candidate.invoice.contact
+                                        else candidate.invoice.customer,
                                     ),
                                     "<br>",
                                     format_html(
                                         "{} {}",
                                         _("invoiced on"),
-                                        local_date_format(invoice.invoiced_on),
+                                        local_date_format(
+                                            candidate.invoice.invoiced_on
+                                        ),
                                     )
-                                    if invoice.invoiced_on
+                                    if candidate.invoice.invoiced_on
                                     else gettext("NO DATE YET"),
                                     "<br>",
-                                    currency(invoice.total),
+                                    currency(candidate.invoice.total),
                                     format_html(
                                         "<br><span style='color:darkred'>{}: {}</span>",
                                         _("third party costs"),
-                                        currency(invoice.third_party_costs),
+                                        currency(candidate.invoice.third_party_costs),
                                     )
-                                    if invoice.third_party_costs
+                                    if candidate.invoice.third_party_costs
                                     else "",
                                     "</span>",
                                 )
                             )
                         ),
                     )
-                    for invoice in Invoice.objects.open()
-                    .filter(total=entry.total)
-                    .select_related(
-                        "contact__organization", "customer", "owned_by", "project"
-                    )[:100]
+                    for candidate in candidates
                 ],
                 coerce=int,
                 required=False,
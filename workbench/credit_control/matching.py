@@ -0,0 +1,120 @@
+import re
+from collections import defaultdict, namedtuple
+
+from django.db import transaction
+
+from workbench.invoices.models import Invoice
+
+
+AMOUNT_SCORE = 50
+CODE_SCORE = 40
+DATE_SCORE = 10
+DATE_SCORE_DAYS = 90
+
+CODE_RE = re.compile(r"\d+(?:-\d+)*")
+
+
+Candidate = namedtuple("Candidate", "invoice score amount_matches code_matches")
+
+
+def notice_codes(payment_notice):
+    """
+    Return all strings in the payment notice which could be invoice codes,
+    that is all runs of digits and of digit groups separated by hyphens
+    """
+    codes = set()
+    for match in CODE_RE.findall(payment_notice):
+        parts = match.split("-")
+        codes.update(
+            "-".join(parts[start:end])
+            for start in range(len(parts))
+            for end in range(start + 1, len(parts) + 1)
+        )
+    return codes
+
+
+def _candidate(entry, invoice, *, code_matches):
+    amount_matches = invoice.total == entry.total
+    score = (AMOUNT_SCORE if amount_matches else 0) + (
+        CODE_SCORE if code_matches else 0
+    )
+    if invoice.invoiced_on:
+        days = abs((entry.value_date - invoice.invoiced_on).days)
+        score += DATE_SCORE * max(0, 1 - days / DATE_SCORE_DAYS)
+    return Candidate(invoice, score, amount_matches, code_matches)
+
+
+def match_entries(entries, *, invoices=None, limit=100):
+    """
+    Return a ``{entry: [candidates]}`` dictionary containing invoice
+    candidates for all credit entries, best matches first
+
+    Open invoices are loaded once and indexed by total and by code.
+    Candidates either have the same total as the credit entry or their code
+    appears in the payment notice. Invoices issued close to the value date of
+    the credit entry get a better score.
+    """
+    if invoices is None:
+        invoices = Invoice.objects.open().select_related(
+            "contact__organization", "customer", "owned_by", "project"
+        )
+
+    by_total = defaultdict(list)
+    by_code = {}
+    for invoice in invoices:
+        by_total[invoice.total].append(invoice)
+        by_code[invoice.code] = invoice
+
+    matches = {}
+    for entry in entries:
+        coded = {
+            by_code[code].pk: by_code[code]
+            for code in notice_codes(entry.payment_notice)
+            if code in by_code
+        }
+        candidates = {invoice.pk: invoice for invoice in by_total[entry.total]}
+        candidates.update(coded)
+        matches[entry] = sorted(
+            (
+                _candidate(entry, invoice, code_matches=invoice.pk in coded)
+                for invoice in candidates.values()
+            ),
+            key=lambda candidate: (-candidate.score, candidate.invoice.pk),
+        )[:limit]
+    return matches
+
+
+def unambiguous_matches(matches):
+    """
+    Return a ``{entry: invoice}`` dictionary of credit entries where exactly
+    one invoice matches both amount and code, and where no other credit entry
+    claims the same invoice
+    """
+    claimed = {}
+    for entry, candidates in matches.items():
+        exact = [c for c in candidates if c.amount_matches and c.code_matches]
+        if len(exact) == 1:
+            claimed.setdefault(exact[0].invoice, []).append(entry)
+    return {
+        entries[0]: invoice for invoice, entries in claimed.items() if len(entries) == 1
+    }
+
+
+def assign_unambiguous(entries):
+    """
+    Assign credit entries to invoices where the match is unambiguous and
+    mark those invoices as paid. Returns the list of assigned credit entries.
+    """
+    assigned = unambiguous_matches(
+        match_entries([entry for entry in entries if not entry.invoice_id])
+    )
+    with transaction.atomic():
+        for entry, invoice in assigned.items():
+            entry.invoice = invoice
+            entry.save()
+
+            invoice.status = invoice.PAID
+            invoice.closed_on = entry.value_date
+            invoice.payment_notice = entry.payment_notice
+            invoice.save()
+    return list(assigned)
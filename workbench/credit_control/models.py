@@ -29,8 +29,8 @@ class Ledger(Model):
     @property
     def parse_fn(self):
         return {
-            "zkb-csv": parsers.parse_zkb_csv,
-            "postfinance-csv": parsers.parse_postfinance_csv,
+            "zkb-csv": parsers.iter_zkb_csv,
+            "postfinance-csv": parsers.iter_postfinance_csv,
         }[self.parser]
 
 
@@ -78,7 +78,10 @@ class CreditEntry(Model):
         return self.reference_number
 
     def save(self, *args, **kwargs):
-        self._fts = " ".join(str(part) for part in [self.invoice or "", self.total])
+        self._update_fts()
         super().save(*args, **kwargs)
 
     save.alters_data = True
+
+    def _update_fts(self):
+        self._fts = " ".join(str(part) for part in [self.invoice or "", self.total])
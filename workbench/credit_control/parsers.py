@@ -6,24 +6,29 @@ import re
 from decimal import Decimal
 
 from django.utils.dateparse import parse_date
-from django.utils.encoding import force_str
+from django.utils.encoding import force_bytes
 from django.utils.text import slugify
 
 
-def parse_zkb_csv(data):
-    f = io.StringIO()
-    f.write(force_str(data, encoding="utf-8", errors="ignore"))
-    f.seek(0)
-    dialect = csv.Sniffer().sniff(f.read(4096))
-    f.seek(0)
-    reader = csv.reader(f, dialect)
+def _csv_reader(file, *, encoding):
+    """
+    Yield rows of the CSV file without reading it into memory at once
+    """
+    # Only split lines on \n, the csv module rejects stray \r characters so
+    # that binary files are not silently accepted as empty statements
+    f = io.TextIOWrapper(file, encoding=encoding, errors="ignore", newline="\n")
+    try:
+        dialect = csv.Sniffer().sniff(f.read(4096))
+        f.seek(0)
+        yield from csv.reader(f, dialect)
+    finally:
+        f.detach()
+
+
+def iter_zkb_csv(file):
+    reader = _csv_reader(file, encoding="utf-8")
     next(reader)  # Skip first line
-    entries = []
-    while True:
-        try:
-            row = next(reader)
-        except StopIteration:
-            break
+    for row in reader:
         if not row:
             continue
         try:
@@ -34,17 +39,18 @@ def parse_zkb_csv(data):
             continue
         if day and amount:
             details = next(reader)
-            entries.append(
-                {
-                    "reference_number": reference,
-                    "value_date": day,
-                    "total": amount,
-                    "payment_notice": "; ".join(
-                        filter(None, (details[1], details[10], row[4]))
-                    ),
-                }
-            )
-    return entries
+            yield {
+                "reference_number": reference,
+                "value_date": day,
+                "total": amount,
+                "payment_notice": "; ".join(
+                    filter(None, (details[1], details[10], row[4]))
+                ),
+            }
+
+
+def parse_zkb_csv(data):
+    return list(iter_zkb_csv(io.BytesIO(force_bytes(data))))
 
 
 def postfinance_preprocess_notice(payment_notice):
@@ -68,15 +74,9 @@ def postfinance_reference_number(payment_notice, day):
     )
 
 
-def parse_postfinance_csv(data):
-    f = io.StringIO()
-    f.write(force_str(data, encoding="latin-1", errors="ignore"))
-    f.seek(0)
-    dialect = csv.Sniffer().sniff(f.read(4096))
-    f.seek(0)
-    reader = csv.reader(f, dialect)
+def iter_postfinance_csv(file):
+    reader = _csv_reader(file, encoding="latin-1")
     next(reader)  # Skip first line
-    entries = []
     for row in reader:
         if not row:
             continue
@@ -88,12 +88,13 @@ def parse_postfinance_csv(data):
             continue
 
         payment_notice = postfinance_preprocess_notice(row[1])
-        entries.append(
-            {
-                "reference_number": postfinance_reference_number(payment_notice, day),
-                "value_date": day,
-                "total": Decimal(row[2]),
-                "payment_notice": payment_notice,
-            }
-        )
-    return entries
+        yield {
+            "reference_number": postfinance_reference_number(payment_notice, day),
+            "value_date": day,
+            "total": Decimal(row[2]),
+            "payment_notice": payment_notice,
+        }
+
+
+def parse_postfinance_csv(data):
+    return list(iter_postfinance_csv(io.BytesIO(force_bytes(data))))
@@ -1,6 +1,10 @@
 import io
+import multiprocessing
+import os
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
 
+import django
 from django.conf import settings
 from django.utils.text import slugify
 from django.utils.translation import activate, gettext as _
@@ -11,83 +15,119 @@ from workbench.tools.pdf import PDFDocument
 from workbench.tools.xlsx import WorkbenchXLSXDocument
 
 
-def append_invoice(*, zf, ledger_slug, invoice):
+def _init_worker(language):
+    django.setup()
+    activate(language)
+
+
+def _render_invoice(job):
+    name, invoice = job
     with io.BytesIO() as buf:
         pdf = PDFDocument(buf)
         pdf.init_letter()
         pdf.process_invoice(invoice)
         pdf.generate()
+        return name, buf.getvalue()
 
-        zf.writestr(
-            "%s-%s/%s.pdf"
-            % (ledger_slug, invoice.closed_on.strftime("%Y.%m"), invoice.code),
-            buf.getvalue(),
-        )
 
+def _render_invoices(jobs, *, processes):
+    if processes == 1:
+        yield from map(_render_invoice, jobs)
+        return
 
-def paid_debtors_zip(date_range, *, file):
-    activate(settings.WORKBENCH.PDF_LANGUAGE)
-    xlsx = WorkbenchXLSXDocument()
+    # Spawn fresh processes instead of forking, forked children would
+    # share the database connection of the parent.
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(settings.WORKBENCH.PDF_LANGUAGE,),
+    ) as executor:
+        yield from executor.map(_render_invoice, jobs, chunksize=4)
 
-    with zipfile.ZipFile(file, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-        for ledger in Ledger.objects.all():
-            rows = []
-            for entry in (
-                CreditEntry.objects.filter(ledger=ledger, value_date__range=date_range)
-                .order_by("value_date")
-                .select_related("invoice__project", "invoice__owned_by")
-            ):
-                rows.append(
-                    (
-                        entry.value_date,
-                        entry.total,
-                        entry.payment_notice,
-                        entry.invoice,
-                        entry.notes,
-                    )
-                )
 
-                if entry.invoice:
-                    append_invoice(
-                        zf=zf,
-                        ledger_slug=slugify(ledger.name),
-                        invoice=entry.invoice,
-                    )
+def _pdf_name(ledger_slug, invoice):
+    return "%s-%s/%s.pdf" % (
+        ledger_slug,
+        invoice.closed_on.strftime("%Y.%m"),
+        invoice.code,
+    )
 
-            xlsx.add_sheet(slugify(ledger.name))
-            xlsx.table(
-                (
-                    _("value date"),
-                    _("total"),
-                    _("payment notice"),
-                    _("invoice"),
-                    _("notes"),
-                ),
-                rows,
-            )
 
+def paid_debtors_zip(date_range, *, file, processes=None, progress=None):
+    """
+    Write a ZIP file containing the PDFs of all invoices paid in the given
+    date range and an XLSX overview
+
+    PDFs are rendered by a pool of ``processes`` worker processes (defaults
+    to the number of CPUs) and written as they are completed. ``progress``
+    is called with the number of rendered and total PDFs after each PDF.
+    """
+    activate(settings.WORKBENCH.PDF_LANGUAGE)
+    xlsx = WorkbenchXLSXDocument()
+    jobs = []
+
+    for ledger in Ledger.objects.all():
         rows = []
-        for invoice in (
-            Invoice.objects.filter(closed_on__range=date_range, status=Invoice.PAID)
-            .exclude(
-                pk__in=CreditEntry.objects.filter(invoice__isnull=False).values(
-                    "invoice"
-                )
+        for entry in (
+            CreditEntry.objects.filter(ledger=ledger, value_date__range=date_range)
+            .order_by("value_date")
+            .select_related("invoice__project", "invoice__owned_by")
+            .prefetch_related(
+                "invoice__services", "invoice__down_payment_invoices__project"
             )
-            .order_by("closed_on")
-            .select_related("project")
         ):
             rows.append(
-                (invoice.closed_on, invoice.total, invoice.payment_notice, invoice)
+                (
+                    entry.value_date,
+                    entry.total,
+                    entry.payment_notice,
+                    entry.invoice,
+                    entry.notes,
+                )
             )
 
-            append_invoice(zf=zf, ledger_slug="unknown", invoice=invoice)
+            if entry.invoice:
+                jobs.append(
+                    (_pdf_name(slugify(ledger.name), entry.invoice), entry.invoice)
+                )
 
-        xlsx.add_sheet("unknown")
+        xlsx.add_sheet(slugify(ledger.name))
         xlsx.table(
-            (_("closed on"), _("total"), _("payment notice"), _("invoice")), rows
+            (
+                _("value date"),
+                _("total"),
+                _("payment notice"),
+                _("invoice"),
+                _("notes"),
+            ),
+            rows,
         )
 
+    rows = []
+    for invoice in (
+        Invoice.objects.filter(closed_on__range=date_range, status=Invoice.PAID)
+        .exclude(
+            pk__in=CreditEntry.objects.filter(invoice__isnull=False).values("invoice")
+        )
+        .order_by("closed_on")
+        .select_related("project", "owned_by")
+        .prefetch_related("services", "down_payment_invoices__project")
+    ):
+        rows.append((invoice.closed_on, invoice.total, invoice.payment_notice, invoice))
+        jobs.append((_pdf_name("unknown", invoice), invoice))
+
+    xlsx.add_sheet("unknown")
+    xlsx.table((_("closed on"), _("total"), _("payment notice"), _("invoice")), rows)
+
+    with zipfile.ZipFile(file, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for index, (name, content) in enumerate(
+            _render_invoices(jobs, processes=processes or os.cpu_count()), 1
+        ):
+            zf.writestr(name, content)
+            if progress:
+                progress(index, len(jobs))
+
         with io.BytesIO() as buf:
             xlsx.workbook.save(buf)
             zf.writestr("debtors.xlsx", buf.getvalue())
@@ -1,18 +1,28 @@
 import datetime as dt
 import io
 import os
+import zipfile
 from decimal import Decimal
 
 from django.conf import settings
+from django.db import connections
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from workbench import factories
+from workbench.credit_control.matching import (
+    assign_unambiguous,
+    match_entries,
+    notice_codes,
+)
 from workbench.credit_control.models import CreditEntry
 from workbench.credit_control.parsers import (
     parse_postfinance_csv,
     postfinance_preprocess_notice,
     postfinance_reference_number,
 )
+from workbench.credit_control.reporting import paid_debtors_zip
+from workbench.invoices.models import Invoice
 from workbench.tools.forms import WarningsForm
 from workbench.tools.testing import check_code, messages
 
@@ -60,6 +70,44 @@ class CreditEntriesTest(TestCase):
             ],
         )
 
+    def test_matching(self):
+        """Credit entries are matched against all open invoices at once"""
+        i1, i2, i3 = [
+            factories.InvoiceFactory.create(subtotal=subtotal, liable_to_vat=False)
+            for subtotal in [100, 100, 50]
+        ]
+        self.assertEqual([i1.code, i2.code, i3.code], ["00001", "00002", "00003"])
+
+        e1 = factories.CreditEntryFactory.create(total=100, payment_notice="RG 00001")
+        e2 = factories.CreditEntryFactory.create(total=100)
+        e3 = factories.CreditEntryFactory.create(total=40, payment_notice="00003")
+        e4 = factories.CreditEntryFactory.create(total=100, payment_notice="00002")
+        e5 = factories.CreditEntryFactory.create(total=100, payment_notice="00002")
+
+        with self.assertNumQueries(1):
+            matches = match_entries([e1, e2, e3, e4, e5])
+
+        self.assertEqual([c.invoice for c in matches[e1]], [i1, i2])
+        self.assertEqual(
+            [(c.amount_matches, c.code_matches) for c in matches[e1]],
+            [(True, True), (True, False)],
+        )
+        self.assertEqual([c.invoice for c in matches[e2]], [i1, i2])
+        self.assertEqual([c.invoice for c in matches[e3]], [i3])
+        self.assertEqual([c.invoice for c in matches[e4]], [i2, i1])
+
+        self.assertEqual(assign_unambiguous([e1, e2, e3, e4, e5]), [e1])
+        e1.refresh_from_db()
+        i1.refresh_from_db()
+        self.assertEqual(e1.invoice, i1)
+        self.assertEqual(i1.status, i1.PAID)
+        self.assertEqual(i1.closed_on, e1.value_date)
+
+        self.assertEqual(
+            notice_codes("Rechnung 2020-0012-0003, x"),
+            {"2020", "0012", "0003", "2020-0012", "0012-0003", "2020-0012-0003"},
+        )
+
     def test_account_statement_upload(self):
         """Uploading account statements with and without duplicates"""
         self.client.force_login(factories.UserFactory.create())
@@ -119,6 +167,89 @@ class CreditEntriesTest(TestCase):
         self.assertEqual(invoice.status, invoice.PAID)
         self.assertEqual(invoice.closed_on, entry.value_date)
 
+    def test_large_account_statement_upload(self):
+        """Account statements are imported in batches without duplicates"""
+        self.client.force_login(factories.UserFactory.create())
+        ledger = factories.LedgerFactory.create(parser="postfinance-csv")
+
+        rows = [
+            "{day};Payment {i} 190101CH{i:08d};{total}.00;;{day};".format(
+                day=dt.date(2019, 1, 1) + dt.timedelta(days=i // 10),
+                i=i,
+                total=100 + i,
+            )
+            for i in range(2500)
+        ]
+        rows.append(rows[-1])  # Duplicate row
+        statement = "\n".join(
+            ["Entry type:;All bookings", "Booking date;Text;Credit;Debit;Value;"]
+            + rows[::-1]
+        ).encode("latin-1")
+
+        def send():
+            f = io.BytesIO(statement)
+            f.name = "statement.csv"
+            return self.client.post(
+                "/credit-control/upload/",
+                {
+                    "statement": f,
+                    "ledger": ledger.pk,
+                    WarningsForm.ignore_warnings_id: "no-known-payments",
+                },
+            )
+
+        with CaptureQueriesContext(connections["default"]) as context:
+            response = send()
+        # The number of queries depends on the number of batches, not rows
+        self.assertLess(len(context), 20)
+        self.assertRedirects(response, "/credit-control/")
+        self.assertEqual(messages(response), ["Created 2500 credit entries."])
+
+        entries = list(ledger.transactions.all())
+        self.assertEqual(entries[0].reference_number, "pf-190101CH00002499")
+        self.assertEqual(entries[-1].reference_number, "pf-190101CH00000000")
+
+        response = send()
+        self.assertEqual(messages(response), ["Created 0 credit entries."])
+
+    def test_statement_upload_known_reference_number(self):
+        """Entries with known reference numbers are neither created nor returned"""
+        self.client.force_login(factories.UserFactory.create())
+        ledger = factories.LedgerFactory.create(parser="postfinance-csv")
+        # Same reference number as the second row below, but an older date
+        CreditEntry.objects.create(
+            ledger=ledger,
+            reference_number="pf-190101CH00000001",
+            value_date=dt.date(2018, 12, 1),
+            total=101,
+        )
+        CreditEntry.objects.create(
+            ledger=ledger,
+            reference_number="pf-181231CH00000000",
+            value_date=dt.date(2018, 12, 31),
+            total=10,
+        )
+
+        statement = "\n".join(
+            ["Entry type:;All bookings", "Booking date;Text;Credit;Debit;Value;"]
+            + [
+                "2019-01-01;Payment {i} 190101CH{i:08d};{total}.00;;2019-01-01;".format(
+                    i=i, total=100 + i
+                )
+                # The CSV sniffer needs a few rows to determine the delimiter
+                for i in range(30)
+            ]
+        ).encode("latin-1")
+        f = io.BytesIO(statement)
+        f.name = "statement.csv"
+        response = self.client.post(
+            "/credit-control/upload/",
+            {"statement": f, "ledger": ledger.pk, "assign_unambiguous": True},
+        )
+        self.assertRedirects(response, "/credit-control/")
+        self.assertEqual(messages(response)[0], "Created 29 credit entries.")
+        self.assertEqual(CreditEntry.objects.count(), 31)
+
     def test_list(self):
         """Filter form validation"""
         self.client.force_login(factories.UserFactory.create())
@@ -211,3 +342,40 @@ class CreditEntriesTest(TestCase):
             )
 
         self.assertContains(response, "Error while parsing the statement.")
+
+    def test_paid_debtors_zip(self):
+        """The debtors export contains PDFs of all paid invoices"""
+        kwargs = {
+            "subtotal": 20,
+            "invoiced_on": dt.date.today(),
+            "due_on": dt.date.today(),
+            "closed_on": dt.date.today(),
+            "status": Invoice.PAID,
+            "postal_address": "Test\nStreet\nCity",
+        }
+        invoice = factories.InvoiceFactory.create(**kwargs)
+        unknown = factories.InvoiceFactory.create(**kwargs)
+        factories.CreditEntryFactory.create(invoice=invoice)
+
+        calls = []
+        with io.BytesIO() as buf:
+            with self.assertNumQueries(8):
+                paid_debtors_zip(
+                    [dt.date.today(), dt.date.today()],
+                    file=buf,
+                    processes=1,
+                    progress=lambda *args: calls.append(args),
+                )
+            with zipfile.ZipFile(buf) as zf:
+                names = sorted(zf.namelist())
+
+        month = dt.date.today().strftime("%Y.%m")
+        self.assertEqual(
+            names,
+            [
+                "bank-account-%s/%s.pdf" % (month, invoice.code),
+                "debtors.xlsx",
+                "unknown-%s/%s.pdf" % (month, unknown.code),
+            ],
+        )
+        self.assertEqual(calls, [(1, 2), (2, 2)])
@@ -4,6 +4,7 @@ from django.utils.translation import gettext as _, ngettext
 
 from workbench import generic
 from workbench.credit_control.forms import AssignCreditEntriesForm
+from workbench.credit_control.matching import assign_unambiguous
 
 
 class AccountStatementUploadView(generic.CreateView):
@@ -20,6 +21,17 @@ class AccountStatementUploadView(generic.CreateView):
             )
             % len(entries),
         )
+        if form.cleaned_data.get("assign_unambiguous"):
+            assigned = assign_unambiguous(entries)
+            messages.info(
+                self.request,
+                ngettext(
+                    "Assigned %s credit entry automatically.",
+                    "Assigned %s credit entries automatically.",
+                    len(assigned),
+                )
+                % len(assigned),
+            )
         return redirect("credit_control_creditentry_list")
 
 
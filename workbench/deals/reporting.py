@@ -1,60 +1,72 @@
 import datetime as dt
 from collections import defaultdict
+from itertools import chain
 
-from django.db.models import Prefetch
+from django.core.paginator import Paginator
+from django.db.models import Count, Prefetch, Q, Sum
+from django.db.models.functions import TruncMonth
 from django.utils import timezone
 
+from workbench.accounts.models import User
 from workbench.audit.models import LoggedAction
 from workbench.deals.models import Deal, Value, ValueType
 from workbench.tools.formats import Z2
 from workbench.tools.history import EVERYTHING, changes
 
 
-def accepted_deals(date_range, *, users=None):
-    queryset = (
-        Deal.objects.filter(status=Deal.ACCEPTED, closed_on__range=date_range)
-        .select_related("customer", "contact__organization", "owned_by")
-        .prefetch_related(
-            Prefetch("values", queryset=Value.objects.select_related("type"))
-        )
-        .order_by("closed_on")
-    )
+ACCEPTED_DEALS_PER_PAGE = 50
+
 
+def _accepted_deals(date_range, *, users=None):
+    queryset = Deal.objects.filter(status=Deal.ACCEPTED, closed_on__range=date_range)
     if users is not None:
         queryset = queryset.filter(owned_by__in=users)
+    return queryset
 
-    by_user = defaultdict(list)
-    by_month_and_valuetype = defaultdict(lambda: defaultdict(lambda: Z2))
-
-    valuetypes = set()
-
-    for deal in queryset:
-        by_user[deal.owned_by].append(deal)
 
-        month = deal.closed_on.replace(day=1)
-        for value in deal.values.all():
-            by_month_and_valuetype[month][value.type] += value.value
-            valuetypes.add(value.type)
+def accepted_deals(date_range, *, users=None):
+    """
+    Sums of accepted deals by month and value type and by user, aggregated
+    in the database. Use ``accepted_deals_for_user`` to list the deals.
+    """
+    deals = _accepted_deals(date_range, users=users)
 
+    by_month_and_valuetype = defaultdict(lambda: defaultdict(lambda: Z2))
+    for row in (
+        Value.objects.filter(deal__in=deals)
+        .order_by()
+        .annotate(month=TruncMonth("deal__closed_on"))
+        .values("month", "type")
+        .annotate(Sum("value"))
+    ):
+        by_month_and_valuetype[row["month"]][row["type"]] += row["value__sum"]
+
+    by_user = list(
+        deals.order_by()
+        .values("owned_by")
+        .annotate(count=Count("id"), sum=Sum("value"))
+    )
+    owners = User.objects.in_bulk([row["owned_by"] for row in by_user])
     deals = [
         {
-            "user": user,
-            "user_id": str(user.id),
-            "deals": deals,
-            "count": len(deals),
-            "sum": sum(deal.value for deal in deals),
+            "user": owners[row["owned_by"]],
+            "user_id": str(row["owned_by"]),
+            "count": row["count"],
+            "sum": row["sum"],
         }
-        for user, deals in by_user.items()
+        for row in by_user
     ]
 
-    valuetypes |= set(ValueType.objects.filter(weekly_target__isnull=False))
-    valuetypes = sorted(valuetypes)
+    type_ids = set(chain.from_iterable(by_month_and_valuetype.values()))
+    valuetypes = sorted(
+        ValueType.objects.filter(Q(id__in=type_ids) | Q(weekly_target__isnull=False))
+    )
     months = [
         {
             "month": month,
             "sum": sum(by_valuetype.values()),
             "values": [
-                {"type": type, "value": by_valuetype.get(type, Z2)}
+                {"type": type, "value": by_valuetype.get(type.id, Z2)}
                 for type in valuetypes
             ],
         }
@@ -69,7 +81,7 @@ def accepted_deals(date_range, *, users=None):
             {
                 "type": type,
                 "sum": sum(
-                    by_valuetype[type]
+                    by_valuetype[type.id]
                     for by_valuetype in by_month_and_valuetype.values()
                 ),
                 "target": type.weekly_target * date_range_length / 7
@@ -88,6 +100,19 @@ def accepted_deals(date_range, *, users=None):
     }
 
 
+def accepted_deals_for_user(date_range, *, user, users=None, page=None):
+    """
+    Return a page of the accepted deals of a single user
+    """
+    queryset = (
+        _accepted_deals(date_range, users=users)
+        .filter(owned_by=user)
+        .select_related("customer", "contact__organization", "owned_by", "closing_type")
+        .order_by("closed_on", "id")
+    )
+    return Paginator(queryset, ACCEPTED_DEALS_PER_PAGE).get_page(page)
+
+
 def declined_deals(date_range, *, users=None):
     queryset = (
         Deal.objects.filter(status=Deal.DECLINED, closed_on__range=date_range)
@@ -11,7 +11,7 @@ from time_machine import travel
 from workbench import factories
 from workbench.audit.models import LoggedAction
 from workbench.deals.models import Deal
-from workbench.deals.reporting import accepted_deals
+from workbench.deals.reporting import accepted_deals, accepted_deals_for_user
 from workbench.templatetags.workbench import deal_group
 from workbench.tools.formats import local_date_format
 from workbench.tools.validation import in_days
@@ -406,12 +406,62 @@ class DealsTest(TestCase):
         stats = accepted_deals([dt.date(2020, 1, 1), dt.date(2099, 1, 1)], users=[])
         self.assertEqual(stats["sum"], Decimal("0"))
 
+        response = self.client.get(
+            "/report/accepted-deals/deals/?date_from=2020-01-01"
+            "&date_until=2099-01-01&user={}".format(deal.owned_by_id)
+        )
+        self.assertContains(response, deal.title)
+
         response = self.client.get("/report/declined-deals/")
         self.assertContains(response, "Declined deals")
 
         response = self.client.get("/report/deal-history/")
         self.assertContains(response, "Deal history")
 
+    def test_accepted_deals_aggregates(self):
+        """Accepted deals are summed by month, value type and user in the database"""
+        vt1 = factories.ValueTypeFactory.create(position=1)
+        vt2 = factories.ValueTypeFactory.create(position=0, weekly_target=1000)
+        user = factories.UserFactory.create()
+        for closed_on, values, owned_by in [
+            (dt.date(2020, 1, 10), [(vt1, 100)], user),
+            (dt.date(2020, 1, 20), [(vt1, 200)], user),
+            (dt.date(2020, 3, 1), [(vt1, 50)], factories.UserFactory.create()),
+        ]:
+            deal = factories.DealFactory.create(
+                status=Deal.ACCEPTED, closed_on=closed_on, owned_by=owned_by
+            )
+            for type, value in values:
+                deal.values.create(type=type, value=value)
+            deal.save()
+
+        with self.assertNumQueries(4):
+            stats = accepted_deals([dt.date(2020, 1, 1), dt.date(2020, 3, 31)])
+
+        self.assertEqual(
+            [
+                (row["month"], row["sum"], [value["value"] for value in row["values"]])
+                for row in stats["by_month_and_valuetype"]
+            ],
+            [
+                (dt.date(2020, 1, 1), Decimal("300"), [Decimal("0"), Decimal("300")]),
+                (dt.date(2020, 3, 1), Decimal("50"), [Decimal("0"), Decimal("50")]),
+            ],
+        )
+        self.assertEqual(stats["valuetypes"], [vt2, vt1])
+        self.assertEqual(
+            [row["sum"] for row in stats["by_user"]],
+            [Decimal("300"), Decimal("50")],
+        )
+        self.assertEqual(stats["count"], 3)
+
+        deals = accepted_deals_for_user(
+            [dt.date(2020, 1, 1), dt.date(2020, 3, 31)],
+            user=user,
+        )
+        self.assertEqual(len(deals), 2)
+        self.assertFalse(deals.has_other_pages())
+
     def test_related_offers(self):
         """Offers can be linked to deals"""
         deal = factories.DealFactory.create()
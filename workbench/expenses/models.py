@@ -1,14 +1,14 @@
-import datetime as dt
+import time
+from decimal import Decimal
 
 from django.contrib import messages
 from django.db import models
-from django.db.models import Sum
+from django.db.models import Sum, signals
 from django.utils import timezone
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 
 from workbench.accounts.models import User
-from workbench.expenses.rates import exchange_rates
 from workbench.logbook.models import LoggedCost
 from workbench.tools.formats import Z2, currency, local_date_format
 from workbench.tools.models import Model, MoneyField
@@ -103,19 +103,31 @@ class ExpenseReport(Model):
 
 class ExchangeRatesQuerySet(models.QuerySet):
     def for_day(self, day):
-        try:
-            return self.get(day=day)
-        except self.model.DoesNotExist:
-            instance, created = self.update_or_create(
-                day=day, defaults={"rates": exchange_rates(day)}
-            )
-            return instance
+        """
+        Return the exchange rates of the day, or of the nearest previous day
+        with exchange rates, or ``None`` if there are none. Never hits the
+        network; rates are loaded by the fairy tasks and by
+        ``./manage.py backfill_exchange_rates``.
+        """
+        return self.filter(day__lte=day).order_by("-day").first()
 
     def newest(self):
-        try:
-            return self.latest()
-        except self.model.DoesNotExist:
-            return self.for_day(dt.date.today())
+        return self.order_by("-day").first()
+
+    def load(self, rates, *, batch_size=500):
+        """
+        Insert ``(day, rates)`` tuples, e.g. from one of the providers in
+        ``workbench.expenses.rates``. Days which already exist are skipped.
+        """
+        existing = set(self.values_list("day", flat=True))
+        instances = [
+            self.model(day=day, rates=data)
+            for day, data in rates
+            if day not in existing
+        ]
+        self.bulk_create(instances, batch_size=batch_size, ignore_conflicts=True)
+        clear_exchange_rate_cache()
+        return len(instances)
 
 
 class ExchangeRates(models.Model):
@@ -132,3 +144,38 @@ class ExchangeRates(models.Model):
 
     def __str__(self):
         return str(self.day)
+
+
+# Maps (day, currency) to (expires, rate). Other processes only see new rates
+# after the entries expire, so they must not live long. Misses aren't cached.
+_exchange_rate_cache = {}
+EXCHANGE_RATE_CACHE_SECONDS = 600
+
+
+def exchange_rate(day, currency):
+    """
+    Return the exchange rate of the currency relative to CHF on the given day
+    or ``None`` if it is unknown
+    """
+    now = time.monotonic()
+    cached = _exchange_rate_cache.get((day, currency))
+    if cached and cached[0] > now:
+        return cached[1]
+
+    rates = ExchangeRates.objects.for_day(day)
+    rate = rates and rates.rates.get("rates", {}).get(currency)
+    if not rate:
+        return None
+    if len(_exchange_rate_cache) >= 1024:
+        _exchange_rate_cache.clear()
+    rate = Decimal(str(rate))
+    _exchange_rate_cache[(day, currency)] = (now + EXCHANGE_RATE_CACHE_SECONDS, rate)
+    return rate
+
+
+def clear_exchange_rate_cache(**kwargs):
+    _exchange_rate_cache.clear()
+
+
+signals.post_save.connect(clear_exchange_rate_cache, sender=ExchangeRates)
+signals.post_delete.connect(clear_exchange_rate_cache, sender=ExchangeRates)
@@ -1,8 +1,46 @@
+import datetime as dt
+import json
+
 import requests
 
 
-def exchange_rates(day=None):
-    url = "https://api.exchangeratesapi.io/{}?base=CHF".format(
-        day.isoformat() if day else "latest"
-    )
-    return requests.get(url, timeout=2).json()
+def remote_exchange_rates(date_from, date_until):
+    """
+    Yield ``(day, rates)`` tuples for all days with exchange rates in the
+    range, fetched from exchangeratesapi.io using one request per year
+    """
+    while date_from <= date_until:
+        until = min(date_until, dt.date(date_from.year, 12, 31))
+        data = requests.get(
+            "https://api.exchangeratesapi.io/history",
+            params={
+                "base": "CHF",
+                "start_at": date_from.isoformat(),
+                "end_at": until.isoformat(),
+            },
+            timeout=30,
+        ).json()
+        for day, rates in sorted(data.get("rates", {}).items()):
+            yield (
+                dt.date.fromisoformat(day),
+                {"base": "CHF", "date": day, "rates": rates},
+            )
+        date_from = until + dt.timedelta(days=1)
+
+
+def file_exchange_rates(path, date_from=None, date_until=None):
+    """
+    Yield ``(day, rates)`` tuples from a JSON file in the format of
+    ``workbench/fixtures/exchangerates.json``
+    """
+    with open(path) as f:
+        rows = json.load(f)
+    for row in rows:
+        fields = row.get("fields", row)
+        day = dt.date.fromisoformat(fields["day"])
+        if date_from and day < date_from or date_until and day > date_until:
+            continue
+        yield day, fields["rates"]
+
+
+PROVIDERS = {"remote": remote_exchange_rates, "file": file_exchange_rates}
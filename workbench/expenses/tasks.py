@@ -0,0 +1,15 @@
+import datetime as dt
+
+from workbench.expenses.models import ExchangeRates
+from workbench.expenses.rates import remote_exchange_rates
+
+
+def update_exchange_rates(*, days=7):
+    """
+    Fetch the exchange rates of the last few days so that the conversions
+    in the expenses form do not have to wait for the network
+    """
+    today = dt.date.today()
+    return ExchangeRates.objects.load(
+        remote_exchange_rates(today - dt.timedelta(days=days), today)
+    )
@@ -1,16 +1,25 @@
 import datetime as dt
-import json
+import io
 import os
+import time
+from decimal import Decimal
 from unittest import mock
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
 from django.test import TestCase
 from django.utils import timezone
 
 from workbench import factories
-from workbench.expenses.models import ExchangeRates, ExpenseReport
-from workbench.expenses.rates import exchange_rates
+from workbench.expenses.models import (
+    EXCHANGE_RATE_CACHE_SECONDS,
+    ExchangeRates,
+    ExpenseReport,
+    clear_exchange_rate_cache,
+    exchange_rate,
+)
+from workbench.expenses.tasks import update_exchange_rates
 from workbench.logbook.models import LoggedCost
 from workbench.tools.formats import local_date_format
 from workbench.tools.testing import check_code, messages
@@ -20,6 +29,9 @@ from workbench.tools.validation import in_days
 class ExpensesTest(TestCase):
     fixtures = ["exchangerates.json"]
 
+    def setUp(self):
+        clear_exchange_rate_cache()
+
     def test_logged_cost_deletion(self):
         """Archived logged costs cannot be deleted, others can"""
         costs = factories.LoggedCostFactory.create(archived_at=timezone.now())
@@ -245,49 +257,111 @@ class ExpensesTest(TestCase):
         )
 
 
-def mocked_json(*args, **kwargs):
-    with open(
-        os.path.join(settings.BASE_DIR, "workbench", "fixtures", "exchangerates.json")
-    ) as f:
-        return json.load(f)[0]["fields"]["rates"]
-
+FIXTURE = os.path.join(settings.BASE_DIR, "workbench", "fixtures", "exchangerates.json")
 
-@mock.patch("workbench.expenses.models.exchange_rates", side_effect=mocked_json)
-class MockedRemoteDataTest(TestCase):
-    def test_with_mocked_remote_data(self, mock_get):
-        """Exchange rates determination"""
-        self.assertEqual(mock_get.call_count, 0)
-        rates = ExchangeRates.objects.newest()
-        self.assertEqual(mock_get.call_count, 1)
-        self.assertEqual(rates.rates["date"], "2019-12-10")
 
-        rates = ExchangeRates.objects.create(day=in_days(1), rates={})
-        self.assertEqual(ExchangeRates.objects.newest(), rates)
-        self.assertEqual(mock_get.call_count, 1)
-
-
-def mocked_get(*args, **kwargs):
+def mocked_history(url, *, params, **kwargs):
     class MockRequest:
         def json(self):
-            return {}
+            return {
+                "base": "CHF",
+                "rates": {
+                    params["start_at"]: {"CHF": 1.0, "EUR": 0.9},
+                    params["end_at"]: {"CHF": 1.0, "EUR": 0.8},
+                },
+            }
 
     return MockRequest()
 
 
-@mock.patch("workbench.expenses.rates.requests.get", side_effect=mocked_get)
-class ExchangeRatesTest(TestCase):
-    def test_exchange_rates_today(self, mock_get):
-        """exchange_rates() without arguments fetches today's exchange rates"""
-        exchange_rates()
+@mock.patch("workbench.expenses.rates.requests.get", side_effect=mocked_history)
+class StoredExchangeRatesTest(TestCase):
+    def setUp(self):
+        clear_exchange_rate_cache()
+
+    def test_no_network(self, mock_get):
+        """Exchange rates lookups never hit the network"""
+        self.assertIsNone(ExchangeRates.objects.newest())
+        self.assertIsNone(ExchangeRates.objects.for_day(dt.date.today()))
+        self.assertIsNone(exchange_rate(dt.date.today(), "EUR"))
+
+        self.client.force_login(factories.UserFactory.create())
+        response = self.client.get(
+            "/expenses/convert/?day=2019-12-11&currency=EUR&cost=100"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(mock_get.call_count, 0)
+
+        rates = ExchangeRates.objects.create(day=in_days(1), rates={})
+        self.assertEqual(ExchangeRates.objects.newest(), rates)
+        self.assertEqual(mock_get.call_count, 0)
+
+    def test_backfill_from_file(self, mock_get):
+        """Rates can be loaded from files; lookups fall back to previous days"""
+        call_command(
+            "backfill_exchange_rates",
+            "2019-12-01",
+            "2019-12-31",
+            file=FIXTURE,
+            stdout=io.StringIO(),
+        )
+        self.assertEqual(ExchangeRates.objects.count(), 1)
         self.assertEqual(
-            mock_get.call_args[0],
-            ("https://api.exchangeratesapi.io/latest?base=CHF",),
+            exchange_rate(dt.date(2019, 12, 15), "EUR"), Decimal("0.9155832265")
+        )
+        self.assertIsNone(exchange_rate(dt.date(2019, 12, 1), "EUR"))
+        self.assertIsNone(exchange_rate(dt.date(2019, 12, 15), "XYZ"))
+
+        # Misses are not cached (bulk_create does not send signals)
+        ExchangeRates.objects.bulk_create(
+            [ExchangeRates(day=dt.date(2019, 11, 30), rates={"rates": {"EUR": 0.92}})]
+        )
+        self.assertEqual(exchange_rate(dt.date(2019, 12, 1), "EUR"), Decimal("0.92"))
+
+        ExchangeRates.objects.create(
+            day=dt.date(2019, 12, 12), rates={"rates": {"EUR": 0.95}}
+        )
+        self.assertEqual(exchange_rate(dt.date(2019, 12, 15), "EUR"), Decimal("0.95"))
+
+        with self.assertNumQueries(0):
+            exchange_rate(dt.date(2019, 12, 15), "EUR")
+        with mock.patch(
+            "workbench.expenses.models.time.monotonic",
+            return_value=time.monotonic() + EXCHANGE_RATE_CACHE_SECONDS,
+        ), self.assertNumQueries(1):
+            exchange_rate(dt.date(2019, 12, 15), "EUR")
+
+        call_command(
+            "backfill_exchange_rates", "2019-12-01", file=FIXTURE, stdout=io.StringIO()
         )
+        self.assertEqual(ExchangeRates.objects.count(), 3)
+        self.assertEqual(mock_get.call_count, 0)
 
-    def test_exchange_rates_someday(self, mock_get):
-        """Exchange rates of a specific day hits the expected URL"""
-        exchange_rates(dt.date(2019, 10, 12))
+    def test_backfill_from_remote(self, mock_get):
+        """Remote rates are loaded with one request per year"""
+        call_command(
+            "backfill_exchange_rates",
+            "2019-12-01",
+            "2020-01-31",
+            stdout=io.StringIO(),
+        )
+        self.assertEqual(mock_get.call_count, 2)
         self.assertEqual(
-            mock_get.call_args[0],
-            ("https://api.exchangeratesapi.io/2019-10-12?base=CHF",),
+            [rates.day for rates in ExchangeRates.objects.order_by("day")],
+            [
+                dt.date(2019, 12, 1),
+                dt.date(2019, 12, 31),
+                dt.date(2020, 1, 1),
+                dt.date(2020, 1, 31),
+            ],
         )
+        self.assertEqual(exchange_rate(dt.date(2020, 1, 15), "EUR"), Decimal("0.9"))
+
+        with self.assertRaises(CommandError):
+            call_command("backfill_exchange_rates", "2020-01-31", "2019-12-01")
+
+    def test_update_exchange_rates(self, mock_get):
+        """The fairy task fetches the rates of the last few days"""
+        self.assertEqual(update_exchange_rates(days=3), 2)
+        self.assertEqual(update_exchange_rates(days=3), 0)
+        self.assertEqual(ExchangeRates.objects.newest().day, dt.date.today())
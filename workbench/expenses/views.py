@@ -1,6 +1,5 @@
 import operator
 from collections import OrderedDict
-from decimal import Decimal
 from functools import reduce
 from itertools import count
 
@@ -12,7 +11,7 @@ from django.utils.text import capfirst
 from django.utils.translation import gettext as _
 
 from workbench import generic
-from workbench.expenses.models import ExchangeRates, ExpenseReport
+from workbench.expenses.models import ExpenseReport, exchange_rate
 from workbench.tools.formats import Z2, currency, local_date_format
 from workbench.tools.pdf import MarkupParagraph, mm, pdf_response
 
@@ -117,8 +116,8 @@ def convert(request):
     form = ConvertForm(request.GET)
     if not form.is_valid():
         return JsonResponse({"cost": ""}, status=400)
-    rates = ExchangeRates.objects.for_day(form.cleaned_data["day"])
-    cost = form.cleaned_data["cost"] / Decimal(
-        str(rates.rates["rates"][form.cleaned_data["currency"]])
-    )
+    rate = exchange_rate(form.cleaned_data["day"], form.cleaned_data["currency"])
+    if not rate:
+        return JsonResponse({"cost": ""}, status=400)
+    cost = form.cleaned_data["cost"] / rate
     return JsonResponse({"cost": cost.quantize(Z2)})
@@ -287,7 +287,7 @@ class AutocompleteView(ToolsMixin, vanilla.ListView):
 
     def get(self, request, *args, **kwargs):
         q = request.GET.get("q")
-        queryset = self.get_queryset().search(q)
+        queryset = self.get_queryset().ranked_search(q)
         queryset = (
             self.filter(queryset=queryset, request=request) if self.filter else queryset
         )
@@ -1,8 +1,9 @@
 import datetime as dt
+from collections import defaultdict
 
 from django.contrib import messages
-from django.db import connections, models
-from django.db.models import F, Q, Sum
+from django.db import connections, models, transaction
+from django.db.models import F, Q
 from django.db.models.expressions import RawSQL
 from django.db.models.functions import Coalesce
 from django.utils import timezone
@@ -173,15 +174,7 @@ class Invoice(ModelWithTotal):
             super().save(*args, **kwargs)
             self.refresh_from_db()
 
-        self._fts = " ".join(
-            str(part)
-            for part in [
-                self.code,
-                self.customer.name,
-                self.contact.full_name if self.contact else "",
-                self.project.title if self.project else "",
-            ]
-        )
+        self._update_fts()
         if (
             self.invoiced_on
             and self.last_reminded_on
@@ -197,6 +190,17 @@ class Invoice(ModelWithTotal):
 
     save.alters_data = True
 
+    def _update_fts(self):
+        self._fts = " ".join(
+            str(part)
+            for part in [
+                self.code,
+                self.customer.name,
+                self.contact.full_name if self.contact else "",
+                self.project.title if self.project else "",
+            ]
+        )
+
     def delete(self, *args, **kwargs):
         assert (
             self.status <= self.IN_PREPARATION
@@ -347,44 +351,92 @@ class Invoice(ModelWithTotal):
     def create_services_from_logbook(self, project_services):
         assert self.project, "cannot call create_services_from_logbook without project"
 
+        project_services = list(project_services)
+        ids = [ps.id for ps in project_services]
+        totals = defaultdict(
+            lambda: {"hours": Z1, "cost": Z2, "third_party_costs": None}
+        )
+        period = []
+        with connections["default"].cursor() as cursor:
+            cursor.execute(
+                """
+select service_id, sum(hours), null, null, min(rendered_on), max(rendered_on)
+from logbook_loggedhours
+where service_id = any(%s) and archived_at is null
+group by service_id
+
+union all
+
+select service_id, null, sum(cost), sum(third_party_costs), min(rendered_on),
+    max(rendered_on)
+from logbook_loggedcost
+where service_id = any(%s) and archived_at is null
+group by service_id
+                """,
+                [ids, ids],
+            )
+            for (
+                service_id,
+                hours,
+                cost,
+                third_party_costs,
+                min_date,
+                max_date,
+            ) in cursor:
+                row = totals[service_id]
+                if hours is not None:
+                    row["hours"] = hours
+                else:
+                    row["cost"] = cost
+                    row["third_party_costs"] = third_party_costs
+                period.extend([min_date, max_date])
+
+        services = []
         for ps in project_services:
-            not_archived_effort = ps.loggedhours.filter(
-                archived_at__isnull=True
-            ).order_by()
-            not_archived_costs = ps.loggedcosts.filter(
-                archived_at__isnull=True
-            ).order_by()
-
-            hours = not_archived_effort.aggregate(Sum("hours"))["hours__sum"] or Z1
-            cost = not_archived_costs.aggregate(Sum("cost"))["cost__sum"] or Z2
-
-            if hours or cost:
-                service = Service(
-                    invoice=self,
-                    project_service=ps,
-                    title=ps.title,
-                    description=ps.description,
-                    position=ps.position,
-                    effort_rate=ps.effort_rate,
-                    effort_type=ps.effort_type,
-                    effort_hours=hours,
-                    cost=cost,
-                    third_party_costs=not_archived_costs.filter(
-                        third_party_costs__isnull=False
-                    ).aggregate(Sum("third_party_costs"))["third_party_costs__sum"],
-                )
-                service.save(skip_related_model=True)
-                not_archived_effort.update(
-                    invoice_service=service, archived_at=timezone.now()
-                )
-                not_archived_costs.update(
-                    invoice_service=service, archived_at=timezone.now()
-                )
+            row = totals.get(ps.id)
+            if not row or not (row["hours"] or row["cost"]):
+                continue
 
-        (
-            self.service_period_from,
-            self.service_period_until,
-        ) = self.service_period_from_logbook()
+            service = Service(
+                invoice=self,
+                project_service=ps,
+                title=ps.title,
+                description=ps.description,
+                position=ps.position,
+                effort_rate=ps.effort_rate,
+                effort_type=ps.effort_type,
+                effort_hours=row["hours"],
+                cost=row["cost"],
+                third_party_costs=row["third_party_costs"],
+            )
+            # bulk_create() skips save(); project services always have a
+            # position, so this does not query the database
+            service._compute_fields()
+            services.append(service)
+
+        if services:
+            Service.objects.bulk_create(services)
+            with connections["default"].cursor() as cursor:
+                for table in ["logbook_loggedhours", "logbook_loggedcost"]:
+                    cursor.execute(
+                        """
+update {table} log
+set invoice_service_id=i_s.id, archived_at=%s
+from invoices_service i_s
+where i_s.id = any(%s)
+    and log.service_id=i_s.project_service_id
+    and log.archived_at is null
+                        """.format(
+                            table=table
+                        ),
+                        [timezone.now(), [service.id for service in services]],
+                    )
+
+        # The period only covers the logbook entries archived right now; this
+        # is the same as service_period_from_logbook() for new invoices
+        period = [day for day in period if day]
+        self.service_period_from = min(period) if period else None
+        self.service_period_until = max(period) if period else None
         self.save()
 
     def create_services_from_offer(self, project_services):
@@ -617,10 +669,34 @@ class RecurringInvoice(ModelWithTotal):
             self.pretty_status,
         )
 
-    def create_single_invoice(self, *, period_starts_on, period_ends_on):
+    def due_periods(self):
+        """
+        Return a list of ``(period_starts_on, period_ends_on)`` tuples of all
+        periods for which invoices should be created now
+        """
+        periods = []
+        days = recurring(
+            max(filter(None, (self.next_period_starts_on, self.starts_on))),
+            self.periodicity,
+        )
+        generate_until = min(
+            filter(None, (in_days(-self.create_invoice_on_day), self.ends_on))
+        )
+        this_period = next(days)
+        while this_period <= generate_until:
+            next_period = next(days)
+            periods.append((this_period, next_period - dt.timedelta(days=1)))
+            this_period = next_period
+        return periods
+
+    def build_invoice(self, *, period_starts_on, period_ends_on):
+        """
+        Return an unsaved invoice (and an unsaved project if the recurring
+        invoice creates projects) for the given period
+        """
         project = None
         if self.create_project:
-            project = Project.objects.create(
+            project = Project(
                 customer=self.customer,
                 contact=self.contact,
                 title=self.title,
@@ -629,7 +705,7 @@ class RecurringInvoice(ModelWithTotal):
                 type=Project.MAINTENANCE,
             )
 
-        return Invoice.objects.create(
+        invoice = Invoice(
             customer=self.customer,
             contact=self.contact,
             project=project,
@@ -650,28 +726,83 @@ class RecurringInvoice(ModelWithTotal):
             # total=self.total,
             third_party_costs=self.third_party_costs,
         )
+        invoice._calculate_total()
+        return invoice
 
     def create_invoices(self):
-        invoices = []
-        days = recurring(
-            max(filter(None, (self.next_period_starts_on, self.starts_on))),
-            self.periodicity,
+        return [invoice for ri, invoice in create_recurring_invoices([self])]
+
+
+LOCK_SQL = "LOCK TABLE projects_project, invoices_invoice IN SHARE ROW EXCLUSIVE MODE"
+
+CODES_SQL = """\
+SELECT
+  (
+    SELECT COALESCE(MAX(_code), 0) FROM projects_project
+    WHERE EXTRACT(year FROM created_at) = %s
+  ),
+  (SELECT COALESCE(MAX(_code), 0) FROM invoices_invoice WHERE project_id IS NULL)
+"""
+
+
+def create_recurring_invoices(recurring_invoices, *, dry_run=False):
+    """
+    Create all due invoices of the passed recurring invoices at once
+
+    All periods are planned up front, codes are assigned in one pass and
+    projects and invoices are inserted using ``bulk_create``. Returns a list
+    of ``(recurring invoice, invoice)`` tuples; with ``dry_run=True`` the
+    invoices are not saved and the recurring invoices are left untouched.
+    """
+    planned = []
+    for ri in recurring_invoices:
+        periods = ri.due_periods()
+        if periods:
+            ri.next_period_starts_on = periods[-1][1] + dt.timedelta(days=1)
+        planned.extend(
+            (ri, ri.build_invoice(period_starts_on=starts, period_ends_on=ends))
+            for starts, ends in periods
         )
-        generate_until = min(
-            filter(None, (in_days(-self.create_invoice_on_day), self.ends_on))
+    if not planned:
+        return planned
+
+    now = timezone.now()
+    with transaction.atomic():
+        with connections["default"].cursor() as cursor:
+            if not dry_run:
+                # Keep other transactions from inserting projects or invoices
+                # and taking the same codes until ours are committed
+                cursor.execute(LOCK_SQL)
+            cursor.execute(CODES_SQL, [now.year])
+            project_code, invoice_code = cursor.fetchone()
+
+        projects = []
+        for ri, invoice in planned:
+            if invoice.project:
+                project_code += 1
+                invoice.project.created_at = now
+                invoice.project._code = project_code
+                invoice.project._update_fts()
+                projects.append(invoice.project)
+                # The project has just been created, its first invoice is no. 1
+                invoice._code = 1
+            else:
+                invoice_code += 1
+                invoice._code = invoice_code
+            invoice._update_fts()
+
+        if dry_run:
+            return planned
+
+        Project.objects.bulk_create(projects)
+        for ri, invoice in planned:
+            if invoice.project:
+                # bulk_create() does not pick up primary keys of related
+                # objects saved after the assignment
+                invoice.project = invoice.project
+        Invoice.objects.bulk_create(invoice for ri, invoice in planned)
+        RecurringInvoice.objects.bulk_update(
+            {ri.pk: ri for ri, invoice in planned}.values(),
+            ["next_period_starts_on"],
         )
-        this_period = next(days)
-        while True:
-            if this_period > generate_until:
-                break
-            next_period = next(days)
-            invoices.append(
-                self.create_single_invoice(
-                    period_starts_on=this_period,
-                    period_ends_on=next_period - dt.timedelta(days=1),
-                )
-            )
-            self.next_period_starts_on = next_period
-            this_period = next_period
-        self.save()
-        return invoices
+    return planned
@@ -4,7 +4,7 @@ from django.conf import settings
 from django.core.mail import EmailMultiAlternatives
 from django.utils.translation import gettext as _
 
-from workbench.invoices.models import RecurringInvoice
+from workbench.invoices.models import RecurringInvoice, create_recurring_invoices
 from workbench.tools.formats import currency, local_date_format
 
 
@@ -21,9 +21,10 @@ TEMPLATE = """\
 
 def create_recurring_invoices_and_notify():
     by_owner = defaultdict(list)
-    for ri in RecurringInvoice.objects.renewal_candidates():
-        for invoice in ri.create_invoices():
-            by_owner[invoice.owned_by].append((ri, invoice))
+    for ri, invoice in create_recurring_invoices(
+        RecurringInvoice.objects.renewal_candidates()
+    ):
+        by_owner[invoice.owned_by].append((ri, invoice))
 
     for owner, invoices in by_owner.items():
         invoices = "\n".join(
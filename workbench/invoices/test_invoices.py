@@ -1,5 +1,8 @@
 import datetime as dt
+import os
+import tempfile
 from decimal import Decimal
+from unittest import mock
 
 from django.core.exceptions import ValidationError
 from django.test import TestCase
@@ -8,8 +11,10 @@ from django.utils.translation import deactivate_all
 
 from workbench import factories
 from workbench.invoices.models import Invoice
+from workbench.logbook.models import LoggedCost, LoggedHours
 from workbench.tools.formats import local_date_format
 from workbench.tools.forms import WarningsForm
+from workbench.tools.pdf import PDFDocument, evict_pdf_cache
 from workbench.tools.testing import check_code, messages
 from workbench.tools.validation import in_days
 
@@ -933,6 +938,59 @@ class InvoicesTest(TestCase):
         response = self.client.get(invoice.urls["pdf"])
         self.assertEqual(response.status_code, 200)
 
+    def test_create_services_from_logbook_queries(self):
+        """Creating services from the logbook does not run queries per service"""
+        project = factories.ProjectFactory.create()
+        for i in range(10):
+            service = factories.ServiceFactory.create(
+                project=project, effort_type="Consulting", effort_rate=100
+            )
+            factories.LoggedHoursFactory.create(service=service, hours=i + 1)
+            factories.LoggedCostFactory.create(service=service, cost=10)
+        invoice = factories.InvoiceFactory.create(
+            project=project,
+            customer=project.customer,
+            contact=project.contact,
+            type=Invoice.SERVICES,
+        )
+
+        with self.assertNumQueries(7):
+            # Project services, logbook totals, the insert, two logbook
+            # updates and saving the invoice (services for totals, update)
+            invoice.create_services_from_logbook(project.services.all())
+
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.services.count(), 10)
+        self.assertEqual(invoice.subtotal, Decimal("5600.00"))
+        self.assertEqual(invoice.service_period_from, dt.date.today())
+        self.assertFalse(LoggedHours.objects.filter(archived_at__isnull=True).exists())
+        self.assertFalse(LoggedCost.objects.filter(invoice_service=None).exists())
+
+    def test_pdf_cache(self):
+        """Invoice PDFs are cached until anything they depend on changes"""
+        invoice = factories.InvoiceFactory.create(liable_to_vat=False)
+        self.client.force_login(invoice.owned_by)
+
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            PDF_CACHE_DIR=directory
+        ):
+            response = self.client.get(invoice.urls["pdf"])
+            self.assertEqual(response["content-type"], "application/pdf")
+            self.assertEqual(len(os.listdir(directory)), 1)
+
+            with mock.patch.object(PDFDocument, "process_invoice") as process:
+                cached = self.client.get(invoice.urls["pdf"])
+            process.assert_not_called()
+            self.assertEqual(response.content, cached.content)
+
+            invoice.postal_address = "Somewhere else"
+            invoice.save()
+            self.client.get(invoice.urls["pdf"])
+            self.assertEqual(len(os.listdir(directory)), 2)
+
+            evict_pdf_cache(max_size=0)
+            self.assertEqual(os.listdir(directory), [])
+
     def test_cancellation_with_payment_notice(self):
         """Canceling invoices requires entering a payment notice"""
         invoice = factories.InvoiceFactory.create(
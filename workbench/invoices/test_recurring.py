@@ -7,7 +7,11 @@ from django.utils.translation import deactivate_all
 from time_machine import travel
 
 from workbench import factories
-from workbench.invoices.models import Invoice, RecurringInvoice
+from workbench.invoices.models import (
+    Invoice,
+    RecurringInvoice,
+    create_recurring_invoices,
+)
 from workbench.invoices.tasks import create_recurring_invoices_and_notify
 from workbench.tools.testing import check_code, messages
 from workbench.tools.validation import in_days
@@ -327,3 +331,53 @@ class RecurringTest(TestCase):
 
         invoices = r.create_invoices()
         self.assertIsNotNone(invoices[0].project)
+
+    def test_create_recurring_invoices_batch(self):
+        """All due invoices are planned up front and inserted in bulk"""
+        r1 = factories.RecurringInvoiceFactory.create(
+            starts_on=dt.date(2019, 1, 1), periodicity="monthly", subtotal=100
+        )
+        r2 = factories.RecurringInvoiceFactory.create(
+            starts_on=dt.date(2019, 1, 1), periodicity="monthly", create_project=True
+        )
+
+        with travel("2019-04-15 12:00"):
+            planned = create_recurring_invoices(
+                RecurringInvoice.objects.renewal_candidates(), dry_run=True
+            )
+            self.assertEqual(len(planned), 10)
+            self.assertEqual(Invoice.objects.count(), 0)
+            r1.refresh_from_db()
+            self.assertIsNone(r1.next_period_starts_on)
+
+            with self.assertNumQueries(8):
+                # Recurring invoices, the table lock and codes inside a
+                # savepoint and one insert or update per table
+                created = create_recurring_invoices(
+                    RecurringInvoice.objects.renewal_candidates()
+                )
+
+            self.assertEqual(Invoice.objects.count(), 10)
+            invoices = [invoice for ri, invoice in created if ri == r1]
+            self.assertEqual(
+                [invoice.code for invoice in invoices],
+                ["00001", "00002", "00003", "00004", "00005"],
+            )
+            self.assertEqual(
+                len({invoice.project_id for ri, invoice in created if ri == r2}), 5
+            )
+
+            invoice = Invoice.objects.get(pk=invoices[0].pk)
+            self.assertEqual(invoice.total_excl_tax, 100)
+            self.assertEqual(invoice.total, invoices[0].total)
+            self.assertEqual(invoice.service_period_until, dt.date(2019, 1, 31))
+
+            r1.refresh_from_db()
+            self.assertEqual(r1.next_period_starts_on, dt.date(2019, 6, 1))
+
+            self.assertEqual(
+                create_recurring_invoices(
+                    RecurringInvoice.objects.renewal_candidates()
+                ),
+                [],
+            )
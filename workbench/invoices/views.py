@@ -2,6 +2,7 @@ import datetime as dt
 from collections import defaultdict
 
 from django.contrib import messages
+from django.db.models import prefetch_related_objects
 from django.shortcuts import redirect, render
 from django.utils.translation import gettext, ngettext
 from django.views.decorators.http import require_POST
@@ -9,7 +10,7 @@ from django.views.decorators.http import require_POST
 from workbench import generic
 from workbench.invoices.models import Invoice
 from workbench.logbook.models import LoggedCost, LoggedHours
-from workbench.tools.pdf import pdf_response
+from workbench.tools.pdf import cached_pdf_response, pdf_cache_key, pdf_response
 from workbench.tools.xlsx import WorkbenchXLSXDocument
 
 
@@ -18,18 +19,28 @@ class InvoicePDFView(generic.DetailView):
 
     def get(self, request, *args, **kwargs):
         self.object = self.get_object()
+        prefetch_related_objects([self.object], "services", "down_payment_invoices")
 
-        pdf, response = pdf_response(
+        def render(pdf):
+            pdf.init_letter()
+            pdf.process_invoice(self.object)
+            pdf.generate()
+
+        return cached_pdf_response(
             self.object.code,
             as_attachment=request.GET.get("disposition") == "attachment",
+            key=pdf_cache_key(
+                [
+                    self.object,
+                    self.object.code,
+                    self.object.owned_by.get_full_name(),
+                    *self.object.services.all(),
+                    *self.object.down_payment_invoices.all(),
+                ]
+            ),
+            render=render,
         )
 
-        pdf.init_letter()
-        pdf.process_invoice(self.object)
-        pdf.generate()
-
-        return response
-
 
 class InvoiceXLSXView(generic.DetailView):
     model = Invoice
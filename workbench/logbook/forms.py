@@ -503,7 +503,10 @@ class LoggedCostForm(ModelForm):
             rates = ExchangeRates.objects.newest()
             self.fields["expense_currency"] = forms.ChoiceField(
                 choices=[("", "----------")]
-                + [(currency, currency) for currency in rates.rates["rates"]],
+                + [
+                    (currency, currency)
+                    for currency in (rates.rates["rates"] if rates else ())
+                ],
                 widget=forms.Select(attrs={"class": "custom-select"}),
                 required=False,
                 initial=self.instance.expense_currency,
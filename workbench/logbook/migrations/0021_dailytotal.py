@@ -0,0 +1,170 @@
+# Generated by Django 3.1.1 on 2026-10-18 03:25
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+TOTALS_SQL = """\
+CREATE OR REPLACE FUNCTION logbook_break_day(p_starts_at timestamp with time zone)
+RETURNS date AS $$
+  SELECT (p_starts_at AT TIME ZONE '%(time_zone)s')::date;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION logbook_break_seconds(
+  p_starts_at timestamp with time zone,
+  p_ends_at timestamp with time zone
+) RETURNS integer AS $$
+  SELECT floor(extract(epoch FROM p_ends_at - p_starts_at))::integer;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION logbook_dailytotal_add(
+  p_user_id integer,
+  p_day date,
+  p_hours numeric,
+  p_break_seconds integer
+) RETURNS void AS $$
+begin
+  INSERT INTO logbook_dailytotal (user_id, day, hours, break_seconds)
+  VALUES (p_user_id, p_day, p_hours, p_break_seconds)
+  ON CONFLICT (user_id, day)
+  DO UPDATE SET
+    hours=logbook_dailytotal.hours + EXCLUDED.hours,
+    break_seconds=logbook_dailytotal.break_seconds + EXCLUDED.break_seconds;
+
+  DELETE FROM logbook_dailytotal
+  WHERE user_id=p_user_id AND day=p_day AND hours=0 AND break_seconds=0;
+end
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION logbook_loggedhours_dailytotal() RETURNS trigger AS $$
+begin
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM logbook_dailytotal_add(old.rendered_by_id, old.rendered_on, -old.hours, 0);
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM logbook_dailytotal_add(new.rendered_by_id, new.rendered_on, new.hours, 0);
+  END IF;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS logbook_loggedhours_dailytotal_trigger ON logbook_loggedhours;
+CREATE TRIGGER logbook_loggedhours_dailytotal_trigger
+  AFTER INSERT OR DELETE OR UPDATE OF rendered_by_id, rendered_on, hours
+  ON logbook_loggedhours FOR EACH ROW
+  EXECUTE PROCEDURE logbook_loggedhours_dailytotal();
+
+CREATE OR REPLACE FUNCTION logbook_break_dailytotal() RETURNS trigger AS $$
+begin
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM logbook_dailytotal_add(
+      old.user_id,
+      logbook_break_day(old.starts_at),
+      0,
+      -logbook_break_seconds(old.starts_at, old.ends_at)
+    );
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM logbook_dailytotal_add(
+      new.user_id,
+      logbook_break_day(new.starts_at),
+      0,
+      logbook_break_seconds(new.starts_at, new.ends_at)
+    );
+  END IF;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS logbook_break_dailytotal_trigger ON logbook_break;
+CREATE TRIGGER logbook_break_dailytotal_trigger
+  AFTER INSERT OR DELETE OR UPDATE OF user_id, starts_at, ends_at
+  ON logbook_break FOR EACH ROW
+  EXECUTE PROCEDURE logbook_break_dailytotal();
+
+SELECT logbook_dailytotal_add(rendered_by_id, rendered_on, SUM(hours), 0)
+FROM logbook_loggedhours
+GROUP BY rendered_by_id, rendered_on;
+
+SELECT logbook_dailytotal_add(
+  user_id,
+  logbook_break_day(starts_at),
+  0,
+  SUM(logbook_break_seconds(starts_at, ends_at))::integer
+)
+FROM logbook_break
+GROUP BY user_id, logbook_break_day(starts_at);
+""" % {
+    "time_zone": settings.TIME_ZONE
+}
+
+TOTALS_REVERSE_SQL = """\
+DROP TRIGGER IF EXISTS logbook_break_dailytotal_trigger ON logbook_break;
+DROP FUNCTION IF EXISTS logbook_break_dailytotal();
+DROP TRIGGER IF EXISTS logbook_loggedhours_dailytotal_trigger ON logbook_loggedhours;
+DROP FUNCTION IF EXISTS logbook_loggedhours_dailytotal();
+DROP FUNCTION IF EXISTS logbook_dailytotal_add(integer, date, numeric, integer);
+DROP FUNCTION IF EXISTS logbook_break_seconds(
+  timestamp with time zone, timestamp with time zone
+);
+DROP FUNCTION IF EXISTS logbook_break_day(timestamp with time zone);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("logbook", "0020_auto_20200511_1419"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyTotal",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(verbose_name="day")),
+                (
+                    "hours",
+                    models.DecimalField(
+                        decimal_places=1,
+                        default=0,
+                        max_digits=10,
+                        validators=[django.core.validators.MinValueValidator(0)],
+                        verbose_name="hours",
+                    ),
+                ),
+                (
+                    "break_seconds",
+                    models.IntegerField(default=0, verbose_name="break seconds"),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="user",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "daily total",
+                "verbose_name_plural": "daily totals",
+                "ordering": ["day"],
+                "unique_together": {("user", "day")},
+            },
+        ),
+        migrations.RunSQL(TOTALS_SQL, TOTALS_REVERSE_SQL),
+    ]
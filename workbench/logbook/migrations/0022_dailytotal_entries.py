@@ -0,0 +1,166 @@
+# Generated by Django 3.1.1 on 2026-10-18 03:30
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+
+TOTALS_SQL = """\
+CREATE OR REPLACE FUNCTION logbook_logging_delay(
+  p_created_at timestamp with time zone,
+  p_rendered_on date
+) RETURNS bigint AS $$
+  SELECT extract(
+    epoch FROM p_created_at - ((p_rendered_on + interval '12 hours') AT TIME ZONE 'UTC')
+  )::bigint;
+$$ LANGUAGE sql IMMUTABLE;
+
+DROP FUNCTION IF EXISTS logbook_dailytotal_add(integer, date, numeric, integer);
+CREATE OR REPLACE FUNCTION logbook_dailytotal_add(
+  p_user_id integer,
+  p_day date,
+  p_hours numeric,
+  p_entries integer,
+  p_logging_delay bigint,
+  p_break_seconds integer
+) RETURNS void AS $$
+begin
+  INSERT INTO logbook_dailytotal (
+    user_id, day, hours, entries, logging_delay, break_seconds
+  )
+  VALUES (p_user_id, p_day, p_hours, p_entries, p_logging_delay, p_break_seconds)
+  ON CONFLICT (user_id, day)
+  DO UPDATE SET
+    hours=logbook_dailytotal.hours + EXCLUDED.hours,
+    entries=logbook_dailytotal.entries + EXCLUDED.entries,
+    logging_delay=logbook_dailytotal.logging_delay + EXCLUDED.logging_delay,
+    break_seconds=logbook_dailytotal.break_seconds + EXCLUDED.break_seconds;
+
+  DELETE FROM logbook_dailytotal
+  WHERE user_id=p_user_id AND day=p_day AND entries=0 AND break_seconds=0;
+end
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION logbook_loggedhours_dailytotal() RETURNS trigger AS $$
+begin
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM logbook_dailytotal_add(
+      old.rendered_by_id,
+      old.rendered_on,
+      -old.hours,
+      -1,
+      -logbook_logging_delay(old.created_at, old.rendered_on),
+      0
+    );
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM logbook_dailytotal_add(
+      new.rendered_by_id,
+      new.rendered_on,
+      new.hours,
+      1,
+      logbook_logging_delay(new.created_at, new.rendered_on),
+      0
+    );
+  END IF;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS logbook_loggedhours_dailytotal_trigger ON logbook_loggedhours;
+CREATE TRIGGER logbook_loggedhours_dailytotal_trigger
+  AFTER INSERT OR DELETE
+  OR UPDATE OF rendered_by_id, rendered_on, hours, created_at
+  ON logbook_loggedhours FOR EACH ROW
+  EXECUTE PROCEDURE logbook_loggedhours_dailytotal();
+
+CREATE OR REPLACE FUNCTION logbook_break_dailytotal() RETURNS trigger AS $$
+begin
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM logbook_dailytotal_add(
+      old.user_id,
+      logbook_break_day(old.starts_at),
+      0,
+      0,
+      0,
+      -logbook_break_seconds(old.starts_at, old.ends_at)
+    );
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM logbook_dailytotal_add(
+      new.user_id,
+      logbook_break_day(new.starts_at),
+      0,
+      0,
+      0,
+      logbook_break_seconds(new.starts_at, new.ends_at)
+    );
+  END IF;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DELETE FROM logbook_dailytotal;
+
+SELECT logbook_dailytotal_add(
+  rendered_by_id,
+  rendered_on,
+  SUM(hours),
+  COUNT(*)::integer,
+  SUM(logbook_logging_delay(created_at, rendered_on))::bigint,
+  0
+)
+FROM logbook_loggedhours
+GROUP BY rendered_by_id, rendered_on;
+
+SELECT logbook_dailytotal_add(
+  user_id,
+  logbook_break_day(starts_at),
+  0,
+  0,
+  0,
+  SUM(logbook_break_seconds(starts_at, ends_at))::integer
+)
+FROM logbook_break
+GROUP BY user_id, logbook_break_day(starts_at);
+
+CREATE INDEX IF NOT EXISTS logbook_dailytotal_day_idx ON logbook_dailytotal (day);
+"""
+
+# Restore the functions and triggers of the previous migration
+TOTALS_REVERSE_SQL = (
+    """\
+DROP INDEX IF EXISTS logbook_dailytotal_day_idx;
+DROP FUNCTION IF EXISTS logbook_dailytotal_add(
+  integer, date, numeric, integer, bigint, integer
+);
+DROP FUNCTION IF EXISTS logbook_logging_delay(timestamp with time zone, date);
+DELETE FROM logbook_dailytotal;
+"""
+    + import_module("workbench.logbook.migrations.0021_dailytotal").TOTALS_SQL
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logbook", "0021_dailytotal"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dailytotal",
+            name="entries",
+            field=models.IntegerField(default=0, verbose_name="entries"),
+        ),
+        migrations.AddField(
+            model_name="dailytotal",
+            name="logging_delay",
+            field=models.BigIntegerField(
+                default=0,
+                help_text="Sum of seconds between noon of the day and logging the hours.",
+                verbose_name="logging delay",
+            ),
+        ),
+        migrations.RunSQL(TOTALS_SQL, TOTALS_REVERSE_SQL),
+    ]
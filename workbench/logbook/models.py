@@ -3,7 +3,7 @@ from decimal import Decimal
 
 from django.contrib import messages
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import connections, models
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _, ngettext
 
@@ -228,3 +228,75 @@ class Break(Model):
         return False
 
     allow_delete = allow_update
+
+
+class DailyTotalQuerySet(models.QuerySet):
+    def rebuild(self):
+        """
+        Recreate the daily totals from the logbook. The totals are maintained
+        by triggers on ``logbook_loggedhours`` and ``logbook_break``; this is
+        only required if those have been bypassed somehow.
+        """
+        with connections["default"].cursor() as cursor:
+            cursor.execute(
+                """\
+DELETE FROM logbook_dailytotal;
+SELECT logbook_dailytotal_add(
+  rendered_by_id,
+  rendered_on,
+  SUM(hours),
+  COUNT(*)::integer,
+  SUM(logbook_logging_delay(created_at, rendered_on))::bigint,
+  0
+)
+FROM logbook_loggedhours
+GROUP BY rendered_by_id, rendered_on;
+SELECT logbook_dailytotal_add(
+  user_id,
+  logbook_break_day(starts_at),
+  0,
+  0,
+  0,
+  SUM(logbook_break_seconds(starts_at, ends_at))::integer
+)
+FROM logbook_break
+GROUP BY user_id, logbook_break_day(starts_at);
+"""
+            )
+
+
+class DailyTotal(models.Model):
+    """
+    Logged hours, entries, logging delay and break seconds per user and day,
+    used for the hours badges, the break warning and the logbook statistics
+    """
+
+    # No database constraint: The triggers may still update the totals while
+    # the user and their breaks are being deleted.
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        db_constraint=False,
+        related_name="+",
+        verbose_name=_("user"),
+    )
+    day = models.DateField(_("day"))
+    hours = HoursField(_("hours"), default=0)
+    entries = models.IntegerField(_("entries"), default=0)
+    logging_delay = models.BigIntegerField(
+        _("logging delay"),
+        default=0,
+        help_text=_("Sum of seconds between noon of the day and logging the hours."),
+    )
+    break_seconds = models.IntegerField(_("break seconds"), default=0)
+
+    objects = DailyTotalQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["day"]
+        unique_together = [("user", "day")]
+        verbose_name = _("daily total")
+        verbose_name_plural = _("daily totals")
+
+    def __str__(self):
+        return "%s: %s" % (self.day, self.hours)
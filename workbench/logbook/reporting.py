@@ -21,119 +21,72 @@ def classify_logging_delay(delay):
     return _("Late"), "danger", explanation
 
 
-def mean_logging_delay(date_range):
+def _user_stats(date_range):
+    """
+    Aggregate the daily totals (maintained by triggers, see ``DailyTotal``)
+    per user using a single range scan
+    """
     with connections["default"].cursor() as cursor:
         cursor.execute(
             """
-WITH sq as (
-    SELECT
-        rendered_by_id AS user_id,
-        AVG(created_at - (rendered_on + interval '12 hours')) AS delay
-    FROM logbook_loggedhours
-    WHERE rendered_on BETWEEN %s AND %s
-    GROUP BY user_id
-)
-SELECT user_id, cast(extract(epoch from delay) as numeric) / 3600
-FROM sq
+SELECT
+    user_id,
+    SUM(entries),
+    SUM(hours),
+    SUM(logging_delay)::numeric / SUM(entries) / 3600,
+    COUNT(*),
+    COUNT(*) FILTER (
+        WHERE hours >= 9 AND break_seconds < 3600
+        OR hours >= 7 AND break_seconds < 1800
+        OR hours >= 5.5 AND break_seconds < 900
+    )
+FROM logbook_dailytotal
+WHERE day BETWEEN %s AND %s AND entries > 0
+GROUP BY user_id
             """,
             date_range,
         )
 
         return {
-            user_id: {"delay": delay, "classification": classify_logging_delay(delay)}
-            for user_id, delay in cursor
+            user_id: {
+                "mean_logging_delay": {
+                    "delay": delay,
+                    "classification": classify_logging_delay(delay),
+                },
+                "logged_hours_stats": {"count": count, "sum": sum, "avg": sum / count},
+                "insufficient_breaks": {"days": insufficient, "of": of},
+            }
+            for user_id, count, sum, delay, of, insufficient in cursor
         }
 
 
-def logged_hours_stats(date_range):
-    with connections["default"].cursor() as cursor:
-        cursor.execute(
-            """
-SELECT rendered_by_id, COUNT(hours), SUM(hours), AVG(hours)
-FROM logbook_loggedhours
-WHERE rendered_on BETWEEN %s AND %s
-GROUP BY rendered_by_id
-            """,
-            date_range,
-        )
+def mean_logging_delay(date_range):
+    return {
+        user_id: stats["mean_logging_delay"]
+        for user_id, stats in _user_stats(date_range).items()
+    }
 
-        return {
-            user_id: {"count": count, "sum": sum, "avg": avg}
-            for user_id, count, sum, avg in cursor
-        }
 
+def logged_hours_stats(date_range):
+    return {
+        user_id: stats["logged_hours_stats"]
+        for user_id, stats in _user_stats(date_range).items()
+    }
 
-def insufficient_breaks(date_range):
-    with connections["default"].cursor() as cursor:
-        cursor.execute(
-            """
-with breaks as (
-    select
-        user_id,
-        date_trunc('day', starts_at) as day,
-        sum(extract(epoch from (ends_at - starts_at))) as break_seconds
-    from logbook_break
-    where date_trunc('day', starts_at) between %s and %s
-    group by user_id, day
-),
-logged_hours as (
-    select
-        rendered_by_id as user_id,
-        rendered_on as day,
-        sum(hours) as hours
-    from logbook_loggedhours
-    where rendered_on between %s and %s
-    group by user_id, day
-),
-combined as (
-    select
-        logged_hours.user_id,
-        logged_hours.day,
-        hours,
-        coalesce(break_seconds, 0) as break_seconds
-    from logged_hours
-    left join breaks
-    on
-        breaks.user_id=logged_hours.user_id
-        and breaks.day=logged_hours.day
-),
-insufficient_breaks as (
-    select * from combined
-    where
-        hours >= 9 and break_seconds < 3600
-        or hours >= 7 and break_seconds < 1800
-        or hours >= 5.5 and break_seconds < 900
-)
-select
-    user_id,
-    count(*),
-    (
-        select count(*)
-        from insufficient_breaks
-        where insufficient_breaks.user_id=logged_hours.user_id
-    )
-from logged_hours
-group by user_id
-            """,
-            [*date_range, *date_range],
-        )
 
-        return {user_id: {"days": days, "of": of} for user_id, of, days in cursor}
+def insufficient_breaks(date_range):
+    return {
+        user_id: stats["insufficient_breaks"]
+        for user_id, stats in _user_stats(date_range).items()
+    }
 
 
 def logbook_stats(date_range):
-    mld = mean_logging_delay(date_range)
-    lhs = logged_hours_stats(date_range)
-    ib = insufficient_breaks(date_range)
+    stats = _user_stats(date_range)
 
     users = [
-        {
-            "user": user,
-            "mean_logging_delay": mld[user.id],
-            "logged_hours_stats": lhs[user.id],
-            "insufficient_breaks": ib[user.id],
-        }
-        for user in User.objects.filter(id__in=mld.keys() | lhs.keys())
+        {"user": user, **stats[user.id]}
+        for user in User.objects.filter(id__in=stats.keys())
     ]
 
     lhs_count = sum((user["logged_hours_stats"]["count"] for user in users), 0)
@@ -8,7 +8,8 @@ from django.utils import timezone
 from time_machine import travel
 
 from workbench import factories
-from workbench.logbook.models import Break
+from workbench.accounts.models import User
+from workbench.logbook.models import Break, DailyTotal
 from workbench.timer.models import Timestamp
 from workbench.tools.forms import WarningsForm
 from workbench.tools.testing import check_code
@@ -300,3 +301,48 @@ class BreaksTest(TestCase):
         with override_settings(FEATURES={"skip_breaks": False}):
             response = self.client.get("/")
             self.assertContains(response, "You should take")
+
+    @travel("2020-02-20 12:00")
+    def test_daily_totals(self):
+        """Daily totals are maintained by triggers and used for the badges"""
+        user = factories.UserFactory.create()
+        today = dt.date.today()
+
+        hours = factories.LoggedHoursFactory.create(rendered_by=user, hours=5)
+        factories.LoggedHoursFactory.create(
+            rendered_by=user, hours=2, rendered_on=in_days(-1)
+        )
+        brk = Break.objects.create(
+            user=user,
+            starts_at=c(today, dt.time(12, 0)),
+            ends_at=c(today, dt.time(12, 5)),
+        )
+
+        total = DailyTotal.objects.get(user=user, day=today)
+        self.assertEqual(total.hours, 5)
+        self.assertEqual(total.break_seconds, 300)
+
+        hours.hours = 6
+        hours.save()
+        brk.ends_at = c(today, dt.time(12, 20))
+        brk.save()
+
+        total = DailyTotal.objects.get(user=user, day=today)
+        self.assertEqual(total.hours, 6)
+        self.assertEqual(total.break_seconds, 1200)
+
+        user = User.objects.get(pk=user.pk)
+        with override_settings(FEATURES={"skip_breaks": False}):
+            with self.assertNumQueries(1):
+                self.assertEqual(user.hours, {"today": 6, "week": 8})
+                self.assertIsNotNone(user.take_a_break_warning(add=1))
+
+        hours.delete()
+        brk.delete()
+        self.assertFalse(DailyTotal.objects.filter(user=user, day=today).exists())
+
+        DailyTotal.objects.rebuild()
+        self.assertEqual(
+            list(DailyTotal.objects.filter(user=user).values_list("day", "hours")),
+            [(in_days(-1), 2)],
+        )
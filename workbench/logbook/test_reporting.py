@@ -2,6 +2,7 @@ import datetime as dt
 from decimal import Decimal
 
 from django.test import TestCase
+from django.utils import timezone
 
 from workbench import factories
 from workbench.logbook.reporting import classify_logging_delay, logbook_stats
@@ -39,6 +40,42 @@ class ReportingTest(TestCase):
             {"avg": Decimal("1"), "count": 1, "sum": Decimal("1.0")},
         )
 
+    def test_stats_from_daily_totals(self):
+        """Statistics are aggregated from the daily totals"""
+        user = factories.UserFactory.create()
+        today = dt.date.today()
+        factories.LoggedHoursFactory.create(
+            rendered_by=user,
+            rendered_on=today,
+            hours=4,
+            created_at=timezone.make_aware(
+                dt.datetime.combine(today, dt.time(14, 0)), timezone.utc
+            ),
+        )
+        factories.LoggedHoursFactory.create(
+            rendered_by=user,
+            rendered_on=today,
+            hours=2,
+            created_at=timezone.make_aware(
+                dt.datetime.combine(today, dt.time(18, 0)), timezone.utc
+            ),
+        )
+        factories.BreakFactory.create(
+            user=user,
+            starts_at=timezone.make_aware(dt.datetime.combine(today, dt.time(12, 0))),
+            ends_at=timezone.make_aware(dt.datetime.combine(today, dt.time(12, 10))),
+        )
+
+        with self.assertNumQueries(2):
+            stats = logbook_stats([today, today])
+
+        self.assertEqual(
+            stats["users"][0]["logged_hours_stats"],
+            {"count": 2, "sum": Decimal("6.0"), "avg": Decimal("3.0")},
+        )
+        self.assertAlmostEqual(stats["users"][0]["mean_logging_delay"]["delay"], 4)
+        self.assertEqual(stats["insufficient_breaks"], {"days": 1, "of": 1})
+
     def test_classify_logging_delay(self):
         """Logging delay classification"""
         self.assertEqual(classify_logging_delay(Decimal(-1))[1], "success")
@@ -0,0 +1,41 @@
+import datetime as dt
+
+from django.core.management import BaseCommand
+
+from workbench.audit.tasks import (
+    archive_audit_partitions,
+    create_audit_partitions,
+    restore_audit_partition,
+)
+
+
+class Command(BaseCommand):
+    help = "Archive or restore monthly partitions of the audit log"
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", type=str)
+        parser.add_argument(
+            "--keep-months",
+            type=int,
+            default=36,
+            help="Number of months to keep in the database (defaults to %(default)s)",
+        )
+        parser.add_argument(
+            "--restore",
+            type=lambda value: dt.datetime.strptime(value, "%Y-%m").date(),
+            help="Restore the archived partition of the given month (YYYY-MM)",
+        )
+
+    def handle(self, **options):
+        if options["restore"]:
+            partition = restore_audit_partition(
+                options["directory"], options["restore"]
+            )
+            self.stdout.write("Restored %s" % partition)
+            return
+
+        create_audit_partitions()
+        for path in archive_audit_partitions(
+            options["directory"], keep_months=options["keep_months"]
+        ):
+            self.stdout.write("Archived %s" % path)
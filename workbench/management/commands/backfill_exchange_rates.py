@@ -0,0 +1,42 @@
+import datetime as dt
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from workbench.expenses.models import ExchangeRates
+from workbench.expenses.rates import PROVIDERS
+
+
+def date(value):
+    return dt.datetime.strptime(value, "%Y-%m-%d").date()
+
+
+class Command(BaseCommand):
+    help = "Load exchange rates for a date range from the API or from a file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("date_from", type=date)
+        parser.add_argument("date_until", type=date, nargs="?", default=dt.date.today())
+        parser.add_argument(
+            "--file",
+            type=str,
+            help="Load rates from a JSON file in the format of the"
+            " exchangerates.json fixture instead of the API",
+        )
+
+    def handle(self, **options):
+        if options["date_until"] < options["date_from"]:
+            raise CommandError("The end date has to be after the start date.")
+
+        start = time.perf_counter()
+        if options["file"]:
+            rates = PROVIDERS["file"](
+                options["file"], options["date_from"], options["date_until"]
+            )
+        else:
+            rates = PROVIDERS["remote"](options["date_from"], options["date_until"])
+        count = ExchangeRates.objects.load(rates)
+        self.stdout.write(
+            "Loaded exchange rates for %s days in %.2fs"
+            % (count, time.perf_counter() - start)
+        )
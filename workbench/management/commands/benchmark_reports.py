@@ -0,0 +1,51 @@
+from timeit import timeit
+
+from django.core.management import BaseCommand
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from workbench.awt.models import AnnualWorkingTimeSnapshot
+from workbench.awt.reporting import active_users, annual_working_time
+
+
+class Command(BaseCommand):
+    help = (
+        "Time reports, e.g. to compare implementations by running this on"
+        " different revisions against the same database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("report", choices=["annual_working_time"])
+        parser.add_argument(
+            "--years",
+            nargs="+",
+            type=int,
+            default=[],
+            help="Years of the annual working time report",
+        )
+        parser.add_argument(
+            "--number",
+            type=int,
+            default=3,
+            help="Number of runs to average (default: 3)",
+        )
+
+    def handle(self, report, **options):
+        getattr(self, report)(**options)
+
+    def measure(self, name, run, *, number):
+        with CaptureQueriesContext(connections["default"]) as context:
+            run()
+        seconds = timeit(run, number=number) / number
+        self.stdout.write("%s: %.3fs, %s queries" % (name, seconds, len(context)))
+
+    def annual_working_time(self, *, years, number, **options):
+        def run():
+            for year in years:
+                annual_working_time(year, users=active_users(year))
+
+        AnnualWorkingTimeSnapshot.objects.filter(year__in=years).delete()
+        with CaptureQueriesContext(connections["default"]) as context:
+            run()
+        self.stdout.write("annual_working_time, cold: %s queries" % len(context))
+        self.measure("annual_working_time, warm", run, number=number)
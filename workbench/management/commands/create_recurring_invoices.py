@@ -0,0 +1,42 @@
+import time
+
+from django.core.management import BaseCommand
+
+from workbench.invoices.models import RecurringInvoice, create_recurring_invoices
+
+
+class Command(BaseCommand):
+    help = "Create all due invoices of recurring invoices"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the invoices which would be created",
+        )
+
+    def handle(self, **options):
+        start = time.perf_counter()
+        planned = create_recurring_invoices(
+            RecurringInvoice.objects.renewal_candidates(),
+            dry_run=options["dry_run"],
+        )
+        for ri, invoice in planned:
+            self.stdout.write(
+                "%s: %s - %s %s"
+                % (
+                    ri,
+                    invoice.service_period_from,
+                    invoice.service_period_until,
+                    invoice.total,
+                )
+            )
+        self.stdout.write(
+            "%s %s invoices for %s recurring invoices in %.2fs"
+            % (
+                "Planned" if options["dry_run"] else "Created",
+                len(planned),
+                len({ri.pk for ri, invoice in planned}),
+                time.perf_counter() - start,
+            )
+        )
@@ -14,9 +14,22 @@ class Command(BaseCommand):
             default=dt.date.today().year,
             help="The year for which to export debtors (defaults to %(default)s)",
         )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            help="Number of processes rendering PDFs (defaults to the number of CPUs)",
+        )
         parser.add_argument("target", type=str)
 
     def handle(self, **options):
         date_range = [dt.date(options["year"], 1, 1), dt.date(options["year"], 12, 31)]
         with io.open(options["target"], "wb") as f:
-            paid_debtors_zip(date_range, file=f)
+            paid_debtors_zip(
+                date_range,
+                file=f,
+                processes=options["processes"],
+                progress=lambda done, total: self.stdout.write(
+                    "\r%s/%s PDFs" % (done, total), ending=""
+                ),
+            )
+        self.stdout.write("")
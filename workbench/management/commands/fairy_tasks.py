@@ -2,9 +2,14 @@ from django.core.management import BaseCommand
 from django.utils.translation import activate
 
 from workbench.accounts.middleware import set_user_name
+from workbench.audit.tasks import create_audit_partitions
+from workbench.expenses.tasks import update_exchange_rates
 from workbench.invoices.tasks import create_recurring_invoices_and_notify
 from workbench.reporting.accounting import send_accounting_files
-from workbench.reporting.tasks import create_accruals_for_last_month
+from workbench.reporting.tasks import (
+    create_accruals_for_last_month,
+    prune_project_budget_snapshots,
+)
 
 
 class Command(BaseCommand):
@@ -13,6 +18,9 @@ class Command(BaseCommand):
     def handle(self, **options):
         activate("de")
         set_user_name("Fairy tasks")
+        create_audit_partitions()
         create_accruals_for_last_month()
+        prune_project_budget_snapshots()
         create_recurring_invoices_and_notify()
         send_accounting_files()
+        update_exchange_rates()
@@ -6,8 +6,8 @@ from django.utils.translation import activate, gettext as _
 
 from workbench.accounts.models import User
 from workbench.contacts.models import Organization
-from workbench.invoices.models import Invoice
 from workbench.logbook.models import LoggedHours
+from workbench.reporting.models import CustomerStatistics
 from workbench.tools.formats import Z1
 from workbench.tools.xlsx import WorkbenchXLSXDocument
 
@@ -21,17 +21,12 @@ class Command(BaseCommand):
     def handle(self, **options):
         activate("de")
 
+        statistics = {row.customer_id: row for row in CustomerStatistics.objects.all()}
         invoiced_per_customer = {
-            row["customer"]: row["total_excl_tax__sum"] - row["third_party_costs__sum"]
-            for row in Invoice.objects.invoiced()
-            .filter(project__isnull=False)
-            .order_by()
-            .values("customer")
-            .annotate(Sum("total_excl_tax"), Sum("third_party_costs"))
+            customer: row.project_invoiced for customer, row in statistics.items()
         }
         hours = defaultdict(lambda: defaultdict(lambda: Z1))
         earned = defaultdict(lambda: defaultdict(lambda: Z1))
-        customer_hours = defaultdict(lambda: Z1)
         user_hours = defaultdict(lambda: Z1)
 
         for row in (
@@ -42,11 +37,10 @@ class Command(BaseCommand):
             hours[row["service__project__customer"]][row["rendered_by"]] = row[
                 "hours__sum"
             ]
-            customer_hours[row["service__project__customer"]] += row["hours__sum"]
             user_hours[row["rendered_by"]] += row["hours__sum"]
 
         for customer, total_excl_tax in invoiced_per_customer.items():
-            _c_hours = sum(hours[customer].values(), Z1)
+            _c_hours = statistics[customer].hours
             if not total_excl_tax:
                 continue
             if not _c_hours:
@@ -67,7 +61,7 @@ class Command(BaseCommand):
                     {
                         "customer": customer,
                         "invoiced": invoiced_per_customer.get(customer.id, Z1),
-                        "hours": customer_hours[customer.id],
+                        "hours": statistics[customer.id].hours,
                     },
                     "invoiced",
                 )
@@ -1,4 +1,7 @@
+import datetime as dt
+
 from django.contrib import messages
+from django.db.models import prefetch_related_objects
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils.translation import gettext as _
@@ -7,7 +10,7 @@ from workbench import generic
 from workbench.offers.forms import OfferCopyForm, OfferDeleteForm
 from workbench.offers.models import Offer
 from workbench.projects.models import Project
-from workbench.tools.pdf import pdf_response
+from workbench.tools.pdf import cached_pdf_response, pdf_cache_key
 
 
 class OfferPDFView(generic.DetailView):
@@ -15,37 +18,58 @@ class OfferPDFView(generic.DetailView):
 
     def get(self, request, *args, **kwargs):
         self.object = self.get_object()
+        prefetch_related_objects([self.object], "services")
+
+        def render(pdf):
+            pdf.init_letter()
+            pdf.process_offer(self.object)
+            pdf.generate()
 
-        pdf, response = pdf_response(
+        return cached_pdf_response(
             self.object.code,
             as_attachment=request.GET.get("disposition") == "attachment",
+            key=pdf_cache_key(
+                [
+                    self.object,
+                    self.object.code,
+                    self.object.owned_by.get_full_name(),
+                    *self.object.services.all(),
+                ]
+            ),
+            render=render,
         )
 
-        pdf.init_letter()
-        pdf.process_offer(self.object)
-        pdf.generate()
-
-        return response
-
 
 class ProjectOfferPDFView(generic.DetailView):
     model = Project
 
     def get(self, request, *args, **kwargs):
         self.object = self.get_object()
-        offers = list(self.object.offers.order_by("_code"))
+        offers = list(
+            self.object.offers.order_by("_code")
+            .select_related("owned_by")
+            .prefetch_related("services")
+        )
 
         if not offers:
             messages.error(request, _("No offers in project."))
             return redirect(self.object)
 
-        pdf, response = pdf_response(
+        return cached_pdf_response(
             self.object.code,
             as_attachment=request.GET.get("disposition") == "attachment",
+            key=pdf_cache_key(
+                [
+                    self.object,
+                    self.object.code,
+                    dt.date.today(),
+                    *offers,
+                    *[offer.owned_by.get_full_name() for offer in offers],
+                    *[service for offer in offers for service in offer.services.all()],
+                ]
+            ),
+            render=lambda pdf: pdf.offers_pdf(project=self.object, offers=offers),
         )
-        pdf.offers_pdf(project=self.object, offers=offers)
-
-        return response
 
 
 class OfferDeleteView(generic.DeleteView):
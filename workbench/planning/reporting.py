@@ -1,15 +1,19 @@
 import datetime as dt
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
 from itertools import islice
 
 from django.db import connections
 from django.db.models import Q, Sum
+from django.urls import reverse
 
 from workbench.accounts.models import User
 from workbench.awt.models import Absence
 from workbench.invoices.utils import recurring
 from workbench.logbook.models import LoggedHours
+from workbench.offers.models import Offer
 from workbench.planning.models import PlannedWork, PlanningRequest
+from workbench.projects.models import Project
 from workbench.tools.formats import Z1, Z2, local_date_format
 from workbench.tools.reporting import query
 from workbench.tools.validation import monday
@@ -33,13 +37,23 @@ def _period(weeks, min, max):
 
 
 class Planning:
+    """
+    Builds the planning report
+
+    Week values are stored in lists indexed by the position of the week in
+    ``weeks`` and rows are fetched using ``values_list``; model instances are
+    only loaded for the (comparatively few) projects, offers and users which
+    are shown in the report.
+    """
+
     def __init__(self, *, weeks, users=None):
         self.weeks = weeks
         self.users = users
 
-        self._by_week = defaultdict(lambda: Z1)
-        self._requested_by_week = defaultdict(lambda: Z1)
-        self._by_project_and_week = defaultdict(lambda: defaultdict(lambda: Z1))
+        self._week_index = {week: idx for idx, week in enumerate(weeks)}
+        self._by_week = [Z1] * len(weeks)
+        self._requested_by_week = [Z1] * len(weeks)
+        self._by_project_and_week = defaultdict(lambda: [Z1] * len(weeks))
         self._projects_offers = defaultdict(lambda: defaultdict(list))
         self._project_ids = set()
         self._user_ids = {user.id for user in users} if users else set()
@@ -49,28 +63,59 @@ class Planning:
 
         self._absences = defaultdict(lambda: [0] * len(weeks))
 
-    def add_planned_work(self, queryset):
-        for pw in queryset.filter(weeks__overlap=self.weeks).select_related(
-            "user", "project__owned_by", "offer__project", "offer__owned_by"
-        ):
-            per_week = (pw.planned_hours / len(pw.weeks)).quantize(Z2)
-            for week in pw.weeks:
-                self._by_week[week] += per_week
-                self._by_project_and_week[pw.project][week] += per_week
+    def _indices(self, weeks):
+        return [self._week_index[week] for week in weeks if week in self._week_index]
 
-            date_from = min(pw.weeks)
-            date_until = max(pw.weeks) + dt.timedelta(days=6)
+    def _range(self, date_from, date_until):
+        # self.weeks is sorted, find the slice of weeks between both dates
+        return range(
+            bisect_left(self.weeks, date_from), bisect_right(self.weeks, date_until)
+        )
 
-            self._projects_offers[pw.project][pw.offer].append(
+    def add_planned_work(self, queryset):
+        for (
+            id,
+            title,
+            planned_hours,
+            weeks,
+            user_short_name,
+            user_email,
+            user_id,
+            project_id,
+            offer_id,
+        ) in queryset.filter(weeks__overlap=self.weeks).values_list(
+            "id",
+            "title",
+            "planned_hours",
+            "weeks",
+            "user___short_name",
+            "user__email",
+            "user_id",
+            "project_id",
+            "offer_id",
+        ):
+            per_week = (planned_hours / len(weeks)).quantize(Z2)
+            hours_per_week = [Z1] * len(self.weeks)
+            by_project = self._by_project_and_week[project_id]
+            for idx in self._indices(weeks):
+                self._by_week[idx] += per_week
+                by_project[idx] += per_week
+                hours_per_week[idx] = per_week
+
+            date_from = min(weeks)
+            date_until = max(weeks) + dt.timedelta(days=6)
+            user = user_short_name or user_email
+
+            self._projects_offers[project_id][offer_id].append(
                 {
                     "work": {
                         "is_request": False,
-                        "id": pw.id,
-                        "title": pw.title,
-                        "text": pw.user.get_short_name(),
-                        "user": pw.user.get_short_name(),
-                        "planned_hours": pw.planned_hours,
-                        "url": pw.get_absolute_url(),
+                        "id": id,
+                        "title": title,
+                        "text": user,
+                        "user": user,
+                        "planned_hours": planned_hours,
+                        "url": reverse("planning_plannedwork_detail", args=[id]),
                         "date_from": date_from,
                         "date_until": date_until,
                         "range": "{} – {}".format(
@@ -78,59 +123,91 @@ class Planning:
                             local_date_format(date_until, fmt="d.m."),
                         ),
                     },
-                    "hours_per_week": [
-                        per_week if week in pw.weeks else Z1 for week in self.weeks
-                    ],
+                    "hours_per_week": hours_per_week,
                     "per_week": per_week,
                 }
             )
 
-            self._project_ids.add(pw.project.pk)
-            self._user_ids.add(pw.user.id)
+            self._project_ids.add(project_id)
+            self._user_ids.add(user_id)
 
     def add_planning_requests(self, queryset):
-        for pr in (
+        requests = list(
             queryset.filter(
                 Q(earliest_start_on__lte=max(self.weeks)),
                 Q(completion_requested_on__gte=min(self.weeks)),
             )
-            .select_related("project__owned_by", "offer__project", "offer__owned_by")
-            .prefetch_related("receivers")
-        ).distinct():
-            per_week = (pr.missing_hours / len(pr.weeks)).quantize(Z2)
-            for week in pr.weeks:
-                self._requested_by_week[week] += per_week
-
-            date_from = min(pr.weeks)
-            date_until = max(pr.weeks) + dt.timedelta(days=6)
-
-            self._projects_offers[pr.project][pr.offer].append(
+            .values_list(
+                "id",
+                "title",
+                "requested_hours",
+                "planned_hours",
+                "earliest_start_on",
+                "completion_requested_on",
+                "project_id",
+                "offer_id",
+            )
+            .distinct()
+        )
+        receivers = defaultdict(list)
+        for request_id, user_id, short_name, email in (
+            PlanningRequest.receivers.through.objects.filter(
+                planningrequest__in=[row[0] for row in requests]
+            )
+            .order_by("user___full_name")
+            .values_list(
+                "planningrequest_id", "user_id", "user___short_name", "user__email"
+            )
+        ):
+            receivers[request_id].append((user_id, short_name or email))
+
+        for (
+            id,
+            title,
+            requested_hours,
+            planned_hours,
+            earliest_start_on,
+            completion_requested_on,
+            project_id,
+            offer_id,
+        ) in requests:
+            weeks = PlanningRequest(
+                earliest_start_on=earliest_start_on,
+                completion_requested_on=completion_requested_on,
+            ).weeks
+            missing_hours = requested_hours - planned_hours
+            per_week = (missing_hours / len(weeks)).quantize(Z2)
+            for idx in self._indices(weeks):
+                self._requested_by_week[idx] += per_week
+
+            date_from = min(weeks)
+            date_until = max(weeks) + dt.timedelta(days=6)
+
+            self._projects_offers[project_id][offer_id].append(
                 {
                     "work": {
                         "is_request": True,
-                        "id": pr.id,
-                        "title": pr.title,
-                        "text": ", ".join(
-                            user.get_short_name() for user in pr.receivers.all()
-                        ),
-                        "requested_hours": pr.requested_hours,
-                        "planned_hours": pr.planned_hours,
-                        "missing_hours": pr.missing_hours,
-                        "url": pr.get_absolute_url(),
+                        "id": id,
+                        "title": title,
+                        "text": ", ".join(name for _id, name in receivers[id]),
+                        "requested_hours": requested_hours,
+                        "planned_hours": planned_hours,
+                        "missing_hours": missing_hours,
+                        "url": reverse("planning_planningrequest_detail", args=[id]),
                         "date_from": date_from,
                         "date_until": date_until,
                         "range": "{} – {}".format(
                             local_date_format(date_from, fmt="d.m."),
                             local_date_format(date_until, fmt="d.m."),
                         ),
-                        "period": _period(self.weeks, min(pr.weeks), max(pr.weeks)),
+                        "period": _period(self.weeks, min(weeks), max(weeks)),
                     },
                     "per_week": per_week,
                 }
             )
 
-            self._project_ids.add(pr.project.pk)
-            self._user_ids |= {user.id for user in pr.receivers.all()}
+            self._project_ids.add(project_id)
+            self._user_ids |= {user_id for user_id, _name in receivers[id]}
 
     def add_worked_hours(self, queryset):
         for row in (
@@ -142,24 +219,20 @@ class Planning:
             self._worked_hours_by_project[row["service__project"]] += row["hours__sum"]
 
     def add_absences(self, queryset):
-        for absence in queryset.filter(
+        for user_id, starts_on, ends_on, days in queryset.filter(
             Q(user__in=self._user_ids),
             Q(starts_on__lte=max(self.weeks)),
             Q(ends_on__isnull=False, ends_on__gte=min(self.weeks))
             | Q(ends_on__isnull=True, starts_on__gte=min(self.weeks)),
-        ).select_related("user"):
-            date_from = monday(absence.starts_on)
-            date_until = monday(absence.ends_on or absence.starts_on)
-            hours = absence.days * DAILY_PLANNING_HOURS
-            weeks = [
-                (idx, week)
-                for idx, week in enumerate(self.weeks)
-                if date_from <= week <= date_until
-            ]
-
-            for idx, week in weeks:
-                self._absences[absence.user][idx] += hours / len(weeks)
-                self._by_week[week] += hours / len(weeks)
+        ).values_list("user_id", "starts_on", "ends_on", "days"):
+            indices = self._range(monday(starts_on), monday(ends_on or starts_on))
+            if not indices:
+                continue
+            hours = days * DAILY_PLANNING_HOURS / len(indices)
+            absences = self._absences[user_id]
+            for idx in indices:
+                absences[idx] += hours
+                self._by_week[idx] += hours
 
     def _offer_record(self, offer, work_list):
         date_from = min(pw["work"]["date_from"] for pw in work_list)
@@ -234,9 +307,7 @@ class Planning:
                 "planned_hours": hours,
                 "worked_hours": self._worked_hours_by_project[project.id],
             },
-            "by_week": [
-                self._by_project_and_week[project][week] for week in self.weeks
-            ],
+            "by_week": self._by_project_and_week[project.id],
             "offers": offers,
         }
 
@@ -278,6 +349,34 @@ where percentage is not NULL -- NULL produced by outer join
             ],
         }
 
+    def _projects_offers_records(self):
+        projects = Project.objects.in_bulk(self._projects_offers)
+        offers = Offer.objects.select_related("project").in_bulk(
+            {
+                offer_id
+                for offers in self._projects_offers.values()
+                for offer_id in offers
+                if offer_id
+            }
+        )
+        return sorted(
+            [
+                self._project_record(
+                    projects[project_id],
+                    {
+                        offers.get(offer_id): work_list
+                        for offer_id, work_list in project_offers.items()
+                    },
+                )
+                for project_id, project_offers in self._projects_offers.items()
+            ],
+            key=lambda row: (
+                row["project"]["date_from"],
+                row["project"]["date_until"],
+                -row["project"]["planned_hours"],
+            ),
+        )
+
     def report(self):
         try:
             this_week_index = self.weeks.index(monday())
@@ -297,21 +396,15 @@ where percentage is not NULL -- NULL produced by outer join
                 }
                 for week in self.weeks
             ],
-            "projects_offers": sorted(
-                [
-                    self._project_record(project, offers)
-                    for project, offers in self._projects_offers.items()
-                ],
-                key=lambda row: (
-                    row["project"]["date_from"],
-                    row["project"]["date_until"],
-                    -row["project"]["planned_hours"],
-                ),
-            ),
-            "by_week": [self._by_week[week] for week in self.weeks],
-            "requested_by_week": [self._requested_by_week[week] for week in self.weeks],
+            "projects_offers": self._projects_offers_records(),
+            "by_week": self._by_week,
+            "requested_by_week": self._requested_by_week,
             "absences": [
-                (str(user), lst) for user, lst in sorted(self._absences.items())
+                (str(user), lst)
+                for user, lst in sorted(
+                    (user, self._absences[user.id])
+                    for user in User.objects.filter(id__in=self._absences)
+                )
             ],
             "capacity": self.capacity() if self.users else None,
         }
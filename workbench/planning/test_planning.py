@@ -86,6 +86,51 @@ class PlanningTest(TestCase):
         self.assertAlmostEqual(sum(report["by_week"]), Decimal("26"))
         self.assertEqual(len(report["projects_offers"]), 1)
 
+    def test_reporting_queries(self):
+        """The number of queries does not depend on the amount of planned work"""
+        pw = factories.PlannedWorkFactory.create(weeks=[monday()])
+        factories.AbsenceFactory.create(user=pw.user)
+        team = factories.TeamFactory.create()
+        team.members.add(pw.user)
+
+        with self.assertNumQueries(8):
+            report = reporting.team_planning(team)
+        self.assertEqual(len(report["projects_offers"]), 1)
+
+        for i in range(5):
+            factories.PlannedWorkFactory.create(
+                user=pw.user, weeks=[monday() + dt.timedelta(days=7 * i)]
+            )
+            factories.AbsenceFactory.create(user=pw.user)
+
+        with self.assertNumQueries(8):
+            report = reporting.team_planning(team)
+        self.assertEqual(len(report["projects_offers"]), 6)
+        # Two planned works and six absences of one day each
+        self.assertEqual(report["by_week"][2], Decimal("76"))
+
+    def test_project_planning_queries(self):
+        """Project planning queries are bounded by the size of the project"""
+        project = factories.ProjectFactory.create()
+        offer = factories.OfferFactory.create(project=project)
+        for i in range(5):
+            pw = factories.PlannedWorkFactory.create(
+                project=project,
+                offer=offer if i % 2 else None,
+                weeks=[monday() + dt.timedelta(days=7 * i)],
+            )
+            factories.AbsenceFactory.create(user=pw.user)
+            pr = factories.PlanningRequestFactory.create(project=project)
+            pr.receivers.add(pw.user)
+        factories.PlannedWorkFactory.create(weeks=[monday()])
+
+        with self.assertNumQueries(9):
+            # Weeks, planned work, planning requests and their receivers,
+            # worked hours, absences, projects, offers and absent users
+            report = reporting.project_planning(project)
+        self.assertEqual(len(report["projects_offers"]), 1)
+        self.assertEqual(len(report["absences"]), 5)
+
     def test_planning_search_forms(self):
         """Planning request search form branch test"""
 
@@ -263,6 +263,15 @@ class Project(Model):
             super().save(*args, **kwargs)
             self.refresh_from_db()
 
+        self._update_fts()
+        if new:
+            super().save()
+        else:
+            super().save(*args, **kwargs)
+
+    save.alters_data = True
+
+    def _update_fts(self):
         self._fts = " ".join(
             str(part)
             for part in [
@@ -271,12 +280,6 @@ class Project(Model):
                 self.contact.full_name if self.contact else "",
             ]
         )
-        if new:
-            super().save()
-        else:
-            super().save(*args, **kwargs)
-
-    save.alters_data = True
 
     def clean_fields(self, exclude=None):
         super().clean_fields(exclude=exclude)
@@ -1,20 +1,18 @@
+import datetime as dt
 from collections import defaultdict
 
 from django.db import connections
-from django.db.models import Sum
+from django.db.models import Q, Sum
 
 from workbench.accounts.models import User
 from workbench.logbook.models import LoggedHours
 from workbench.offers.models import Offer
 from workbench.projects.models import Project
+from workbench.reporting.models import MonthlyLoggedHours
 from workbench.tools.formats import Z0, Z1
 
 
-def green_hours(date_range, *, users=None):
-    with connections["default"].cursor() as cursor:
-        cursor.execute(
-            """\
-WITH
+GREEN_HOURS_FACTOR = """\
 service AS (
   SELECT ps.project_id, SUM(service_hours) AS hours
   FROM projects_service ps
@@ -23,32 +21,82 @@ service AS (
   GROUP BY ps.project_id
 ),
 logged AS (
-  SELECT project_id, SUM(hours) AS hours FROM logbook_loggedhours lh
-  LEFT JOIN projects_service ps ON lh.service_id=ps.id
+  SELECT project_id, SUM(hours) AS hours FROM reporting_monthlyloggedhours
   GROUP BY project_id
+),
+green_hours_factor AS (
+  SELECT logged.project_id, service.hours / logged.hours AS factor
+  FROM logged
+  LEFT JOIN service ON logged.project_id=service.project_id
+  WHERE service.hours / logged.hours < 1
 )
-SELECT logged.project_id, service.hours / logged.hours
-FROM logged
-LEFT JOIN service ON logged.project_id=service.project_id
-WHERE service.hours / logged.hours < 1;
-            """,
+"""
+
+
+def _hours_within(date_range):
+    """
+    Hours per project and user. Complete months are read from the monthly
+    rollup, only the days at the boundaries hit the logbook itself.
+    """
+    start, end = date_range
+    first = start.replace(day=1)
+    if first < start:
+        first = (first + dt.timedelta(days=31)).replace(day=1)
+    last = end.replace(day=1)
+    if (end + dt.timedelta(days=1)).day == 1:
+        last = end + dt.timedelta(days=1)
+
+    within = defaultdict(lambda: defaultdict(lambda: Z1))
+    if first < last:
+        rows = list(
+            MonthlyLoggedHours.objects.filter(month__gte=first, month__lt=last)
+            .order_by()
+            .values("project", "rendered_by")
+            .annotate(Sum("hours"))
+        )
+        boundaries = [
+            (start, first - dt.timedelta(days=1)),
+            (last, end),
+        ]
+    else:
+        rows = []
+        boundaries = [(start, end)]
+
+    q = Q()
+    for boundary in boundaries:
+        if boundary[0] <= boundary[1]:
+            q |= Q(rendered_on__range=boundary)
+    if q:
+        rows.extend(
+            {
+                "project": row["service__project"],
+                "rendered_by": row["rendered_by"],
+                "hours__sum": row["hours__sum"],
+            }
+            for row in LoggedHours.objects.filter(q)
+            .order_by()
+            .values("service__project", "rendered_by")
+            .annotate(Sum("hours"))
+        )
+
+    for row in rows:
+        within[row["project"]][row["rendered_by"]] += row["hours__sum"]
+    return within
+
+
+def green_hours(date_range, *, users=None):
+    with connections["default"].cursor() as cursor:
+        cursor.execute(
+            "WITH "
+            + GREEN_HOURS_FACTOR
+            + "SELECT project_id, factor FROM green_hours_factor",
             [Offer.DECLINED],
         )
         green_hours_factor = defaultdict(lambda: Z0 + 1, cursor)
 
-    within = defaultdict(lambda: defaultdict(lambda: Z1))
-    project_ids = set()
-    user_ids = set()
-
-    for row in (
-        LoggedHours.objects.filter(rendered_on__range=date_range)
-        .order_by()
-        .values("service__project", "rendered_by")
-        .annotate(Sum("hours"))
-    ):
-        project_ids.add(row["service__project"])
-        user_ids.add(row["rendered_by"])
-        within[row["service__project"]][row["rendered_by"]] = row["hours__sum"]
+    within = _hours_within(date_range)
+    project_ids = set(within)
+    user_ids = {user_id for hours in within.values() for user_id in hours}
 
     green = defaultdict(lambda: Z1)
     red = defaultdict(lambda: Z1)
@@ -97,98 +145,29 @@ WHERE service.hours / logged.hours < 1;
 def green_hours_by_month():
     with connections["default"].cursor() as cursor:
         cursor.execute(
-            """\
-DROP TABLE IF EXISTS green_hours_factor;
-CREATE TEMPORARY TABLE green_hours_factor AS
-WITH
-service AS (
-  SELECT ps.project_id, SUM(service_hours) AS hours
-  FROM projects_service ps
-  LEFT OUTER JOIN offers_offer o ON ps.offer_id=o.id
-  WHERE ps.offer_id IS NULL OR o.status!=40 -- Declined
-  GROUP BY ps.project_id
-),
-logged AS (
-  SELECT project_id, SUM(hours) AS hours FROM logbook_loggedhours lh
-  LEFT JOIN projects_service ps ON lh.service_id=ps.id
-  GROUP BY project_id
-)
-SELECT
-  logged.project_id,
-  service.hours / logged.hours AS factor
-FROM logged
-LEFT JOIN service ON logged.project_id=service.project_id
-WHERE service.hours / logged.hours < 1;
-
-DROP TABLE IF EXISTS total_hours;
-CREATE TEMPORARY TABLE total_hours AS
-SELECT
-  date_trunc('month', rendered_on) AS month,
-  SUM(hours) AS total_hours
-FROM logbook_loggedhours lh
-LEFT JOIN projects_service ps ON lh.service_id=ps.id
-GROUP BY month;
-
-DROP TABLE IF EXISTS green_hours;
-CREATE TEMPORARY TABLE green_hours AS
-SELECT
-  month,
-  SUM(hours) AS green_hours
-FROM (
-  SELECT
-    ps.project_id,
-    date_trunc('month', rendered_on) AS month,
-    hours * COALESCE(ghf.factor, 1) AS hours
-  FROM logbook_loggedhours lh
-  LEFT JOIN projects_service ps ON lh.service_id=ps.id
-  LEFT JOIN projects_project p ON ps.project_id=p.id
-  LEFT OUTER JOIN green_hours_factor ghf ON ghf.project_id=p.id
-  WHERE
-    p.type='order'
-) subquery
-GROUP BY month;
-
-DROP TABLE IF EXISTS maintenance_hours;
-CREATE TEMPORARY TABLE maintenance_hours AS
-SELECT
-  date_trunc('month', rendered_on) AS month,
-  SUM(hours) AS maintenance_hours
-FROM logbook_loggedhours lh
-LEFT JOIN projects_service ps ON lh.service_id=ps.id
-LEFT JOIN projects_project p ON ps.project_id=p.id
-WHERE
-  p.type='maintenance'
-GROUP BY month;
-
-DROP TABLE IF EXISTS internal_hours;
-CREATE TEMPORARY TABLE internal_hours AS
-SELECT
-  date_trunc('month', rendered_on) AS month,
-  SUM(hours) AS internal_hours
-FROM logbook_loggedhours lh
-LEFT JOIN projects_service ps ON lh.service_id=ps.id
-LEFT JOIN projects_project p ON ps.project_id=p.id
-WHERE
-  p.type='internal'
-GROUP BY month;
-
+            "WITH "
+            + GREEN_HOURS_FACTOR
+            + """\
 SELECT
-  th.month,
-  COALESCE(green_hours, 0),
-  COALESCE(maintenance_hours, 0),
-  COALESCE(internal_hours, 0),
-  COALESCE(total_hours, 0)
-FROM total_hours th
-LEFT OUTER JOIN green_hours gh ON th.month=gh.month
-LEFT OUTER JOIN maintenance_hours mh ON th.month=mh.month
-LEFT OUTER JOIN internal_hours ih ON th.month=ih.month
-ORDER BY th.month
-        """
+  mlh.month,
+  SUM(
+    CASE WHEN p.type=%s THEN mlh.hours * COALESCE(ghf.factor, 1) ELSE 0 END
+  ),
+  SUM(CASE WHEN p.type=%s THEN mlh.hours ELSE 0 END),
+  SUM(CASE WHEN p.type=%s THEN mlh.hours ELSE 0 END),
+  SUM(mlh.hours)
+FROM reporting_monthlyloggedhours mlh
+LEFT JOIN projects_project p ON mlh.project_id=p.id
+LEFT OUTER JOIN green_hours_factor ghf ON ghf.project_id=mlh.project_id
+GROUP BY mlh.month
+ORDER BY mlh.month
+""",
+            [Offer.DECLINED, Project.ORDER, Project.MAINTENANCE, Project.INTERNAL],
         )
 
         return [
             {
-                "month": row[0].date(),
+                "month": row[0],
                 "green": row[1],
                 "maintenance": row[2],
                 "internal": row[3],
@@ -201,7 +180,6 @@ ORDER BY th.month
 
 
 def test():  # pragma: no cover
-    import datetime as dt
     from pprint import pprint
 
     pprint(green_hours([dt.date(2019, 1, 1), dt.date(2019, 12, 31)]))
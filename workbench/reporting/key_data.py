@@ -88,7 +88,7 @@ def gross_margin_by_month(date_range):
     gross = gross_profit_by_month(date_range)
     third = third_party_costs_by_month(date_range)
     accruals = accruals_by_month(date_range)
-    fte = full_time_equivalents_by_month()
+    fte = full_time_equivalents_by_month(date_range)
 
     months = sorted(set(chain.from_iterable([gross, third, accruals])))
     profit = []
@@ -0,0 +1,159 @@
+# Generated by Django 3.1.1 on 2020-09-21 09:12
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+ROLLUP_SQL = """\
+CREATE OR REPLACE FUNCTION reporting_monthlyloggedhours_add(
+  p_project_id integer,
+  p_rendered_by_id integer,
+  p_month date,
+  p_hours numeric
+) RETURNS void AS $$
+begin
+  INSERT INTO reporting_monthlyloggedhours (project_id, rendered_by_id, month, hours)
+  VALUES (p_project_id, p_rendered_by_id, p_month, p_hours)
+  ON CONFLICT (project_id, rendered_by_id, month)
+  DO UPDATE SET hours=reporting_monthlyloggedhours.hours + EXCLUDED.hours;
+
+  DELETE FROM reporting_monthlyloggedhours
+  WHERE project_id=p_project_id
+    AND rendered_by_id=p_rendered_by_id
+    AND month=p_month
+    AND hours=0;
+end
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION logbook_loggedhours_monthly() RETURNS trigger AS $$
+begin
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM reporting_monthlyloggedhours_add(
+      (SELECT project_id FROM projects_service WHERE id=old.service_id),
+      old.rendered_by_id,
+      date_trunc('month', old.rendered_on)::date,
+      -old.hours
+    );
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM reporting_monthlyloggedhours_add(
+      (SELECT project_id FROM projects_service WHERE id=new.service_id),
+      new.rendered_by_id,
+      date_trunc('month', new.rendered_on)::date,
+      new.hours
+    );
+  END IF;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS logbook_loggedhours_monthly_trigger ON logbook_loggedhours;
+CREATE TRIGGER logbook_loggedhours_monthly_trigger
+  AFTER INSERT OR DELETE OR UPDATE OF service_id, rendered_by_id, rendered_on, hours
+  ON logbook_loggedhours FOR EACH ROW EXECUTE PROCEDURE logbook_loggedhours_monthly();
+
+CREATE OR REPLACE FUNCTION projects_service_monthly() RETURNS trigger AS $$
+declare
+  r record;
+begin
+  FOR r IN
+    SELECT rendered_by_id, date_trunc('month', rendered_on)::date AS month, SUM(hours) AS hours
+    FROM logbook_loggedhours
+    WHERE service_id=new.id
+    GROUP BY 1, 2
+  LOOP
+    PERFORM reporting_monthlyloggedhours_add(old.project_id, r.rendered_by_id, r.month, -r.hours);
+    PERFORM reporting_monthlyloggedhours_add(new.project_id, r.rendered_by_id, r.month, r.hours);
+  END LOOP;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS projects_service_monthly_trigger ON projects_service;
+CREATE TRIGGER projects_service_monthly_trigger
+  AFTER UPDATE OF project_id ON projects_service FOR EACH ROW
+  WHEN (old.project_id IS DISTINCT FROM new.project_id)
+  EXECUTE PROCEDURE projects_service_monthly();
+
+INSERT INTO reporting_monthlyloggedhours (project_id, rendered_by_id, month, hours)
+SELECT
+  ps.project_id,
+  lh.rendered_by_id,
+  date_trunc('month', lh.rendered_on)::date,
+  SUM(lh.hours)
+FROM logbook_loggedhours lh
+LEFT JOIN projects_service ps ON lh.service_id=ps.id
+GROUP BY 1, 2, 3;
+"""
+
+ROLLUP_REVERSE_SQL = """\
+DROP TRIGGER IF EXISTS projects_service_monthly_trigger ON projects_service;
+DROP FUNCTION IF EXISTS projects_service_monthly();
+DROP TRIGGER IF EXISTS logbook_loggedhours_monthly_trigger ON logbook_loggedhours;
+DROP FUNCTION IF EXISTS logbook_loggedhours_monthly();
+DROP FUNCTION IF EXISTS reporting_monthlyloggedhours_add(integer, integer, date, numeric);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("logbook", "0020_auto_20200511_1419"),
+        ("projects", "0019_auto_20200523_0929"),
+        ("reporting", "0002_costcenter"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlyLoggedHours",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField(verbose_name="month")),
+                (
+                    "hours",
+                    models.DecimalField(
+                        decimal_places=1,
+                        max_digits=10,
+                        validators=[django.core.validators.MinValueValidator(0)],
+                        verbose_name="hours",
+                    ),
+                ),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="projects.project",
+                        verbose_name="project",
+                    ),
+                ),
+                (
+                    "rendered_by",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="rendered by",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "monthly logged hours",
+                "verbose_name_plural": "monthly logged hours",
+                "ordering": ["month"],
+                "unique_together": {("project", "rendered_by", "month")},
+            },
+        ),
+        migrations.RunSQL(ROLLUP_SQL, ROLLUP_REVERSE_SQL),
+    ]
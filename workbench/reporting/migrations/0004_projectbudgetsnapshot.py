@@ -0,0 +1,204 @@
+# Generated by Django 3.1.1 on 2020-09-22 14:03
+
+from decimal import Decimal
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+INVALIDATE_SQL = """\
+CREATE OR REPLACE FUNCTION reporting_projectbudgetsnapshot_invalidate(
+  p_project_id integer,
+  p_day date
+) RETURNS void AS $$
+begin
+  DELETE FROM reporting_projectbudgetsnapshot
+  WHERE project_id=p_project_id AND (p_day IS NULL OR cutoff_date >= p_day);
+end
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION logbook_projectbudgetsnapshot() RETURNS trigger AS $$
+begin
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM reporting_projectbudgetsnapshot_invalidate(
+      (SELECT project_id FROM projects_service WHERE id=old.service_id),
+      old.rendered_on
+    );
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM reporting_projectbudgetsnapshot_invalidate(
+      (SELECT project_id FROM projects_service WHERE id=new.service_id),
+      new.rendered_on
+    );
+  END IF;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS logbook_loggedhours_projectbudgetsnapshot_trigger
+  ON logbook_loggedhours;
+CREATE TRIGGER logbook_loggedhours_projectbudgetsnapshot_trigger
+  AFTER INSERT OR DELETE OR UPDATE OF service_id, rendered_on, hours
+  ON logbook_loggedhours FOR EACH ROW
+  EXECUTE PROCEDURE logbook_projectbudgetsnapshot();
+
+DROP TRIGGER IF EXISTS logbook_loggedcost_projectbudgetsnapshot_trigger
+  ON logbook_loggedcost;
+CREATE TRIGGER logbook_loggedcost_projectbudgetsnapshot_trigger
+  AFTER INSERT OR DELETE OR UPDATE OF service_id, rendered_on, cost
+  ON logbook_loggedcost FOR EACH ROW
+  EXECUTE PROCEDURE logbook_projectbudgetsnapshot();
+
+CREATE OR REPLACE FUNCTION invoices_invoice_projectbudgetsnapshot() RETURNS trigger AS $$
+begin
+  IF TG_OP IN ('UPDATE', 'DELETE') AND old.project_id IS NOT NULL
+      AND old.invoiced_on IS NOT NULL THEN
+    PERFORM reporting_projectbudgetsnapshot_invalidate(
+      old.project_id, old.invoiced_on
+    );
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') AND new.project_id IS NOT NULL
+      AND new.invoiced_on IS NOT NULL THEN
+    PERFORM reporting_projectbudgetsnapshot_invalidate(
+      new.project_id, new.invoiced_on
+    );
+  END IF;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS invoices_invoice_projectbudgetsnapshot_trigger
+  ON invoices_invoice;
+CREATE TRIGGER invoices_invoice_projectbudgetsnapshot_trigger
+  AFTER INSERT OR DELETE
+  OR UPDATE OF project_id, invoiced_on, status, total_excl_tax
+  ON invoices_invoice FOR EACH ROW
+  EXECUTE PROCEDURE invoices_invoice_projectbudgetsnapshot();
+
+CREATE OR REPLACE FUNCTION projects_service_projectbudgetsnapshot() RETURNS trigger AS $$
+begin
+  PERFORM reporting_projectbudgetsnapshot_invalidate(old.project_id, NULL);
+  PERFORM reporting_projectbudgetsnapshot_invalidate(new.project_id, NULL);
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS projects_service_projectbudgetsnapshot_trigger
+  ON projects_service;
+CREATE TRIGGER projects_service_projectbudgetsnapshot_trigger
+  AFTER UPDATE OF project_id, effort_rate ON projects_service FOR EACH ROW
+  WHEN (
+    old.project_id IS DISTINCT FROM new.project_id
+    OR old.effort_rate IS DISTINCT FROM new.effort_rate
+  )
+  EXECUTE PROCEDURE projects_service_projectbudgetsnapshot();
+"""
+
+INVALIDATE_REVERSE_SQL = """\
+DROP TRIGGER IF EXISTS projects_service_projectbudgetsnapshot_trigger
+  ON projects_service;
+DROP FUNCTION IF EXISTS projects_service_projectbudgetsnapshot();
+DROP TRIGGER IF EXISTS invoices_invoice_projectbudgetsnapshot_trigger
+  ON invoices_invoice;
+DROP FUNCTION IF EXISTS invoices_invoice_projectbudgetsnapshot();
+DROP TRIGGER IF EXISTS logbook_loggedcost_projectbudgetsnapshot_trigger
+  ON logbook_loggedcost;
+DROP TRIGGER IF EXISTS logbook_loggedhours_projectbudgetsnapshot_trigger
+  ON logbook_loggedhours;
+DROP FUNCTION IF EXISTS logbook_projectbudgetsnapshot();
+DROP FUNCTION IF EXISTS reporting_projectbudgetsnapshot_invalidate(integer, date);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("invoices", "0022_recurringinvoice_create_project"),
+        ("logbook", "0020_auto_20200511_1419"),
+        ("projects", "0019_auto_20200523_0929"),
+        ("reporting", "0003_monthlyloggedhours"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProjectBudgetSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("cutoff_date", models.DateField(verbose_name="cutoff date")),
+                (
+                    "cost",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        max_digits=10,
+                        validators=[django.core.validators.MinValueValidator(0)],
+                        verbose_name="cost",
+                    ),
+                ),
+                (
+                    "effort_cost",
+                    models.DecimalField(
+                        decimal_places=3,
+                        default=Decimal("0.00"),
+                        max_digits=12,
+                        verbose_name="effort cost",
+                    ),
+                ),
+                (
+                    "effort_hours_with_rate_undefined",
+                    models.DecimalField(
+                        decimal_places=1,
+                        default=Decimal("0.0"),
+                        max_digits=10,
+                        validators=[django.core.validators.MinValueValidator(0)],
+                        verbose_name="effort hours with rate undefined",
+                    ),
+                ),
+                (
+                    "hours",
+                    models.DecimalField(
+                        decimal_places=1,
+                        default=Decimal("0.0"),
+                        max_digits=10,
+                        validators=[django.core.validators.MinValueValidator(0)],
+                        verbose_name="hours",
+                    ),
+                ),
+                (
+                    "invoiced",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        max_digits=10,
+                        validators=[django.core.validators.MinValueValidator(0)],
+                        verbose_name="invoiced",
+                    ),
+                ),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="projects.project",
+                        verbose_name="project",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "project budget snapshot",
+                "verbose_name_plural": "project budget snapshots",
+                "ordering": ["-cutoff_date"],
+                "unique_together": {("project", "cutoff_date")},
+            },
+        ),
+        migrations.RunSQL(INVALIDATE_SQL, INVALIDATE_REVERSE_SQL),
+    ]
@@ -0,0 +1,435 @@
+# Generated by Django 3.1.1 on 2026-10-18 03:40
+
+from decimal import Decimal
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Invoice.INVOICED_STATUSES are SENT (20) and PAID (40), Offer.ACCEPTED is 30.
+STATISTICS_SQL = """\
+CREATE OR REPLACE FUNCTION reporting_customerstatistics_add(
+  p_customer_id integer,
+  p_hours numeric,
+  p_cost numeric,
+  p_third_party_costs numeric,
+  p_invoiced numeric,
+  p_offered numeric
+) RETURNS void AS $$
+begin
+  IF p_customer_id IS NULL THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO reporting_customerstatistics
+    (customer_id, hours, cost, third_party_costs, invoiced, offered)
+  VALUES
+    (p_customer_id, p_hours, p_cost, p_third_party_costs, p_invoiced, p_offered)
+  ON CONFLICT (customer_id)
+  DO UPDATE SET
+    hours=reporting_customerstatistics.hours + EXCLUDED.hours,
+    cost=reporting_customerstatistics.cost + EXCLUDED.cost,
+    third_party_costs=reporting_customerstatistics.third_party_costs
+      + EXCLUDED.third_party_costs,
+    invoiced=reporting_customerstatistics.invoiced + EXCLUDED.invoiced,
+    offered=reporting_customerstatistics.offered + EXCLUDED.offered;
+end
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION reporting_project_customer(p_project_id integer)
+RETURNS integer AS $$
+  SELECT customer_id FROM projects_project WHERE id=p_project_id;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION reporting_service_customer(p_service_id integer)
+RETURNS integer AS $$
+  SELECT p.customer_id
+  FROM projects_service ps
+  LEFT JOIN projects_project p ON ps.project_id=p.id
+  WHERE ps.id=p_service_id;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION reporting_loggedcost_third_party_costs(
+  lc logbook_loggedcost
+) RETURNS numeric AS $$
+  SELECT CASE
+    WHEN lc.invoice_service_id IS NULL THEN COALESCE(lc.third_party_costs, 0)
+    ELSE 0
+  END;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION reporting_invoice_invoiced(i invoices_invoice)
+RETURNS numeric AS $$
+  SELECT CASE WHEN i.status IN (20, 40) THEN i.total_excl_tax ELSE 0 END;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION reporting_invoice_third_party_costs(i invoices_invoice)
+RETURNS numeric AS $$
+  SELECT CASE
+    WHEN i.status IN (20, 40) AND i.project_id IS NULL THEN i.third_party_costs
+    ELSE 0
+  END;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION reporting_offer_offered(o offers_offer)
+RETURNS numeric AS $$
+  SELECT CASE WHEN o.status=30 THEN o.total_excl_tax ELSE 0 END;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION logbook_loggedhours_customerstatistics()
+RETURNS trigger AS $$
+begin
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM reporting_customerstatistics_add(
+      reporting_service_customer(old.service_id), -old.hours, 0, 0, 0, 0
+    );
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM reporting_customerstatistics_add(
+      reporting_service_customer(new.service_id), new.hours, 0, 0, 0, 0
+    );
+  END IF;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS logbook_loggedhours_customerstatistics_trigger
+  ON logbook_loggedhours;
+CREATE TRIGGER logbook_loggedhours_customerstatistics_trigger
+  AFTER INSERT OR DELETE OR UPDATE OF service_id, hours
+  ON logbook_loggedhours FOR EACH ROW
+  EXECUTE PROCEDURE logbook_loggedhours_customerstatistics();
+
+CREATE OR REPLACE FUNCTION logbook_loggedcost_customerstatistics()
+RETURNS trigger AS $$
+begin
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM reporting_customerstatistics_add(
+      reporting_service_customer(old.service_id),
+      0,
+      -old.cost,
+      -reporting_loggedcost_third_party_costs(old),
+      0,
+      0
+    );
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM reporting_customerstatistics_add(
+      reporting_service_customer(new.service_id),
+      0,
+      new.cost,
+      reporting_loggedcost_third_party_costs(new),
+      0,
+      0
+    );
+  END IF;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS logbook_loggedcost_customerstatistics_trigger
+  ON logbook_loggedcost;
+CREATE TRIGGER logbook_loggedcost_customerstatistics_trigger
+  AFTER INSERT OR DELETE
+  OR UPDATE OF service_id, cost, third_party_costs, invoice_service_id
+  ON logbook_loggedcost FOR EACH ROW
+  EXECUTE PROCEDURE logbook_loggedcost_customerstatistics();
+
+CREATE OR REPLACE FUNCTION invoices_invoice_customerstatistics()
+RETURNS trigger AS $$
+begin
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM reporting_customerstatistics_add(
+      COALESCE(reporting_project_customer(old.project_id), old.customer_id),
+      0,
+      0,
+      -reporting_invoice_third_party_costs(old),
+      -reporting_invoice_invoiced(old),
+      0
+    );
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM reporting_customerstatistics_add(
+      COALESCE(reporting_project_customer(new.project_id), new.customer_id),
+      0,
+      0,
+      reporting_invoice_third_party_costs(new),
+      reporting_invoice_invoiced(new),
+      0
+    );
+  END IF;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS invoices_invoice_customerstatistics_trigger
+  ON invoices_invoice;
+CREATE TRIGGER invoices_invoice_customerstatistics_trigger
+  AFTER INSERT OR DELETE
+  OR UPDATE OF customer_id, project_id, status, total_excl_tax, third_party_costs
+  ON invoices_invoice FOR EACH ROW
+  EXECUTE PROCEDURE invoices_invoice_customerstatistics();
+
+CREATE OR REPLACE FUNCTION offers_offer_customerstatistics() RETURNS trigger AS $$
+begin
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM reporting_customerstatistics_add(
+      reporting_project_customer(old.project_id),
+      0,
+      0,
+      0,
+      0,
+      -reporting_offer_offered(old)
+    );
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM reporting_customerstatistics_add(
+      reporting_project_customer(new.project_id),
+      0,
+      0,
+      0,
+      0,
+      reporting_offer_offered(new)
+    );
+  END IF;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS offers_offer_customerstatistics_trigger ON offers_offer;
+CREATE TRIGGER offers_offer_customerstatistics_trigger
+  AFTER INSERT OR DELETE OR UPDATE OF project_id, status, total_excl_tax
+  ON offers_offer FOR EACH ROW
+  EXECUTE PROCEDURE offers_offer_customerstatistics();
+
+CREATE OR REPLACE FUNCTION projects_service_customerstatistics()
+RETURNS trigger AS $$
+declare
+  v_from integer := reporting_project_customer(old.project_id);
+  v_to integer := reporting_project_customer(new.project_id);
+  v_hours numeric;
+  v_cost numeric;
+  v_third_party_costs numeric;
+begin
+  IF v_from IS NOT DISTINCT FROM v_to THEN
+    RETURN NULL;
+  END IF;
+
+  SELECT COALESCE(SUM(hours), 0) INTO v_hours
+  FROM logbook_loggedhours WHERE service_id=new.id;
+  SELECT
+    COALESCE(SUM(cost), 0),
+    COALESCE(SUM(reporting_loggedcost_third_party_costs(lc)), 0)
+  INTO v_cost, v_third_party_costs
+  FROM logbook_loggedcost lc WHERE service_id=new.id;
+
+  PERFORM reporting_customerstatistics_add(
+    v_from, -v_hours, -v_cost, -v_third_party_costs, 0, 0
+  );
+  PERFORM reporting_customerstatistics_add(
+    v_to, v_hours, v_cost, v_third_party_costs, 0, 0
+  );
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS projects_service_customerstatistics_trigger
+  ON projects_service;
+CREATE TRIGGER projects_service_customerstatistics_trigger
+  AFTER UPDATE OF project_id ON projects_service FOR EACH ROW
+  WHEN (old.project_id IS DISTINCT FROM new.project_id)
+  EXECUTE PROCEDURE projects_service_customerstatistics();
+
+CREATE OR REPLACE FUNCTION projects_project_customerstatistics()
+RETURNS trigger AS $$
+declare
+  v_hours numeric;
+  v_cost numeric;
+  v_third_party_costs numeric;
+  v_invoiced numeric;
+  v_offered numeric;
+begin
+  SELECT COALESCE(SUM(lh.hours), 0) INTO v_hours
+  FROM logbook_loggedhours lh
+  LEFT JOIN projects_service ps ON lh.service_id=ps.id
+  WHERE ps.project_id=new.id;
+  SELECT
+    COALESCE(SUM(lc.cost), 0),
+    COALESCE(SUM(reporting_loggedcost_third_party_costs(lc)), 0)
+  INTO v_cost, v_third_party_costs
+  FROM logbook_loggedcost lc
+  LEFT JOIN projects_service ps ON lc.service_id=ps.id
+  WHERE ps.project_id=new.id;
+  SELECT COALESCE(SUM(reporting_invoice_invoiced(i)), 0) INTO v_invoiced
+  FROM invoices_invoice i WHERE project_id=new.id;
+  SELECT COALESCE(SUM(reporting_offer_offered(o)), 0) INTO v_offered
+  FROM offers_offer o WHERE project_id=new.id;
+
+  PERFORM reporting_customerstatistics_add(
+    old.customer_id, -v_hours, -v_cost, -v_third_party_costs, -v_invoiced, -v_offered
+  );
+  PERFORM reporting_customerstatistics_add(
+    new.customer_id, v_hours, v_cost, v_third_party_costs, v_invoiced, v_offered
+  );
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS projects_project_customerstatistics_trigger
+  ON projects_project;
+CREATE TRIGGER projects_project_customerstatistics_trigger
+  AFTER UPDATE OF customer_id ON projects_project FOR EACH ROW
+  WHEN (old.customer_id IS DISTINCT FROM new.customer_id)
+  EXECUTE PROCEDURE projects_project_customerstatistics();
+
+SELECT reporting_customerstatistics_add(p.customer_id, SUM(lh.hours), 0, 0, 0, 0)
+FROM logbook_loggedhours lh
+LEFT JOIN projects_service ps ON lh.service_id=ps.id
+LEFT JOIN projects_project p ON ps.project_id=p.id
+GROUP BY p.customer_id;
+SELECT reporting_customerstatistics_add(
+  p.customer_id,
+  0,
+  SUM(lc.cost),
+  SUM(reporting_loggedcost_third_party_costs(lc)),
+  0,
+  0
+)
+FROM logbook_loggedcost lc
+LEFT JOIN projects_service ps ON lc.service_id=ps.id
+LEFT JOIN projects_project p ON ps.project_id=p.id
+GROUP BY p.customer_id;
+SELECT reporting_customerstatistics_add(
+  COALESCE(p.customer_id, i.customer_id),
+  0,
+  0,
+  SUM(reporting_invoice_third_party_costs(i)),
+  SUM(reporting_invoice_invoiced(i)),
+  0
+)
+FROM invoices_invoice i
+LEFT JOIN projects_project p ON i.project_id=p.id
+GROUP BY COALESCE(p.customer_id, i.customer_id);
+SELECT reporting_customerstatistics_add(
+  p.customer_id, 0, 0, 0, 0, SUM(reporting_offer_offered(o))
+)
+FROM offers_offer o
+LEFT JOIN projects_project p ON o.project_id=p.id
+GROUP BY p.customer_id;
+"""
+
+STATISTICS_REVERSE_SQL = """\
+DROP TRIGGER IF EXISTS projects_project_customerstatistics_trigger
+  ON projects_project;
+DROP FUNCTION IF EXISTS projects_project_customerstatistics();
+DROP TRIGGER IF EXISTS projects_service_customerstatistics_trigger
+  ON projects_service;
+DROP FUNCTION IF EXISTS projects_service_customerstatistics();
+DROP TRIGGER IF EXISTS offers_offer_customerstatistics_trigger ON offers_offer;
+DROP FUNCTION IF EXISTS offers_offer_customerstatistics();
+DROP TRIGGER IF EXISTS invoices_invoice_customerstatistics_trigger
+  ON invoices_invoice;
+DROP FUNCTION IF EXISTS invoices_invoice_customerstatistics();
+DROP TRIGGER IF EXISTS logbook_loggedcost_customerstatistics_trigger
+  ON logbook_loggedcost;
+DROP FUNCTION IF EXISTS logbook_loggedcost_customerstatistics();
+DROP TRIGGER IF EXISTS logbook_loggedhours_customerstatistics_trigger
+  ON logbook_loggedhours;
+DROP FUNCTION IF EXISTS logbook_loggedhours_customerstatistics();
+DROP FUNCTION IF EXISTS reporting_offer_offered(offers_offer);
+DROP FUNCTION IF EXISTS reporting_invoice_third_party_costs(invoices_invoice);
+DROP FUNCTION IF EXISTS reporting_invoice_invoiced(invoices_invoice);
+DROP FUNCTION IF EXISTS reporting_loggedcost_third_party_costs(logbook_loggedcost);
+DROP FUNCTION IF EXISTS reporting_service_customer(integer);
+DROP FUNCTION IF EXISTS reporting_project_customer(integer);
+DROP FUNCTION IF EXISTS
+  reporting_customerstatistics_add(integer, numeric, numeric, numeric, numeric, numeric);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contacts", "0014_trigram_indexes"),
+        ("invoices", "0022_recurringinvoice_create_project"),
+        ("logbook", "0022_dailytotal_entries"),
+        ("offers", "0009_offer_valid_until"),
+        ("projects", "0019_auto_20200523_0929"),
+        ("reporting", "0004_projectbudgetsnapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CustomerStatistics",
+            fields=[
+                (
+                    "customer",
+                    models.OneToOneField(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="+",
+                        serialize=False,
+                        to="contacts.organization",
+                        verbose_name="customer",
+                    ),
+                ),
+                (
+                    "hours",
+                    models.DecimalField(
+                        decimal_places=1,
+                        default=Decimal("0.0"),
+                        max_digits=10,
+                        validators=[django.core.validators.MinValueValidator(0)],
+                        verbose_name="hours",
+                    ),
+                ),
+                (
+                    "cost",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        max_digits=10,
+                        validators=[django.core.validators.MinValueValidator(0)],
+                        verbose_name="cost",
+                    ),
+                ),
+                (
+                    "third_party_costs",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        max_digits=10,
+                        validators=[django.core.validators.MinValueValidator(0)],
+                        verbose_name="third party costs",
+                    ),
+                ),
+                (
+                    "invoiced",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        max_digits=10,
+                        validators=[django.core.validators.MinValueValidator(0)],
+                        verbose_name="invoiced",
+                    ),
+                ),
+                (
+                    "offered",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        max_digits=10,
+                        validators=[django.core.validators.MinValueValidator(0)],
+                        verbose_name="offered",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "customer statistics",
+                "verbose_name_plural": "customer statistics",
+            },
+        ),
+        migrations.RunSQL(STATISTICS_SQL, STATISTICS_REVERSE_SQL),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations
+
+
+# project_budget_snapshots() takes the same lock while computing and saving
+# snapshots, so changes cannot commit in between and leave a stale snapshot.
+INVALIDATE_SQL = """\
+CREATE OR REPLACE FUNCTION reporting_projectbudgetsnapshot_invalidate(
+  p_project_id integer,
+  p_day date
+) RETURNS void AS $$
+begin
+  PERFORM pg_advisory_xact_lock(
+    hashtext('reporting_projectbudgetsnapshot'), p_project_id
+  );
+  DELETE FROM reporting_projectbudgetsnapshot
+  WHERE project_id=p_project_id AND (p_day IS NULL OR cutoff_date >= p_day);
+end
+$$ LANGUAGE plpgsql;
+"""
+
+INVALIDATE_REVERSE_SQL = """\
+CREATE OR REPLACE FUNCTION reporting_projectbudgetsnapshot_invalidate(
+  p_project_id integer,
+  p_day date
+) RETURNS void AS $$
+begin
+  DELETE FROM reporting_projectbudgetsnapshot
+  WHERE project_id=p_project_id AND (p_day IS NULL OR cutoff_date >= p_day);
+end
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reporting", "0005_customerstatistics"),
+    ]
+
+    operations = [
+        migrations.RunSQL(INVALIDATE_SQL, INVALIDATE_REVERSE_SQL),
+    ]
@@ -0,0 +1,234 @@
+from decimal import Decimal
+
+import django.core.validators
+from django.db import migrations, models
+
+
+# Invoice.INVOICED_STATUSES are SENT (20) and PAID (40).
+PROJECT_INVOICED_SQL = """\
+CREATE OR REPLACE FUNCTION reporting_customerstatistics_add(
+  p_customer_id integer,
+  p_hours numeric,
+  p_cost numeric,
+  p_third_party_costs numeric,
+  p_invoiced numeric,
+  p_offered numeric
+) RETURNS void AS $$
+begin
+  IF p_customer_id IS NULL THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO reporting_customerstatistics
+    (customer_id, hours, cost, third_party_costs, invoiced, offered,
+     project_invoiced)
+  VALUES
+    (p_customer_id, p_hours, p_cost, p_third_party_costs, p_invoiced, p_offered,
+     0)
+  ON CONFLICT (customer_id)
+  DO UPDATE SET
+    hours=reporting_customerstatistics.hours + EXCLUDED.hours,
+    cost=reporting_customerstatistics.cost + EXCLUDED.cost,
+    third_party_costs=reporting_customerstatistics.third_party_costs
+      + EXCLUDED.third_party_costs,
+    invoiced=reporting_customerstatistics.invoiced + EXCLUDED.invoiced,
+    offered=reporting_customerstatistics.offered + EXCLUDED.offered;
+end
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION reporting_customerstatistics_add_project_invoiced(
+  p_customer_id integer,
+  p_project_invoiced numeric
+) RETURNS void AS $$
+begin
+  IF p_customer_id IS NULL THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO reporting_customerstatistics
+    (customer_id, hours, cost, third_party_costs, invoiced, offered,
+     project_invoiced)
+  VALUES
+    (p_customer_id, 0, 0, 0, 0, 0, p_project_invoiced)
+  ON CONFLICT (customer_id)
+  DO UPDATE SET
+    project_invoiced=reporting_customerstatistics.project_invoiced
+      + EXCLUDED.project_invoiced;
+end
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION reporting_invoice_project_invoiced(i invoices_invoice)
+RETURNS numeric AS $$
+  SELECT CASE
+    WHEN i.status IN (20, 40) AND i.project_id IS NOT NULL
+    THEN i.total_excl_tax - i.third_party_costs
+    ELSE 0
+  END;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION invoices_invoice_customerstatistics()
+RETURNS trigger AS $$
+begin
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM reporting_customerstatistics_add(
+      COALESCE(reporting_project_customer(old.project_id), old.customer_id),
+      0,
+      0,
+      -reporting_invoice_third_party_costs(old),
+      -reporting_invoice_invoiced(old),
+      0
+    );
+    PERFORM reporting_customerstatistics_add_project_invoiced(
+      old.customer_id, -reporting_invoice_project_invoiced(old)
+    );
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM reporting_customerstatistics_add(
+      COALESCE(reporting_project_customer(new.project_id), new.customer_id),
+      0,
+      0,
+      reporting_invoice_third_party_costs(new),
+      reporting_invoice_invoiced(new),
+      0
+    );
+    PERFORM reporting_customerstatistics_add_project_invoiced(
+      new.customer_id, reporting_invoice_project_invoiced(new)
+    );
+  END IF;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+SELECT reporting_customerstatistics_add_project_invoiced(
+  i.customer_id, SUM(reporting_invoice_project_invoiced(i))
+)
+FROM invoices_invoice i
+GROUP BY i.customer_id;
+"""
+
+PROJECT_INVOICED_REVERSE_SQL = """\
+CREATE OR REPLACE FUNCTION invoices_invoice_customerstatistics()
+RETURNS trigger AS $$
+begin
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM reporting_customerstatistics_add(
+      COALESCE(reporting_project_customer(old.project_id), old.customer_id),
+      0,
+      0,
+      -reporting_invoice_third_party_costs(old),
+      -reporting_invoice_invoiced(old),
+      0
+    );
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM reporting_customerstatistics_add(
+      COALESCE(reporting_project_customer(new.project_id), new.customer_id),
+      0,
+      0,
+      reporting_invoice_third_party_costs(new),
+      reporting_invoice_invoiced(new),
+      0
+    );
+  END IF;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION reporting_customerstatistics_add(
+  p_customer_id integer,
+  p_hours numeric,
+  p_cost numeric,
+  p_third_party_costs numeric,
+  p_invoiced numeric,
+  p_offered numeric
+) RETURNS void AS $$
+begin
+  IF p_customer_id IS NULL THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO reporting_customerstatistics
+    (customer_id, hours, cost, third_party_costs, invoiced, offered)
+  VALUES
+    (p_customer_id, p_hours, p_cost, p_third_party_costs, p_invoiced, p_offered)
+  ON CONFLICT (customer_id)
+  DO UPDATE SET
+    hours=reporting_customerstatistics.hours + EXCLUDED.hours,
+    cost=reporting_customerstatistics.cost + EXCLUDED.cost,
+    third_party_costs=reporting_customerstatistics.third_party_costs
+      + EXCLUDED.third_party_costs,
+    invoiced=reporting_customerstatistics.invoiced + EXCLUDED.invoiced,
+    offered=reporting_customerstatistics.offered + EXCLUDED.offered;
+end
+$$ LANGUAGE plpgsql;
+
+DROP FUNCTION IF EXISTS reporting_invoice_project_invoiced(invoices_invoice);
+DROP FUNCTION IF EXISTS
+  reporting_customerstatistics_add_project_invoiced(integer, numeric);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reporting", "0006_projectbudgetsnapshot_lock"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="customerstatistics",
+            name="cost",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=Decimal("0.00"),
+                max_digits=14,
+                validators=[django.core.validators.MinValueValidator(0)],
+                verbose_name="cost",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="customerstatistics",
+            name="third_party_costs",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=Decimal("0.00"),
+                max_digits=14,
+                validators=[django.core.validators.MinValueValidator(0)],
+                verbose_name="third party costs",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="customerstatistics",
+            name="invoiced",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=Decimal("0.00"),
+                max_digits=14,
+                validators=[django.core.validators.MinValueValidator(0)],
+                verbose_name="invoiced",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="customerstatistics",
+            name="offered",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=Decimal("0.00"),
+                max_digits=14,
+                validators=[django.core.validators.MinValueValidator(0)],
+                verbose_name="offered",
+            ),
+        ),
+        migrations.AddField(
+            model_name="customerstatistics",
+            name="project_invoiced",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=Decimal("0.00"),
+                max_digits=14,
+                validators=[django.core.validators.MinValueValidator(0)],
+                verbose_name="invoiced for projects",
+            ),
+        ),
+        migrations.RunSQL(PROJECT_INVOICED_SQL, PROJECT_INVOICED_REVERSE_SQL),
+    ]
@@ -1,22 +1,29 @@
-from django.db import models
+from django.db import connections, models
 from django.utils.translation import gettext_lazy as _
 
+from workbench.accounts.models import User
+from workbench.contacts.models import Organization
 from workbench.projects.models import Project
-from workbench.reporting.project_budget_statistics import project_budget_statistics
-from workbench.tools.formats import local_date_format
-from workbench.tools.models import MoneyField
+from workbench.tools.formats import Z1, Z2, local_date_format
+from workbench.tools.models import HoursField, MoneyField
 
 
 class AccrualsQuerySet(models.QuerySet):
-    def accruals(self, cutoff_date):
+    def accruals(self, cutoff_date, *, persist=False):
+        from workbench.reporting.project_budget_statistics import (
+            project_budget_statistics,
+        )
+
         projects = Project.objects.open(on=cutoff_date)
-        statistics = project_budget_statistics(projects, cutoff_date=cutoff_date)
+        statistics = project_budget_statistics(
+            projects, cutoff_date=cutoff_date, persist=persist
+        )
         return statistics["overall"]["delta_negative"]
 
     def for_cutoff_date(self, cutoff_date):
         instance, created = self.update_or_create(
             cutoff_date=cutoff_date,
-            defaults={"accruals": self.accruals(cutoff_date)},
+            defaults={"accruals": self.accruals(cutoff_date, persist=True)},
         )
         return instance
 
@@ -47,3 +54,177 @@ class CostCenter(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class MonthlyLoggedHoursQuerySet(models.QuerySet):
+    def rebuild(self):
+        """
+        Recreate the rollup from the logbook. The rollup is maintained by
+        triggers on ``logbook_loggedhours`` and ``projects_service``; this is
+        only required if those have been bypassed somehow.
+        """
+        with connections["default"].cursor() as cursor:
+            cursor.execute(
+                """\
+DELETE FROM reporting_monthlyloggedhours;
+INSERT INTO reporting_monthlyloggedhours (project_id, rendered_by_id, month, hours)
+SELECT
+  ps.project_id,
+  lh.rendered_by_id,
+  date_trunc('month', lh.rendered_on)::date,
+  SUM(lh.hours)
+FROM logbook_loggedhours lh
+LEFT JOIN projects_service ps ON lh.service_id=ps.id
+GROUP BY 1, 2, 3;
+"""
+            )
+
+
+class MonthlyLoggedHours(models.Model):
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name="+", verbose_name=_("project")
+    )
+    rendered_by = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name=_("rendered by"),
+    )
+    month = models.DateField(_("month"))
+    hours = HoursField(_("hours"))
+
+    objects = MonthlyLoggedHoursQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["month"]
+        unique_together = [("project", "rendered_by", "month")]
+        verbose_name = _("monthly logged hours")
+        verbose_name_plural = _("monthly logged hours")
+
+    def __str__(self):
+        return "%s: %s" % (local_date_format(self.month, fmt="F Y"), self.hours)
+
+
+class ProjectBudgetSnapshot(models.Model):
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name="+", verbose_name=_("project")
+    )
+    cutoff_date = models.DateField(_("cutoff date"))
+    cost = MoneyField(_("cost"), default=Z2)
+    effort_cost = models.DecimalField(
+        _("effort cost"), max_digits=12, decimal_places=3, default=Z2
+    )
+    effort_hours_with_rate_undefined = HoursField(
+        _("effort hours with rate undefined"), default=Z1
+    )
+    hours = HoursField(_("hours"), default=Z1)
+    invoiced = MoneyField(_("invoiced"), default=Z2)
+
+    class Meta:
+        ordering = ["-cutoff_date"]
+        unique_together = [("project", "cutoff_date")]
+        verbose_name = _("project budget snapshot")
+        verbose_name_plural = _("project budget snapshots")
+
+    def __str__(self):
+        return local_date_format(self.cutoff_date)
+
+
+class CustomerStatisticsQuerySet(models.QuerySet):
+    def rebuild(self):
+        """
+        Recreate the customer statistics from the logbook, invoices and
+        offers. The statistics are maintained by triggers; this is only
+        required if those have been bypassed somehow.
+        """
+        with connections["default"].cursor() as cursor:
+            cursor.execute(
+                """\
+DELETE FROM reporting_customerstatistics;
+SELECT reporting_customerstatistics_add(p.customer_id, SUM(lh.hours), 0, 0, 0, 0)
+FROM logbook_loggedhours lh
+LEFT JOIN projects_service ps ON lh.service_id=ps.id
+LEFT JOIN projects_project p ON ps.project_id=p.id
+GROUP BY p.customer_id;
+SELECT reporting_customerstatistics_add(
+  p.customer_id,
+  0,
+  SUM(lc.cost),
+  SUM(reporting_loggedcost_third_party_costs(lc)),
+  0,
+  0
+)
+FROM logbook_loggedcost lc
+LEFT JOIN projects_service ps ON lc.service_id=ps.id
+LEFT JOIN projects_project p ON ps.project_id=p.id
+GROUP BY p.customer_id;
+SELECT reporting_customerstatistics_add(
+  COALESCE(p.customer_id, i.customer_id),
+  0,
+  0,
+  SUM(reporting_invoice_third_party_costs(i)),
+  SUM(reporting_invoice_invoiced(i)),
+  0
+)
+FROM invoices_invoice i
+LEFT JOIN projects_project p ON i.project_id=p.id
+GROUP BY COALESCE(p.customer_id, i.customer_id);
+SELECT reporting_customerstatistics_add(
+  p.customer_id, 0, 0, 0, 0, SUM(reporting_offer_offered(o))
+)
+FROM offers_offer o
+LEFT JOIN projects_project p ON o.project_id=p.id
+GROUP BY p.customer_id;
+SELECT reporting_customerstatistics_add_project_invoiced(
+  i.customer_id, SUM(reporting_invoice_project_invoiced(i))
+)
+FROM invoices_invoice i
+GROUP BY i.customer_id;
+"""
+            )
+
+
+class CustomerStatistics(models.Model):
+    """
+    Logged hours, costs, third party costs, invoiced and offered totals per
+    customer, maintained by database triggers on the logbook, invoices,
+    offers, services and projects
+    """
+
+    # No database constraint: The triggers may still update the statistics
+    # while the organization is being deleted.
+    customer = models.OneToOneField(
+        Organization,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        db_constraint=False,
+        related_name="+",
+        verbose_name=_("customer"),
+    )
+    # The totals over all years grow beyond what fits into a MoneyField's
+    # default of max_digits=10.
+    hours = HoursField(_("hours"), default=Z1)
+    cost = MoneyField(_("cost"), max_digits=14, default=Z2)
+    third_party_costs = MoneyField(_("third party costs"), max_digits=14, default=Z2)
+    invoiced = MoneyField(_("invoiced"), max_digits=14, default=Z2)
+    offered = MoneyField(_("offered"), max_digits=14, default=Z2)
+    # Invoices with a project grouped by the invoice's customer, minus the
+    # invoices' third party costs, as used by the profitability command.
+    project_invoiced = MoneyField(_("invoiced for projects"), max_digits=14, default=Z2)
+
+    objects = CustomerStatisticsQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _("customer statistics")
+        verbose_name_plural = _("customer statistics")
+
+    def __str__(self):
+        return str(self.customer_id)
+
+    @property
+    def gross_margin_per_hour(self):
+        return (
+            (self.invoiced - self.third_party_costs) / self.hours
+            if self.hours
+            else None
+        )
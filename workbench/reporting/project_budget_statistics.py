@@ -1,63 +1,169 @@
 import datetime as dt
 from collections import defaultdict
 
+from django.db import connections, transaction
 from django.db.models import Sum
-from django.utils import timezone
 
 from workbench.invoices.models import Invoice
 from workbench.logbook.models import LoggedCost, LoggedHours
 from workbench.offers.models import Offer
+from workbench.reporting.models import ProjectBudgetSnapshot
 from workbench.tools.formats import Z1, Z2
 
 
-def project_budget_statistics(projects, *, cutoff_date=None):
-    cutoff_date = cutoff_date or dt.date.today()
-    cutoff_dttm = timezone.make_aware(dt.datetime.combine(cutoff_date, dt.time.max))
+def _snapshot_deltas(project_ids, *, after, until):
+    """
+    Logbook and invoice figures per project for the days after ``after``
+    (or since the beginning of time) up to and including ``until``
+    """
+    deltas = defaultdict(
+        lambda: {
+            "cost": Z2,
+            "effort_cost": Z2,
+            "effort_hours_with_rate_undefined": Z1,
+            "hours": Z1,
+            "invoiced": Z2,
+        }
+    )
+    rendered_on = {"rendered_on__lte": until}
+    invoiced_on = {"invoiced_on__lte": until}
+    if after:
+        rendered_on["rendered_on__gt"] = after
+        invoiced_on["invoiced_on__gt"] = after
 
-    costs = (
-        LoggedCost.objects.filter(
-            service__project__in=projects, rendered_on__lte=cutoff_dttm
-        )
+    for row in (
+        LoggedCost.objects.filter(service__project__in=project_ids, **rendered_on)
         .order_by()
         .values("service__project")
-    )
+        .annotate(Sum("cost"))
+    ):
+        deltas[row["service__project"]]["cost"] += row["cost__sum"]
 
-    cost_per_project = {
-        row["service__project"]: row["cost__sum"] for row in costs.annotate(Sum("cost"))
-    }
-    third_party_costs_per_project = {
-        row["service__project"]: row["third_party_costs__sum"]
-        for row in costs.filter(
-            third_party_costs__isnull=False, invoice_service__isnull=True
-        ).annotate(Sum("third_party_costs"))
-    }
-
-    hours = (
-        LoggedHours.objects.filter(
-            service__project__in=projects, rendered_on__lte=cutoff_dttm
-        )
+    for row in (
+        LoggedHours.objects.filter(service__project__in=project_ids, **rendered_on)
         .order_by()
         .values("service__project", "service__effort_rate")
         .annotate(Sum("hours"))
-    )
-    effort_cost_per_project = defaultdict(lambda: Z2)
-    effort_hours_with_rate_undefined_per_project = defaultdict(lambda: Z1)
-    hours_per_project = defaultdict(lambda: Z1)
-
-    for row in hours:
+    ):
+        delta = deltas[row["service__project"]]
         if row["service__effort_rate"] is None:
-            effort_hours_with_rate_undefined_per_project[
-                row["service__project"]
-            ] += row["hours__sum"]
+            delta["effort_hours_with_rate_undefined"] += row["hours__sum"]
         else:
-            effort_cost_per_project[row["service__project"]] += (
-                row["service__effort_rate"] * row["hours__sum"]
+            delta["effort_cost"] += row["service__effort_rate"] * row["hours__sum"]
+        delta["hours"] += row["hours__sum"]
+
+    for row in (
+        Invoice.objects.invoiced()
+        .filter(project__in=project_ids, **invoiced_on)
+        .order_by()
+        .values("project")
+        .annotate(Sum("total_excl_tax"))
+    ):
+        deltas[row["project"]]["invoiced"] += row["total_excl_tax__sum"]
+
+    return deltas
+
+
+def _compute_snapshots(project_ids, *, cutoff_date):
+    previous = {
+        snapshot.project_id: snapshot
+        for snapshot in ProjectBudgetSnapshot.objects.filter(
+            project__in=project_ids, cutoff_date__lt=cutoff_date
+        )
+        .order_by("project_id", "-cutoff_date")
+        .distinct("project_id")
+    }
+    by_base_date = defaultdict(list)
+    for id in project_ids:
+        by_base_date[previous[id].cutoff_date if id in previous else None].append(id)
+
+    snapshots = {}
+    for after, ids in by_base_date.items():
+        deltas = _snapshot_deltas(ids, after=after, until=cutoff_date)
+        for id in ids:
+            snapshots[id] = ProjectBudgetSnapshot(
+                project_id=id,
+                cutoff_date=cutoff_date,
+                **{
+                    field: value
+                    + (getattr(previous[id], field) if id in previous else 0)
+                    for field, value in deltas[id].items()
+                },
             )
-        hours_per_project[row["service__project"]] += row["hours__sum"]
+    return snapshots
+
+
+# Taken by the invalidation trigger too, see reporting/0006
+LOCK_SQL = """\
+SELECT pg_advisory_xact_lock(hashtext('reporting_projectbudgetsnapshot'), id)
+FROM (SELECT unnest(%s::integer[]) AS id ORDER BY 1) AS ids
+"""
+
+
+def project_budget_snapshots(project_ids, *, cutoff_date, persist=False):
+    """
+    Return a dictionary mapping project IDs to ``ProjectBudgetSnapshot``
+    instances for the given cutoff date
+
+    Missing snapshots are computed from the latest earlier snapshot of each
+    project plus the logbook entries and invoices since then. With
+    ``persist=True`` snapshots for cutoff dates in the past are saved for
+    later use. Database triggers remove snapshots as soon as the underlying
+    data changes on or before their cutoff date; the advisory lock makes
+    sure that no change commits between computing and saving a snapshot.
+    """
+    snapshots = {
+        snapshot.project_id: snapshot
+        for snapshot in ProjectBudgetSnapshot.objects.filter(
+            project__in=project_ids, cutoff_date=cutoff_date
+        )
+    }
+    missing = [id for id in project_ids if id not in snapshots]
+    if not missing:
+        return snapshots
+
+    if not persist or cutoff_date >= dt.date.today():
+        snapshots.update(_compute_snapshots(missing, cutoff_date=cutoff_date))
+        return snapshots
+
+    with transaction.atomic():
+        with connections["default"].cursor() as cursor:
+            cursor.execute(LOCK_SQL, [sorted(missing)])
+        new = _compute_snapshots(missing, cutoff_date=cutoff_date)
+        ProjectBudgetSnapshot.objects.bulk_create(new.values(), ignore_conflicts=True)
+    snapshots.update(new)
+    return snapshots
+
+
+def project_budget_statistics(projects, *, cutoff_date=None, persist=False):
+    cutoff_date = cutoff_date or dt.date.today()
+    projects = list(projects)
+    project_ids = [project.id for project in projects]
+    snapshots = project_budget_snapshots(
+        project_ids, cutoff_date=cutoff_date, persist=persist
+    )
+
+    third_party_costs_per_project = {
+        row["service__project"]: row["third_party_costs__sum"]
+        for row in LoggedCost.objects.filter(
+            service__project__in=project_ids,
+            rendered_on__lte=cutoff_date,
+            third_party_costs__isnull=False,
+            invoice_service__isnull=True,
+        )
+        .order_by()
+        .values("service__project")
+        .annotate(Sum("third_party_costs"))
+    }
 
     not_archived_hours = {
         row["service__project"]: row["hours__sum"]
-        for row in hours.filter(archived_at__isnull=True)
+        for row in LoggedHours.objects.filter(
+            service__project__in=project_ids,
+            rendered_on__lte=cutoff_date,
+            archived_at__isnull=True,
+        )
+        .order_by()
         .values("service__project")
         .annotate(Sum("hours"))
     }
@@ -65,41 +171,32 @@ def project_budget_statistics(projects, *, cutoff_date=None):
     offered_per_project = {
         row["project"]: row["total_excl_tax__sum"]
         for row in Offer.objects.accepted()
-        .filter(project__in=projects)
-        .order_by()
-        .values("project")
-        .annotate(Sum("total_excl_tax"))
-    }
-    invoiced_per_project = {
-        row["project"]: row["total_excl_tax__sum"]
-        for row in Invoice.objects.invoiced()
-        .filter(project__in=projects, invoiced_on__lte=cutoff_date)
+        .filter(project__in=project_ids)
         .order_by()
         .values("project")
         .annotate(Sum("total_excl_tax"))
     }
 
-    statistics = [
-        {
-            "project": project,
-            "logbook": cost_per_project.get(project.id, Z2)
-            + effort_cost_per_project[project.id],
-            "cost": cost_per_project.get(project.id, Z2),
-            "effort_cost": effort_cost_per_project[project.id],
-            "effort_hours_with_rate_undefined": effort_hours_with_rate_undefined_per_project[  # noqa
-                project.id
-            ],
-            "third_party_costs": third_party_costs_per_project.get(project.id, Z2),
-            "offered": offered_per_project.get(project.id, Z2),
-            "invoiced": invoiced_per_project.get(project.id, Z2),
-            "hours": hours_per_project[project.id],
-            "not_archived": not_archived_hours.get(project.id, Z1),
-            "delta": cost_per_project.get(project.id, Z2)
-            + effort_cost_per_project[project.id]
-            - invoiced_per_project.get(project.id, Z2),
-        }
-        for project in projects
-    ]
+    statistics = []
+    for project in projects:
+        snapshot = snapshots[project.id]
+        statistics.append(
+            {
+                "project": project,
+                "logbook": snapshot.cost + snapshot.effort_cost,
+                "cost": snapshot.cost,
+                "effort_cost": snapshot.effort_cost,
+                "effort_hours_with_rate_undefined": (
+                    snapshot.effort_hours_with_rate_undefined
+                ),
+                "third_party_costs": third_party_costs_per_project.get(project.id, Z2),
+                "offered": offered_per_project.get(project.id, Z2),
+                "invoiced": snapshot.invoiced,
+                "hours": snapshot.hours,
+                "not_archived": not_archived_hours.get(project.id, Z1),
+                "delta": snapshot.cost + snapshot.effort_cost - snapshot.invoiced,
+            }
+        )
     overall = {
         key: sum(s[key] for s in statistics)
         for key in [
@@ -1,7 +1,7 @@
 import datetime as dt
 
 from workbench.invoices.utils import recurring
-from workbench.reporting.models import Accruals
+from workbench.reporting.models import Accruals, ProjectBudgetSnapshot
 
 
 def create_accruals_for_last_month():
@@ -12,3 +12,23 @@ def create_accruals_for_last_month():
         if day > today:
             break
         Accruals.objects.for_cutoff_date(day - dt.timedelta(days=1))
+
+
+def prune_project_budget_snapshots():
+    """
+    Keep month-end snapshots and those of the last week. Month-end snapshots
+    are the cutoff dates of accruals and serve as base for all later dates.
+    """
+    today = dt.date.today()
+    ProjectBudgetSnapshot.objects.filter(
+        cutoff_date__in=[
+            day
+            for day in ProjectBudgetSnapshot.objects.filter(
+                cutoff_date__lt=today - dt.timedelta(days=7)
+            )
+            .order_by()
+            .values_list("cutoff_date", flat=True)
+            .distinct()
+            if (day + dt.timedelta(days=1)).day != 1
+        ]
+    ).delete()
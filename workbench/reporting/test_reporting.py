@@ -7,9 +7,20 @@ from django.test import RequestFactory, TestCase
 from time_machine import travel
 
 from workbench import factories
+from workbench.invoices.models import Invoice
+from workbench.offers.models import Offer
+from workbench.projects.models import Project
 from workbench.reporting.accounting import send_accounting_files
+from workbench.reporting.green_hours import green_hours
 from workbench.reporting.labor_costs import labor_costs_by_cost_center
-from workbench.reporting.models import Accruals
+from workbench.reporting.models import (
+    Accruals,
+    CustomerStatistics,
+    MonthlyLoggedHours,
+    ProjectBudgetSnapshot,
+)
+from workbench.reporting.project_budget_statistics import project_budget_statistics
+from workbench.reporting.tasks import prune_project_budget_snapshots
 from workbench.reporting.views import DateRangeAndTeamFilterForm
 
 
@@ -99,3 +110,207 @@ class ReportingTest(TestCase):
         form = DateRangeAndTeamFilterForm({"team": -user2.id}, request=req)
         self.assertTrue(form.is_valid())
         self.assertEqual(set(form.users()), {user2})
+
+    def test_monthly_logged_hours(self):
+        """The monthly rollup of logged hours is maintained by triggers"""
+        service = factories.ServiceFactory.create()
+        hours = factories.LoggedHoursFactory.create(
+            service=service, hours=10, rendered_on=dt.date(2019, 1, 31)
+        )
+        factories.LoggedHoursFactory.create(
+            service=service,
+            rendered_by=hours.rendered_by,
+            hours=5,
+            rendered_on=dt.date(2019, 2, 1),
+        )
+
+        def rollup():
+            return list(
+                MonthlyLoggedHours.objects.values_list(
+                    "project", "rendered_by", "month", "hours"
+                )
+            )
+
+        user = hours.rendered_by.id
+        self.assertEqual(
+            rollup(),
+            [
+                (service.project_id, user, dt.date(2019, 1, 1), Decimal("10.0")),
+                (service.project_id, user, dt.date(2019, 2, 1), Decimal("5.0")),
+            ],
+        )
+
+        hours.rendered_on = dt.date(2019, 2, 2)
+        hours.save()
+        self.assertEqual(
+            rollup(),
+            [(service.project_id, user, dt.date(2019, 2, 1), Decimal("15.0"))],
+        )
+
+        other = factories.ServiceFactory.create()
+        service.loggedhours.update(service=other)
+        self.assertEqual(
+            rollup(),
+            [(other.project_id, user, dt.date(2019, 2, 1), Decimal("15.0"))],
+        )
+
+        other.loggedhours.all().delete()
+        self.assertEqual(rollup(), [])
+
+        factories.LoggedHoursFactory.create(
+            service=service, hours=3, rendered_on=dt.date(2019, 3, 15)
+        )
+        MonthlyLoggedHours.objects.rebuild()
+        self.assertEqual(len(rollup()), 1)
+
+        # Partial months are fetched from the logbook
+        gh = green_hours([dt.date(2019, 3, 1), dt.date(2019, 3, 14)])
+        self.assertEqual(gh, [])
+        gh = green_hours([dt.date(2019, 2, 15), dt.date(2019, 3, 15)])
+        self.assertEqual(gh[-1][1]["total"], Decimal("3.0"))
+        gh = green_hours([dt.date(2019, 1, 1), dt.date(2019, 12, 31)])
+        self.assertEqual(gh[-1][1]["total"], Decimal("3.0"))
+
+    def test_project_budget_snapshots(self):
+        """Budget snapshots are built incrementally and invalidated on changes"""
+        service = factories.ServiceFactory.create(effort_rate=100)
+        project = service.project
+        hours = factories.LoggedHoursFactory.create(
+            service=service, hours=2, rendered_on=dt.date(2019, 1, 15)
+        )
+        factories.InvoiceFactory.create(
+            project=project,
+            customer=project.customer,
+            contact=project.contact,
+            subtotal=150,
+            status=factories.Invoice.SENT,
+            invoiced_on=dt.date(2019, 1, 20),
+        )
+
+        def overall(day):
+            stats = project_budget_statistics([project], cutoff_date=day, persist=True)
+            return stats["overall"]
+
+        # Snapshots are only saved on request and never for today or later
+        project_budget_statistics([project], cutoff_date=dt.date(2019, 1, 31))
+        project_budget_statistics([project], persist=True)
+        self.assertEqual(ProjectBudgetSnapshot.objects.count(), 0)
+
+        self.assertEqual(overall(dt.date(2019, 1, 31))["delta_positive"], 50)
+        self.assertEqual(
+            list(ProjectBudgetSnapshot.objects.values_list("cutoff_date", flat=True)),
+            [dt.date(2019, 1, 31)],
+        )
+
+        factories.LoggedHoursFactory.create(
+            service=service, hours=3, rendered_on=dt.date(2019, 2, 10)
+        )
+        with self.assertNumQueries(12):
+            # Two snapshot lookups, the advisory lock inside a savepoint,
+            # three delta aggregates, one insert and three queries for
+            # figures which are always computed live
+            stats = overall(dt.date(2019, 2, 28))
+        self.assertEqual(stats["hours"], 5)
+        self.assertEqual(stats["effort_cost"], 500)
+        self.assertEqual(stats["invoiced"], 150)
+        self.assertEqual(ProjectBudgetSnapshot.objects.count(), 2)
+
+        # Changing old data invalidates all later snapshots
+        hours.hours = 4
+        hours.save()
+        self.assertEqual(ProjectBudgetSnapshot.objects.count(), 0)
+        self.assertEqual(overall(dt.date(2019, 2, 28))["hours"], 7)
+
+        service.effort_rate = 200
+        service.save()
+        self.assertEqual(ProjectBudgetSnapshot.objects.count(), 0)
+        self.assertEqual(overall(dt.date(2019, 2, 27))["effort_cost"], 1400)
+
+        prune_project_budget_snapshots()
+        self.assertEqual(ProjectBudgetSnapshot.objects.count(), 0)
+        overall(dt.date(2019, 2, 28))
+        prune_project_budget_snapshots()
+        self.assertEqual(
+            list(ProjectBudgetSnapshot.objects.values_list("cutoff_date", flat=True)),
+            [dt.date(2019, 2, 28)],
+        )
+
+    def test_customer_statistics(self):
+        """Customer statistics are maintained by triggers"""
+        service = factories.ServiceFactory.create()
+        project = service.project
+        customer = project.customer
+        factories.LoggedHoursFactory.create(service=service, hours=10)
+        factories.LoggedCostFactory.create(
+            service=service, cost=100, third_party_costs=80
+        )
+        factories.InvoiceFactory.create(
+            customer=customer,
+            contact=project.contact,
+            project=project,
+            subtotal=500,
+            status=Invoice.SENT,
+        )
+        factories.InvoiceFactory.create(
+            customer=customer,
+            contact=project.contact,
+            subtotal=100,
+            third_party_costs=20,
+            status=Invoice.PAID,
+        )
+        factories.InvoiceFactory.create(
+            customer=customer, contact=project.contact, subtotal=1000
+        )
+        offer = factories.OfferFactory.create(project=project, status=Offer.ACCEPTED)
+        # The offer's total is calculated from its services
+        Offer.objects.filter(pk=offer.pk).update(total_excl_tax=300)
+
+        def statistics(organization):
+            return CustomerStatistics.objects.filter(customer=organization).values(
+                "hours",
+                "cost",
+                "third_party_costs",
+                "invoiced",
+                "offered",
+                "project_invoiced",
+            )[0]
+
+        self.assertEqual(
+            statistics(customer),
+            {
+                "hours": Decimal("10.0"),
+                "cost": Decimal("100.00"),
+                "third_party_costs": Decimal("100.00"),
+                "invoiced": Decimal("600.00"),
+                "offered": Decimal("300.00"),
+                "project_invoiced": Decimal("500.00"),
+            },
+        )
+        self.assertEqual(customer.statistics.gross_margin_per_hour, 50)
+
+        other = factories.OrganizationFactory.create()
+        Project.objects.filter(pk=project.pk).update(customer=other)
+        self.assertEqual(
+            statistics(customer),
+            {
+                "hours": Decimal("0.0"),
+                "cost": Decimal("0.00"),
+                "third_party_costs": Decimal("20.00"),
+                "invoiced": Decimal("100.00"),
+                "offered": Decimal("0.00"),
+                # Grouped by the invoice's customer, not the project's
+                "project_invoiced": Decimal("500.00"),
+            },
+        )
+        self.assertEqual(statistics(other)["hours"], 10)
+        self.assertEqual(statistics(other)["invoiced"], 500)
+        self.assertEqual(statistics(other)["project_invoiced"], 0)
+
+        before = list(CustomerStatistics.objects.order_by("customer_id").values())
+        CustomerStatistics.objects.rebuild()
+        self.assertEqual(
+            list(CustomerStatistics.objects.order_by("customer_id").values()), before
+        )
+
+        organization = factories.OrganizationFactory.create()
+        self.assertIsNone(organization.statistics.gross_margin_per_hour)
@@ -13,6 +13,7 @@ from workbench.deals.reporting import accepted_deals, deal_history, declined_dea
 from workbench.projects.reporting import hours_per_customer
 from workbench.reporting.green_hours import green_hours
 from workbench.reporting.views import (
+    accepted_deals_for_user_view,
     hours_filter_view,
     key_data_gross_profit,
     key_data_third_party_costs,
@@ -87,11 +88,8 @@ urlpatterns = [
     ),
     re_path(
         r"^accepted-deals/deals/$",
-        deals_only(hours_filter_view),
-        {
-            "template_name": "reporting/accepted_deals_for_user.html",
-            "stats_fn": accepted_deals,
-        },
+        deals_only(accepted_deals_for_user_view),
+        name="report_accepted_deals_for_user",
     ),
     re_path(
         r"^declined-deals/$",
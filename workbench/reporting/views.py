@@ -3,13 +3,14 @@ from itertools import groupby
 
 from django import forms
 from django.db.models import Q
-from django.shortcuts import render
+from django.shortcuts import get_object_or_404, render
 from django.utils.html import format_html, format_html_join
 from django.utils.text import capfirst
 from django.utils.translation import gettext_lazy as _
 
 from workbench.accounts.models import Team, User
 from workbench.accounts.reporting import average_employment_duration, work_anniversaries
+from workbench.deals.reporting import accepted_deals_for_user
 from workbench.invoices.models import Invoice
 from workbench.invoices.utils import next_valid_day
 from workbench.logbook.models import LoggedCost
@@ -366,6 +367,25 @@ def hours_filter_view(request, form, *, template_name, stats_fn):
     )
 
 
+@filter_form(DateRangeAndTeamFilterForm)
+def accepted_deals_for_user_view(request, form):
+    user = get_object_or_404(User, pk=request.GET.get("user") or 0)
+    return render(
+        request,
+        "reporting/accepted_deals_for_user.html",
+        {
+            "form": form,
+            "user": user,
+            "page_obj": accepted_deals_for_user(
+                [form.cleaned_data["date_from"], form.cleaned_data["date_until"]],
+                user=user,
+                users=form.users(),
+                page=request.GET.get("page"),
+            ),
+        },
+    )
+
+
 @filter_form(DateRangeFilterForm)
 def labor_costs_view(request, form):
     date_range = [form.cleaned_data["date_from"], form.cleaned_data["date_until"]]
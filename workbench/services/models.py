@@ -73,15 +73,7 @@ class ServiceBase(Model):
 
     def save(self, *args, **kwargs):
         skip_related_model = kwargs.pop("skip_related_model", False)
-
-        if not self.position:
-            max_pos = self.__class__._default_manager.aggregate(m=Max("position"))["m"]
-            self.position = 10 + (max_pos or 0)
-        self.service_hours = self.effort_hours or Z1
-        self.service_cost = self.cost or Z2
-        if all((self.effort_hours, self.effort_rate)):
-            self.service_cost += self.effort_hours * self.effort_rate
-
+        self._compute_fields()
         super().save(*args, **kwargs)
 
         if not skip_related_model:
@@ -98,6 +90,15 @@ class ServiceBase(Model):
 
     save.alters_data = True
 
+    def _compute_fields(self):
+        if not self.position:
+            max_pos = self.__class__._default_manager.aggregate(m=Max("position"))["m"]
+            self.position = 10 + (max_pos or 0)
+        self.service_hours = self.effort_hours or Z1
+        self.service_cost = self.cost or Z2
+        if all((self.effort_hours, self.effort_rate)):
+            self.service_cost += self.effort_hours * self.effort_rate
+
     def delete(self, *args, **kwargs):
         super().delete(*args, **kwargs)
         if self._orig_related_id:
@@ -399,7 +399,13 @@ NUM_SLOW_TESTS = 20
 
 BATCH_MAX_ITEMS = 250
 
+# Generated invoice and offer PDFs; set to None to disable the cache
+PDF_CACHE_DIR = env("PDF_CACHE_DIR", default=os.path.join(BASE_DIR, "tmp", "pdfs"))
+PDF_CACHE_MAX_SIZE = 500 * 1024 * 1024
+PDF_CACHE_MAX_AGE = 30 * 86400
+
 if TESTING:  # pragma: no cover
     PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
     DATABASES["default"]["TEST"] = {"SERIALIZE": False}
     FEATURES = defaultdict(lambda: True)
+    PDF_CACHE_DIR = None
@@ -1,15 +1,18 @@
 import datetime as dt
+import json
 from types import SimpleNamespace
 
+from django.db import connection
 from django.test import TestCase
-from django.test.utils import override_settings
+from django.test.utils import CaptureQueriesContext, override_settings
 
 from workbench import factories
 from workbench.accounts.features import FEATURES
 from workbench.accounts.middleware import set_user_name
 from workbench.audit.models import LoggedAction
 from workbench.projects.models import Project
-from workbench.tools.history import EVERYTHING, Prettifier
+from workbench.tools.history import EVERYTHING, Prettifier, changes
+from workbench.views import HISTORY_PAGE_SIZE
 
 
 class HistoryTest(TestCase):
@@ -140,6 +143,61 @@ class HistoryTest(TestCase):
             {"green_hours_target": "50", "hourly_labor_costs": "100.00"},
         )
 
+    def test_batched_related_lookups(self):
+        """Related instances are loaded with one query per model"""
+        project = factories.ProjectFactory.create()
+
+        def count_queries():
+            actions = LoggedAction.objects.for_model(project).with_data(id=project.id)
+            with CaptureQueriesContext(connection) as context:
+                result = changes(Project, EVERYTHING, actions)
+            return len(result), len(context.captured_queries)
+
+        versions, queries = count_queries()
+        self.assertEqual(versions, 1)
+
+        for i in range(5):
+            project.owned_by = factories.UserFactory.create()
+            project.save()
+
+        self.assertEqual(count_queries(), (6, queries))
+
+    def test_pagination_and_json(self):
+        """History is paginated by event ID and streamed as JSON"""
+        service = factories.ServiceFactory.create()
+        for i in range(HISTORY_PAGE_SIZE + 5):
+            service.title = "Title {}".format(i)
+            service.save()
+
+        self.client.force_login(service.project.owned_by)
+        url = "/history/projects_service/id/{}/".format(service.id)
+        response = self.client.get(url)
+        self.assertContains(response, "UPDATE", HISTORY_PAGE_SIZE)
+        self.assertContains(response, "Load older changes")
+
+        actions = LoggedAction.objects.for_model(service).with_data(id=service.id)
+        before = actions.order_by("-event_id")[HISTORY_PAGE_SIZE - 1].event_id
+        self.assertContains(response, "{}?before={}".format(url, before))
+
+        response = self.client.get("{}?before={}".format(url, before))
+        self.assertContains(response, "UPDATE", 5)
+        self.assertContains(response, "INSERT", 1)
+        self.assertNotContains(response, "Load older changes")
+
+        response = self.client.get(url + "json/")
+        data = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(len(data), HISTORY_PAGE_SIZE + 6)
+        self.assertEqual(data[0]["action"], "UPDATE")
+        self.assertEqual(data[-1]["action"], "INSERT")
+        self.assertEqual(
+            [row["event_id"] for row in data],
+            sorted((row["event_id"] for row in data), reverse=True),
+        )
+
+        response = self.client.get("{}json/?before={}".format(url, before))
+        data = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(len(data), 6)
+
     def test_prettifier_details(self):
         """Special values are prettified as expected"""
         # Do not crash when encountering invalid values.
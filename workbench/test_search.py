@@ -2,7 +2,9 @@ from django.test import TestCase
 from django.test.utils import override_settings
 
 from workbench import factories
-from workbench.tools.search import process_query
+from workbench.contacts.models import Organization
+from workbench.projects.models import Project
+from workbench.tools.search import process_query, search_documents
 
 
 class SearchTest(TestCase):
@@ -43,3 +45,75 @@ class SearchTest(TestCase):
         self.assertEqual(process_query("org"), "org:*")
         self.assertEqual(process_query("a b"), "a & b:*")
         self.assertEqual(process_query("(foo bar)"), "foo & bar:*")
+        self.assertEqual(process_query("a b", prefix_all=True), "a:* & b:*")
+
+    def test_search_documents(self):
+        """All models are searched with one ranked query per queryset"""
+        project = factories.ProjectFactory.create(title="Test")
+        organization = factories.OrganizationFactory.create(name="Test Test")
+        other = factories.OrganizationFactory.create(name="Test")
+        querysets = [Organization.objects.all(), Project.objects.all()]
+
+        with self.assertNumQueries(2):
+            self.assertEqual(
+                search_documents(querysets, "test", limit=10),
+                [[organization, other], [project]],
+            )
+        self.assertEqual(
+            search_documents(querysets, "test", limit=1), [[organization], [project]]
+        )
+
+        other.name = "Something"
+        other.save()
+        project.delete()
+        self.assertEqual(
+            search_documents(querysets, "test", limit=10), [[organization], []]
+        )
+
+        # Filters are applied before the results are cut off
+        factories.OrganizationFactory.create(name="Test Test Test", is_archived=True)
+        self.assertEqual(
+            search_documents([Organization.objects.active()], "test", limit=1),
+            [[organization]],
+        )
+
+        # Typos fall back to trigram similarity
+        self.assertEqual(
+            search_documents([Organization.objects.active()], "Tesst", limit=10),
+            [[organization]],
+        )
+
+    def test_fuzzy_search(self):
+        """Trigram similarity is used when the full text search finds nothing"""
+        organization = factories.OrganizationFactory.create(name="Feinheit AG")
+        factories.OrganizationFactory.create(name="Something")
+        factories.OrganizationFactory.create(name="Feinheit Zürich")
+
+        self.assertEqual(
+            set(Organization.objects.search("Feinheitt")),
+            set(Organization.objects.exclude(name="Something")),
+        )
+        self.assertEqual(list(Organization.objects.search("AG")), [organization])
+        self.assertEqual(list(Organization.objects.search("xyz")), [])
+
+        # Exact matches which are filtered out do not suppress the fallback
+        factories.OrganizationFactory.create(name="Feinheitt", is_archived=True)
+        self.assertEqual(
+            set(Organization.objects.active().search("Feinheitt")),
+            set(Organization.objects.active().exclude(name="Something")),
+        )
+
+    def test_ranked_autocomplete(self):
+        """Autocomplete results are ranked and use prefix matches"""
+        self.client.force_login(factories.UserFactory.create())
+        test = factories.OrganizationFactory.create(name="Test")
+        organization = factories.OrganizationFactory.create(name="Tester Test")
+
+        response = self.client.get("/contacts/organizations/autocomplete/?q=Tes Tes")
+        self.assertEqual(
+            [result["value"] for result in response.json()["results"]],
+            [organization.pk, test.pk],
+        )
+
+        response = self.client.get("/contacts/organizations/autocomplete/?q=test")
+        self.assertEqual(response.json()["results"][0]["value"], organization.pk)
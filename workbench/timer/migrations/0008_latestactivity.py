@@ -0,0 +1,173 @@
+# Generated by Django 3.1.1 on 2026-10-18 03:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+ACTIVITY_SQL = """\
+CREATE OR REPLACE FUNCTION timer_latestactivity_add(
+  p_user_id integer,
+  p_created_at timestamp with time zone
+) RETURNS void AS $$
+begin
+  IF p_created_at IS NOT NULL THEN
+    INSERT INTO timer_latestactivity (user_id, created_at)
+    VALUES (p_user_id, p_created_at)
+    ON CONFLICT (user_id)
+    DO UPDATE SET created_at=greatest(timer_latestactivity.created_at, EXCLUDED.created_at);
+  END IF;
+end
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION timer_latestactivity_refresh(p_user_id integer)
+RETURNS void AS $$
+declare
+  latest timestamp with time zone;
+begin
+  SELECT greatest(
+    -- the end of the latest break
+    (SELECT max(ends_at) FROM logbook_break WHERE user_id=p_user_id),
+    -- the latest timestamp
+    (SELECT max(created_at) FROM timer_timestamp WHERE user_id=p_user_id),
+    -- the latest START timestamp's creation time + logged hours duration
+    (
+      SELECT max(ts.created_at + make_interval(secs => 3600 * lh.hours))
+      FROM timer_timestamp ts
+      INNER JOIN logbook_loggedhours lh ON ts.logged_hours_id=lh.id
+      WHERE ts.user_id=p_user_id AND ts.type='start'
+    )
+  ) INTO latest;
+
+  IF latest IS NULL THEN
+    DELETE FROM timer_latestactivity WHERE user_id=p_user_id;
+  ELSE
+    INSERT INTO timer_latestactivity (user_id, created_at)
+    VALUES (p_user_id, latest)
+    ON CONFLICT (user_id) DO UPDATE SET created_at=EXCLUDED.created_at;
+  END IF;
+end
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION timer_timestamp_latestactivity() RETURNS trigger AS $$
+begin
+  IF TG_OP = 'INSERT' AND new.logged_hours_id IS NULL THEN
+    PERFORM timer_latestactivity_add(new.user_id, new.created_at);
+    RETURN NULL;
+  END IF;
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM timer_latestactivity_refresh(old.user_id);
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM timer_latestactivity_refresh(new.user_id);
+  END IF;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS timer_timestamp_latestactivity_trigger ON timer_timestamp;
+CREATE TRIGGER timer_timestamp_latestactivity_trigger
+  AFTER INSERT OR DELETE
+  OR UPDATE OF user_id, created_at, type, logged_hours_id
+  ON timer_timestamp FOR EACH ROW
+  EXECUTE PROCEDURE timer_timestamp_latestactivity();
+
+CREATE OR REPLACE FUNCTION logbook_break_latestactivity() RETURNS trigger AS $$
+begin
+  IF TG_OP = 'INSERT' THEN
+    PERFORM timer_latestactivity_add(new.user_id, new.ends_at);
+    RETURN NULL;
+  END IF;
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM timer_latestactivity_refresh(old.user_id);
+  END IF;
+  IF TG_OP = 'UPDATE' AND new.user_id <> old.user_id THEN
+    PERFORM timer_latestactivity_refresh(new.user_id);
+  END IF;
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS logbook_break_latestactivity_trigger ON logbook_break;
+CREATE TRIGGER logbook_break_latestactivity_trigger
+  AFTER INSERT OR DELETE OR UPDATE OF user_id, ends_at
+  ON logbook_break FOR EACH ROW
+  EXECUTE PROCEDURE logbook_break_latestactivity();
+
+CREATE OR REPLACE FUNCTION logbook_loggedhours_latestactivity() RETURNS trigger AS $$
+begin
+  PERFORM timer_latestactivity_refresh(user_id)
+  FROM timer_timestamp
+  WHERE logged_hours_id=new.id AND type='start';
+  RETURN NULL;
+end
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS logbook_loggedhours_latestactivity_trigger
+  ON logbook_loggedhours;
+CREATE TRIGGER logbook_loggedhours_latestactivity_trigger
+  AFTER UPDATE OF hours ON logbook_loggedhours FOR EACH ROW
+  WHEN (old.hours IS DISTINCT FROM new.hours)
+  EXECUTE PROCEDURE logbook_loggedhours_latestactivity();
+
+CREATE INDEX IF NOT EXISTS timer_timestamp_user_created_at_idx
+  ON timer_timestamp (user_id, created_at);
+CREATE INDEX IF NOT EXISTS timer_timestamp_user_start_idx
+  ON timer_timestamp (user_id) WHERE type='start' AND logged_hours_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS logbook_break_user_ends_at_idx
+  ON logbook_break (user_id, ends_at);
+CREATE INDEX IF NOT EXISTS logbook_loggedhours_rendered_by_on_idx
+  ON logbook_loggedhours (rendered_by_id, rendered_on);
+
+SELECT timer_latestactivity_refresh(id) FROM accounts_user;
+"""
+
+ACTIVITY_REVERSE_SQL = """\
+DROP INDEX IF EXISTS logbook_loggedhours_rendered_by_on_idx;
+DROP INDEX IF EXISTS logbook_break_user_ends_at_idx;
+DROP INDEX IF EXISTS timer_timestamp_user_start_idx;
+DROP INDEX IF EXISTS timer_timestamp_user_created_at_idx;
+DROP TRIGGER IF EXISTS logbook_loggedhours_latestactivity_trigger
+  ON logbook_loggedhours;
+DROP FUNCTION IF EXISTS logbook_loggedhours_latestactivity();
+DROP TRIGGER IF EXISTS logbook_break_latestactivity_trigger ON logbook_break;
+DROP FUNCTION IF EXISTS logbook_break_latestactivity();
+DROP TRIGGER IF EXISTS timer_timestamp_latestactivity_trigger ON timer_timestamp;
+DROP FUNCTION IF EXISTS timer_timestamp_latestactivity();
+DROP FUNCTION IF EXISTS timer_latestactivity_refresh(integer);
+DROP FUNCTION IF EXISTS timer_latestactivity_add(integer, timestamp with time zone);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0009_user_person"),
+        ("logbook", "0020_auto_20200511_1419"),
+        ("timer", "0007_auto_20200506_2130"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LatestActivity",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="+",
+                        serialize=False,
+                        to="accounts.user",
+                        verbose_name="user",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(verbose_name="created at")),
+            ],
+            options={
+                "verbose_name": "latest activity",
+                "verbose_name_plural": "latest activities",
+            },
+        ),
+        migrations.RunSQL(ACTIVITY_SQL, ACTIVITY_REVERSE_SQL),
+    ]
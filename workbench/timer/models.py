@@ -1,11 +1,13 @@
 import datetime as dt
+from collections import defaultdict
 from decimal import ROUND_UP, Decimal
 from urllib.parse import urlencode
 
-from django.db import models
+from django.db import connections, models
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.text import capfirst
+from django.utils.timezone import localtime
 from django.utils.translation import gettext, gettext_lazy as _
 
 from workbench.accounts.models import User
@@ -117,15 +119,52 @@ class TimestampQuerySet(models.QuerySet):
            and/or detected.
         """
         day = day or dt.date.today()
-        entries = list(
-            self.filter(user=user, created_at__date=day).select_related(
-                "logged_hours__service", "logged_break", "project__owned_by"
-            )
-        )
+        return self.slices_range([user], [day, day])[user][day]
+
+    def slices_range(self, users, date_range):
+        """
+        Create slices for all passed users and all days in ``date_range``
+
+        Returns a ``{user: {day: [slices]}}`` dictionary containing all days
+        of the range. Timestamps, logged hours and breaks are fetched using
+        one query each and grouped in memory; see ``slices()`` for the
+        algorithm.
+        """
+        users = list(users)
+        days = [
+            date_range[0] + dt.timedelta(days=i)
+            for i in range((date_range[1] - date_range[0]).days + 1)
+        ]
+        entries = {(user.id, day): [] for user in users for day in days}
+
+        for entry in self.filter(
+            user__in=users, created_at__date__range=date_range
+        ).select_related("logged_hours__service", "logged_break", "project__owned_by"):
+            entries[(entry.user_id, localtime(entry.created_at).date())].append(entry)
+
+        logged_hours = defaultdict(list)
+        for entry in LoggedHours.objects.filter(
+            rendered_by__in=users, rendered_on__range=date_range
+        ).select_related("service"):
+            logged_hours[(entry.rendered_by_id, entry.rendered_on)].append(entry)
+
+        breaks = defaultdict(list)
+        for entry in Break.objects.filter(
+            user__in=users, starts_at__date__range=date_range
+        ):
+            breaks[(entry.user_id, localtime(entry.starts_at).date())].append(entry)
+
+        slices = {user: {} for user in users}
+        for user in users:
+            for day in days:
+                key = (user.id, day)
+                slices[user][day] = self._slices(
+                    entries[key], logged_hours[key], breaks[key], day=day
+                )
+        return slices
+
+    def _slices(self, entries, logged_hours, breaks, *, day):
         known_logged_hours = set(entry.logged_hours for entry in entries)
-        logged_hours = user.loggedhours.filter(rendered_on=day).select_related(
-            "service"
-        )
         entries.extend(
             self.model(
                 created_at=entry.created_at, type=self.model.LOGBOOK, logged_hours=entry
@@ -134,7 +173,6 @@ class TimestampQuerySet(models.QuerySet):
             if entry not in known_logged_hours
         )
         known_breaks = set(entry.logged_break for entry in entries)
-        breaks = user.breaks.filter(starts_at__date=day)
         entries.extend(
             self.model(
                 created_at=entry.ends_at, type=self.model.BREAK, logged_break=entry
@@ -301,3 +339,47 @@ class Timestamp(models.Model):
     @property
     def pretty_time(self):
         return local_date_format(self.created_at, fmt="H:i")
+
+
+class LatestActivityQuerySet(models.QuerySet):
+    def rebuild(self):
+        """
+        Recreate the latest activity records. They are maintained by triggers
+        on ``timer_timestamp``, ``logbook_break`` and ``logbook_loggedhours``;
+        this is only required if those have been bypassed somehow.
+        """
+        with connections["default"].cursor() as cursor:
+            cursor.execute(
+                """\
+DELETE FROM timer_latestactivity;
+SELECT timer_latestactivity_refresh(id) FROM accounts_user;
+"""
+            )
+
+
+class LatestActivity(models.Model):
+    """
+    The latest point in time a user has been active according to their
+    timestamps and breaks (see ``User.latest_created_at``)
+    """
+
+    # No database constraint: The triggers may still update the record
+    # while the user and their timestamps are being deleted.
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        db_constraint=False,
+        related_name="+",
+        verbose_name=_("user"),
+    )
+    created_at = models.DateTimeField(_("created at"))
+
+    objects = LatestActivityQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _("latest activity")
+        verbose_name_plural = _("latest activities")
+
+    def __str__(self):
+        return local_date_format(self.created_at)
@@ -12,7 +12,7 @@ from time_machine import travel
 from workbench import factories
 from workbench.accounts.models import User
 from workbench.logbook.forms import DetectedTimestampForm
-from workbench.timer.models import Timestamp
+from workbench.timer.models import LatestActivity, Timestamp
 from workbench.tools.formats import local_date_format
 
 
@@ -241,6 +241,50 @@ class TimestampsTest(TestCase):
         user = User.objects.get(id=user.id)
         self.assertEqual(user.latest_created_at, t.created_at)
 
+    def test_latest_activity(self):
+        """The latest activity record is maintained by triggers"""
+        user = factories.UserFactory.create()
+        self.assertFalse(LatestActivity.objects.filter(user=user).exists())
+
+        t = user.timestamp_set.create(
+            created_at=timezone.now() - dt.timedelta(seconds=3600),
+            type=Timestamp.START,
+        )
+        self.assertEqual(LatestActivity.objects.get(user=user).created_at, t.created_at)
+
+        h = factories.LoggedHoursFactory.create(rendered_by=user, hours=2)
+        t.logged_hours = h
+        t.save()
+        self.assertEqual(
+            LatestActivity.objects.get(user=user).created_at,
+            t.created_at + dt.timedelta(hours=2),
+        )
+
+        h.hours = 1
+        h.save()
+        self.assertEqual(
+            LatestActivity.objects.get(user=user).created_at,
+            t.created_at + dt.timedelta(hours=1),
+        )
+
+        b = factories.BreakFactory.create(
+            user=user, ends_at=timezone.now() + dt.timedelta(hours=3)
+        )
+        self.assertEqual(LatestActivity.objects.get(user=user).created_at, b.ends_at)
+
+        b.delete()
+        t.delete()
+        self.assertFalse(LatestActivity.objects.filter(user=user).exists())
+
+        t = user.timestamp_set.create(type=Timestamp.STOP)
+        LatestActivity.objects.rebuild()
+        self.assertEqual(LatestActivity.objects.get(user=user).created_at, t.created_at)
+
+        user = User.objects.get(id=user.id)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.latest_created_at, t.created_at)
+            user.hours_since_latest
+
     def test_link_timestamps(self):
         """Linking logged hours to timestamps"""
         service = factories.ServiceFactory.create()
@@ -304,6 +348,50 @@ class TimestampsTest(TestCase):
         self.assertEqual(len(data["timestamps"]), 1)
         self.assertEqual(data["timestamps"][0]["elapsed"], "0.1")
 
+    @travel("2020-02-20 12:00")
+    def test_slices_range(self):
+        """Slices for many users and days are fetched using three queries"""
+        user = factories.UserFactory.create()
+        other = factories.UserFactory.create()
+        today = dt.date.today()
+        yesterday = today - dt.timedelta(days=1)
+
+        # Elapsed hours are rounded up, use exactly one hour
+        started_at = timezone.now() - dt.timedelta(days=1)
+        user.timestamp_set.create(type=Timestamp.START, created_at=started_at)
+        user.timestamp_set.create(
+            type=Timestamp.STOP, created_at=started_at + dt.timedelta(hours=1)
+        )
+        factories.LoggedHoursFactory.create(rendered_by=other)
+
+        with self.assertNumQueries(3):
+            slices = Timestamp.objects.slices_range([user, other], [yesterday, today])
+
+        self.assertEqual(list(slices[user]), [yesterday, today])
+        self.assertEqual(len(slices[user][yesterday]), 1)
+        self.assertEqual(slices[user][today], [])
+        self.assertEqual(len(slices[other][today]), 1)
+        self.assertEqual(slices[other][today], Timestamp.objects.slices(other))
+
+        response = self.client.get(
+            "/list-timestamps/?user={}&date_from={}&date_until={}".format(
+                user.signed_email, yesterday.isoformat(), today.isoformat()
+            )
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(
+            [day["day"] for day in data["days"]], [str(yesterday), str(today)]
+        )
+        self.assertEqual(data["days"][0]["timestamps"][0]["elapsed"], "1.0")
+
+        response = self.client.get(
+            "/list-timestamps/?user={}&date_from={}".format(
+                user.signed_email, yesterday.isoformat()
+            )
+        )
+        self.assertEqual(response.status_code, 400)
+
     def test_post_split(self):
         """Backwards compatibility: Type "split" still works"""
         self.client.force_login(factories.UserFactory.create())
@@ -87,7 +87,51 @@ def create_timestamp(request):
 
 
 class SignedEmailUserForm(SignedEmailUserMixin, Form):
-    pass
+    date_from = forms.DateField(required=False)
+    date_until = forms.DateField(required=False)
+
+    def clean(self):
+        data = super().clean()
+        if bool(data.get("date_from")) != bool(data.get("date_until")):
+            raise forms.ValidationError("Pass both date_from and date_until")
+        if data.get("date_from") and not (
+            0 <= (data["date_until"] - data["date_from"]).days < 62
+        ):
+            raise forms.ValidationError("Invalid date range")
+        return data
+
+
+def _serialize_slices(slices):
+    return {
+        "hours": sum(
+            (
+                slice["logged_hours"].hours
+                for slice in slices
+                if slice.get("logged_hours")
+            ),
+            Z1,
+        ),
+        "timestamps": [
+            {
+                "timestamp": "{:>5} - {:>5} {:^7} {}".format(
+                    local_date_format(slice.get("starts_at"), fmt="H:i") or "?  ",
+                    local_date_format(slice.get("ends_at"), fmt="H:i") or "?  ",
+                    "({})".format(hours(slice.elapsed_hours, plus_sign=True))
+                    if slice.elapsed_hours is not None
+                    else "?",
+                    slice["description"] or "-",
+                ),
+                "elapsed": slice.elapsed_hours,
+                "comment": slice.get("comment", "")
+                or (
+                    "[{}]".format(slice["project"])
+                    if not slice.has_associated_log and slice.get("project")
+                    else ""
+                ),
+            }
+            for slice in slices
+        ],
+    }
 
 
 @decorator_from_middleware(CorsMiddleware)
@@ -98,36 +142,27 @@ def list_timestamps(request):
         return JsonResponse({"errors": form.errors.as_json()}, status=400)
 
     user = form.cleaned_data["user"]
-    slices = Timestamp.objects.slices(user)
-    daily_hours = sum(
-        (slice["logged_hours"].hours for slice in slices if slice.get("logged_hours")),
-        Z1,
-    )
+    if form.cleaned_data["date_from"]:
+        slices = Timestamp.objects.slices_range(
+            [user],
+            [form.cleaned_data["date_from"], form.cleaned_data["date_until"]],
+        )[user]
+        return JsonResponse(
+            {
+                "success": True,
+                "user": str(user),
+                "days": [
+                    dict(_serialize_slices(day_slices), day=day)
+                    for day, day_slices in slices.items()
+                ],
+            }
+        )
+
     return JsonResponse(
         {
             "success": True,
             "user": str(user),
-            "hours": daily_hours,
-            "timestamps": [
-                {
-                    "timestamp": "{:>5} - {:>5} {:^7} {}".format(
-                        local_date_format(slice.get("starts_at"), fmt="H:i") or "?  ",
-                        local_date_format(slice.get("ends_at"), fmt="H:i") or "?  ",
-                        "({})".format(hours(slice.elapsed_hours, plus_sign=True))
-                        if slice.elapsed_hours is not None
-                        else "?",
-                        slice["description"] or "-",
-                    ),
-                    "elapsed": slice.elapsed_hours,
-                    "comment": slice.get("comment", "")
-                    or (
-                        "[{}]".format(slice["project"])
-                        if not slice.has_associated_log and slice.get("project")
-                        else ""
-                    ),
-                }
-                for slice in slices
-            ],
+            **_serialize_slices(Timestamp.objects.slices(user)),
         }
     )
 
@@ -49,6 +49,32 @@ class Prettifier:
     def __init__(self):
         self._flatchoices = {}
         self._prettified_instances = {}
+        self._instances = {}
+
+    def prefetch(self, fields, rows):
+        """
+        Load all instances referenced by foreign keys in ``rows`` using one
+        query per related model instead of one query per value
+        """
+        pks = {}
+        for field in fields:
+            if field.related_model and not field.choices:
+                pks.setdefault(field.related_model, set()).update(
+                    values[field.attname]
+                    for values in rows
+                    if values.get(field.attname) is not None
+                )
+        for model, model_pks in pks.items():
+            instances = self._instances.setdefault(model, {})
+            model_pks -= set(instances)
+            if model_pks:
+                instances.update(
+                    (str(pk), instance)
+                    for pk, instance in model._default_manager.in_bulk(
+                        model_pks
+                    ).items()
+                )
+                instances.update((pk, None) for pk in model_pks - set(instances))
 
     def handle_bool(self, values, field):
         value = values.get(field.attname)
@@ -103,15 +129,13 @@ class Prettifier:
             values[field.attname] = self._prettified_instances[key][0]
             return self._prettified_instances[key][1]
 
-        queryset = model._default_manager.all()
-
-        instance = None
-        try:
-            instance = queryset.get(pk=value)
-            pretty = str(instance)
-        except model.DoesNotExist:
+        if value not in self._instances.get(model, {}):
+            self.prefetch([field], [values])
+        instance = self._instances[model][value]
+        if instance is None:
             pretty = _("Deleted %s instance") % model._meta.verbose_name
         else:
+            pretty = str(instance)
             values[field.attname] = instance
 
         if model in HISTORY:
@@ -148,10 +172,16 @@ class Prettifier:
 def changes(model, fields, actions):
     changes = []
 
+    actions = list(actions)
     if not actions:
         return changes
 
-    users = {u.pk: u.get_full_name() for u in User.objects.all()}
+    users = {
+        u.pk: u.get_full_name()
+        for u in User.objects.filter(
+            pk__in={action.user_id for action in actions if action.user_id}
+        )
+    }
     users[0] = _("<anonymous>")
     fields = [
         f
@@ -160,6 +190,13 @@ def changes(model, fields, actions):
     ]
 
     prettifier = Prettifier()
+    prettifier.prefetch(
+        fields,
+        [
+            action.changed_fields or {} if action.action == "U" else action.row_data
+            for action in actions
+        ],
+    )
 
     for action in actions:
         if action.action == "I":
@@ -10,13 +10,18 @@ from django.db.models.deletion import Collector
 from django.utils.translation import gettext, gettext_lazy as _
 
 from workbench.tools.formats import Z2, currency
-from workbench.tools.search import search
+from workbench.tools.search import fuzzy_search, ranked_search, search
 
 
 class SearchQuerySet(models.QuerySet):
     def search(self, terms):
+        if getattr(self.model, "trigram_fields", None):
+            return fuzzy_search(self, terms)
         return search(self, terms)
 
+    def ranked_search(self, terms):
+        return ranked_search(self, terms)
+
 
 class SlowCollector(Collector):
     def can_fast_delete(self, *args, **kwargs):
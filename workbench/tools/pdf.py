@@ -1,9 +1,15 @@
 import datetime as dt
+import hashlib
+import io
+import os
+import tempfile
+import time
 from copy import deepcopy
 from decimal import Decimal as D
 from itertools import chain
 
 from django.conf import settings
+from django.db import models
 from django.utils.text import Truncator, capfirst
 from django.utils.translation import activate, gettext as _
 
@@ -558,3 +564,96 @@ def pdf_response(*args, **kwargs):
     activate(settings.WORKBENCH.PDF_LANGUAGE)
     kwargs["pdfdocument"] = PDFDocument
     return _pdf_response(*args, **kwargs)
+
+
+PDF_CACHE_VERSION = 1
+
+
+def pdf_cache_key(parts):
+    """
+    Return a hash of everything a PDF depends on: The given ``parts``
+    (model instances are represented by the values of their fields), the
+    stationery and the language
+    """
+    sha = hashlib.sha256()
+    for part in [
+        PDF_CACHE_VERSION,
+        settings.WORKBENCH.PDF_LANGUAGE,
+        settings.WORKBENCH.PDF_COMPANY,
+        settings.WORKBENCH.PDF_ADDRESS,
+        settings.WORKBENCH.PDF_VAT_NO,
+        settings.WORKBENCH.PDF_OFFER_TERMS,
+        settings.WORKBENCH.PDF_INVOICE_PAYMENT,
+        *parts,
+    ]:
+        if isinstance(part, models.Model):
+            part = [part._meta.label] + [
+                getattr(part, field.attname) for field in part._meta.concrete_fields
+            ]
+        sha.update(repr(part).encode("utf-8"))
+        sha.update(b"\0")
+    return sha.hexdigest()
+
+
+def evict_pdf_cache(*, max_size=None, max_age=None):
+    """
+    Remove cached PDFs older than ``max_age`` seconds, and the least
+    recently used PDFs until the cache is smaller than ``max_size`` bytes
+    """
+    max_size = settings.PDF_CACHE_MAX_SIZE if max_size is None else max_size
+    max_age = settings.PDF_CACHE_MAX_AGE if max_age is None else max_age
+    entries = []
+    with os.scandir(settings.PDF_CACHE_DIR) as it:
+        for entry in it:
+            if entry.name.endswith(".pdf"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    size = sum(entry[1] for entry in entries)
+    for mtime, entry_size, path in sorted(entries):
+        if mtime > time.time() - max_age and size <= max_size:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:  # pragma: no cover
+            pass
+        size -= entry_size
+
+
+def cached_pdf_response(filename, *, key, render, as_attachment=True):
+    """
+    Return a PDF response like ``pdf_response``, but only call
+    ``render(pdf)`` (which also has to generate the PDF) if the cache does
+    not contain the PDF for ``key`` yet
+    """
+    pdf, response = pdf_response(filename, as_attachment=as_attachment)
+    if not settings.PDF_CACHE_DIR:
+        render(pdf)
+        return response
+
+    path = os.path.join(settings.PDF_CACHE_DIR, "%s.pdf" % key)
+    try:
+        with open(path, "rb") as f:
+            response.write(f.read())
+    except FileNotFoundError:
+        pass
+    else:
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:  # pragma: no cover
+            # Evicted by another process in the meantime, or not ours
+            pass
+        return response
+
+    with io.BytesIO() as buf:
+        render(PDFDocument(buf))
+        content = buf.getvalue()
+    response.write(content)
+
+    os.makedirs(settings.PDF_CACHE_DIR, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=settings.PDF_CACHE_DIR, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(content)
+    os.replace(tmp, path)
+    evict_pdf_cache()
+    return response
@@ -22,6 +22,9 @@ look like this::
                 search.fts("database_table", ["field1", "field"])
             ),
         ]
+
+Fuzzy matching using trigrams is added with ``search.trigram()`` and
+requires the ``TrigramExtension`` operation.
 """
 
 import re
@@ -74,14 +77,46 @@ CREATE TRIGGER {table}_fts_trigger BEFORE INSERT OR UPDATE
     )
 
 
-def process_query(s):
+def trigram_expression(fields, *, table=None):
+    return "lower(immutable_unaccent({}))".format(
+        " || ' ' || ".join(
+            "coalesce({}{}, '')".format("%s." % table if table else "", field)
+            for field in fields
+        )
+    )
+
+
+def trigram(table, fields):
+    """
+    Creates a trigram index for fuzzy searching ``fields`` of ``table``.
+    Requires the ``pg_trgm`` extension. Models have to list the same
+    fields in their ``trigram_fields`` attribute.
+    """
+    return """\
+CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text AS $$
+  SELECT public.unaccent('public.unaccent', $1)
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+
+DROP INDEX IF EXISTS {table}_trgm_index;
+CREATE INDEX {table}_trgm_index ON {table}
+  USING gin(({expression}) gin_trgm_ops);
+""".format(
+        table=table, expression=trigram_expression(fields)
+    )
+
+
+def process_query(s, *, prefix_all=False):
     """
     Converts the user's search string into something suitable for passing to
     to_tsquery.
+
+    ``prefix_all`` turns all words into prefix searches, not only the last.
     """
     # noqa Thanks https://www.fusionbox.com/blog/detail/partial-word-search-with-postgres-full-text-search-in-django/632/
     query = re.sub(r"[^-+@\w]+", " ", s).strip()
-    if query:
+    if query and prefix_all:
+        query = re.sub(r"\s+", ":* & ", query) + ":*"
+    elif query:
         query = re.sub(r"\s+", " & ", query)
         # Support prefix search on the last word. A tsquery of 'toda:*' will
         # match against any words that start with 'toda', which is good for
@@ -103,3 +138,73 @@ def search(queryset, terms):
         if terms
         else queryset
     )
+
+
+def trigram_search(queryset, terms):
+    """
+    Trigram similarity search, see ``fuzzy_search()``
+    """
+    return queryset.extra(
+        where=[
+            "lower(immutable_unaccent(%%s)) <%%%% %s"
+            % trigram_expression(
+                queryset.model.trigram_fields, table=queryset.model._meta.db_table
+            )
+        ],
+        params=[terms],
+    )
+
+
+def fuzzy_search(queryset, terms):
+    """
+    Full text search which falls back to trigram similarity matching if the
+    full text search does not find anything in the queryset, e.g. because of
+    typos
+
+    Only works for models with a ``trigram_fields`` attribute and a matching
+    index created by ``trigram()``.
+    """
+    if not terms:
+        return queryset
+    exact = search(queryset, terms)
+    return exact if exact.exists() else trigram_search(queryset, terms)
+
+
+def ranked_search(queryset, terms, *, prefix_all=True):
+    """
+    Search using prefix matches for all words and order the results by
+    their rank, e.g. for search-as-you-type autocompletion
+
+    ``prefix_all=False`` only uses a prefix match for the last word, the
+    same as ``search()``.
+    """
+    if not terms:
+        return queryset
+    table = queryset.model._meta.db_table
+    query = "to_tsquery('pg_catalog.german', unaccent(%s))"
+    return queryset.extra(
+        select={"search_rank": "ts_rank(%s.fts_document, %s)" % (table, query)},
+        select_params=[process_query(terms, prefix_all=prefix_all)],
+        where=["%s.fts_document @@ %s" % (table, query)],
+        params=[process_query(terms, prefix_all=prefix_all)],
+        order_by=["-search_rank", "-pk"],
+    )
+
+
+def search_documents(querysets, terms, *, limit):
+    """
+    Search the models of all querysets
+
+    Returns a list containing at most ``limit`` instances per queryset,
+    ordered by the rank of their ``fts_document``. Each queryset is searched
+    with a single query which applies its filters and ``select_related``
+    calls. Querysets of models with ``trigram_fields`` fall back to
+    ``trigram_search()`` if the full text search does not find anything.
+    """
+    results = []
+    for queryset in querysets:
+        instances = list(ranked_search(queryset, terms, prefix_all=False)[:limit])
+        if not instances and getattr(queryset.model, "trigram_fields", None):
+            instances = list(trigram_search(queryset, terms)[:limit])
+        results.append(instances)
+    return results
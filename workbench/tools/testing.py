@@ -1,4 +1,6 @@
 from django.contrib.messages import get_messages
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
 
 
 def messages(response):
@@ -11,3 +13,13 @@ def check_code(test, base_url):
         test.assertEqual(response.status_code, status_code)
 
     return code
+
+
+def page_queries(test, url):
+    """
+    Fetch ``url`` and return the list of SQL statements sent to the database
+    """
+    with CaptureQueriesContext(connections["default"]) as context:
+        response = test.client.get(url)
+    test.assertEqual(response.status_code, 200)
+    return [query["sql"] for query in context.captured_queries]
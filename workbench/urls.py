@@ -31,6 +31,11 @@ urlpatterns = [
     re_path(r"^planning/", include("workbench.planning.urls")),
     re_path(r"^search/$", views.search, name="search"),
     re_path(r"^history/(\w+)/(\w+)/([0-9]+)/$", views.history, name="history"),
+    re_path(
+        r"^history/(\w+)/(\w+)/([0-9]+)/json/$",
+        views.history_json,
+        name="history_json",
+    ),
     re_path(r"^report/", include("workbench.reporting.urls")),
     re_path(r"", include("workbench.timer.urls")),
     re_path(r"^notes/", include("workbench.notes.urls")),
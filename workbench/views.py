@@ -1,9 +1,11 @@
 import datetime as dt
+import json
 
 from django.apps import apps
 from django.contrib import messages
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import connections
-from django.http import Http404
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import render
 from django.urls import reverse
 from django.utils.text import capfirst
@@ -19,6 +21,7 @@ from workbench.offers.models import Offer
 from workbench.planning.models import PlanningRequest
 from workbench.projects.models import Campaign, Project
 from workbench.tools.history import HISTORY, changes
+from workbench.tools.search import search_documents
 from workbench.tools.validation import in_days
 
 
@@ -165,9 +168,11 @@ def search(request):
                     "%s_%s_list"
                     % (queryset.model._meta.app_label, queryset.model._meta.model_name)
                 ),
-                "results": queryset.search(q)[:101],
+                "results": instances,
             }
-            for queryset in sources
+            for queryset, instances in zip(
+                sources, search_documents(sources, q, limit=101)
+            )
         ]
     else:
         messages.error(request, _("Search query missing."))
@@ -178,7 +183,10 @@ def search(request):
 DB_TABLE_TO_MODEL = {model._meta.db_table: model for model in apps.get_models()}
 
 
-def history(request, db_table, attribute, id):
+HISTORY_PAGE_SIZE = 50
+
+
+def _history_cfg(request, db_table):
     try:
         model = DB_TABLE_TO_MODEL[db_table]
         cfg = HISTORY[model]
@@ -187,6 +195,28 @@ def history(request, db_table, attribute, id):
 
     if callable(cfg):
         cfg = cfg(request.user)
+    return model, cfg
+
+
+def _history_actions(request, model, attribute, id):
+    """
+    Return a queryset of logged actions, newest first, starting with the
+    first action older than the ``before`` event ID if one is given
+    """
+    actions = (
+        LoggedAction.objects.for_model(model)
+        .with_data(**{attribute: id})
+        .order_by("-event_id")
+    )
+    try:
+        before = int(request.GET.get("before"))
+    except (TypeError, ValueError):
+        return actions
+    return actions.filter(event_id__lt=before)
+
+
+def history(request, db_table, attribute, id):
+    model, cfg = _history_cfg(request, db_table)
     fields = cfg.get("fields", set())
 
     instance = None
@@ -214,7 +244,14 @@ def history(request, db_table, attribute, id):
             "id": id,
         }
 
-    actions = LoggedAction.objects.for_model(model).with_data(**{attribute: id})
+    actions = list(
+        _history_actions(request, model, attribute, id)[: HISTORY_PAGE_SIZE + 1]
+    )
+    older_url = (
+        "{}?before={}".format(request.path, actions[HISTORY_PAGE_SIZE - 1].event_id)
+        if len(actions) > HISTORY_PAGE_SIZE
+        else None
+    )
 
     return render(
         request,
@@ -222,7 +259,41 @@ def history(request, db_table, attribute, id):
         {
             "instance": instance,
             "title": title,
-            "changes": changes(model, fields, actions),
+            "changes": changes(model, fields, actions[:HISTORY_PAGE_SIZE][::-1]),
             "related": related,
+            "older_url": older_url,
         },
     )
+
+
+def history_json(request, db_table, attribute, id):
+    model, cfg = _history_cfg(request, db_table)
+    fields = cfg.get("fields", set())
+    actions = _history_actions(request, model, attribute, id)
+
+    def generate():
+        queryset = actions
+        separator = ""
+        yield "["
+        while True:
+            page = list(queryset[:HISTORY_PAGE_SIZE])
+            if not page:
+                break
+            for change in reversed(changes(model, fields, page[::-1])):
+                yield separator + json.dumps(
+                    {
+                        "event_id": change.version.event_id,
+                        "action": change.version.get_action_display(),
+                        "table_name": change.version.table_name,
+                        "id": (change.version.row_data or {}).get("id"),
+                        "created_at": change.version.created_at,
+                        "user": change.pretty_user_name,
+                        "changes": change.changes,
+                    },
+                    cls=DjangoJSONEncoder,
+                )
+                separator = ","
+            queryset = actions.filter(event_id__lt=page[-1].event_id)
+        yield "]"
+
+    return StreamingHttpResponse(generate(), content_type="application/json")